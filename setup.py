@@ -119,7 +119,9 @@ setup(
         #   ':python_version=="2.6"': ['argparse'],
         "dev": ["black", "isort", "pre-commit", "sphinx-click"]
     },
-    entry_points={},
+    entry_points={
+        "console_scripts": ["gavel-stub-prover = gavel.prover.stub:main"],
+    },
     cmdclass={"build_ext": optional_build_ext},
     ext_modules=[
         Extension(
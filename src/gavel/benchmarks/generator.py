@@ -0,0 +1,222 @@
+"""
+Generator for synthetic TPTP workloads. The generated problems scale along
+a single dimension, which makes it possible to measure how the parser, the
+compiler and the selectors scale with it:
+
+=================  ========================================================
+Workload           `size` is ...
+=================  ========================================================
+`wide`             the number of premises (short formulas, few symbols)
+`deep`             the nesting depth of the formulas (few premises)
+`symbol-heavy`     the number of premises, each with its own long symbols
+`equality-heavy`   the number of premises, most atoms are equations
+`cnf`              the number of clauses
+`fof`              the number of premises (a mix of all connectives)
+=================  ========================================================
+
+The same workload, size and seed always yield the same problem:
+
+.. code::
+
+    problem = generate("deep", 500, seed=1)
+    text = generate_text("cnf", 10000)
+"""
+import random
+from collections import OrderedDict
+
+from gavel.dialects.tptp.compiler import TPTPCompiler
+from gavel.logic import logic
+from gavel.logic import problem as prob
+
+_CONNECTIVES = [
+    logic.BinaryConnective.CONJUNCTION,
+    logic.BinaryConnective.DISJUNCTION,
+    logic.BinaryConnective.IMPLICATION,
+    logic.BinaryConnective.BIIMPLICATION,
+]
+
+
+class ProblemGenerator:
+    """
+    Generates random formulas from a seeded random number generator.
+
+    Parameters
+    ----------
+    seed: int
+        Seed of the random number generator
+    symbols: int
+        Number of distinct predicates, functors and constants each
+    depth: int
+        Nesting depth of the generated formulas
+    term_depth: int
+        Nesting depth of the generated terms
+    equality: float
+        Probability that an atom is an equation
+    prefix: str
+        Prefix of all symbol names, e.g. an IRI
+    """
+
+    def __init__(
+        self, seed=0, symbols=10, depth=2, term_depth=1, equality=0.0, prefix=""
+    ):
+        self.random = random.Random(seed)
+        self.symbols = max(1, symbols)
+        self.depth = depth
+        self.term_depth = term_depth
+        self.equality = equality
+        self.prefix = prefix
+        self.variables = [logic.Variable("X%d" % i) for i in range(3)]
+
+    def _symbol(self, kind):
+        return "%s%s%d" % (self.prefix, kind, self.random.randrange(self.symbols))
+
+    def term(self, depth=None):
+        depth = self.term_depth if depth is None else depth
+        choice = self.random.random()
+        if depth <= 0 or choice < 0.4:
+            if choice < 0.2:
+                return self.random.choice(self.variables)
+            return logic.Constant(self._symbol("c"))
+        return logic.FunctorExpression(
+            self._symbol("f"),
+            [self.term(depth - 1) for _ in range(self.random.randint(1, 2))],
+        )
+
+    def atom(self):
+        if self.random.random() < self.equality:
+            return logic.BinaryFormula(
+                self.term(), logic.BinaryConnective.EQ, self.term()
+            )
+        return logic.PredicateExpression(
+            self._symbol("p"), [self.term() for _ in range(self.random.randint(1, 2))]
+        )
+
+    def literal(self):
+        atom = self.atom()
+        if self.random.random() < 0.5:
+            return logic.UnaryFormula(logic.UnaryConnective.NEGATION, atom)
+        return atom
+
+    def formula(self, depth=None):
+        """
+        A random formula of the given nesting `depth`
+        """
+        depth = self.depth if depth is None else depth
+        if depth <= 0:
+            return self.literal()
+        return logic.BinaryFormula(
+            self.formula(depth - 1),
+            self.random.choice(_CONNECTIVES),
+            self.formula(depth - 1),
+        )
+
+    def chain(self, length, connective):
+        """
+        A right-nested chain of `length` literals joined by `connective`
+        """
+        formula = self.literal()
+        for _ in range(length - 1):
+            formula = logic.BinaryFormula(self.literal(), connective, formula)
+        return formula
+
+    def deep_formula(self, length):
+        """
+        `(l1 & ... & ln) => (k1 => (... => kn))`
+        """
+        return logic.BinaryFormula(
+            self.chain(length, logic.BinaryConnective.CONJUNCTION),
+            logic.BinaryConnective.IMPLICATION,
+            self.chain(length, logic.BinaryConnective.IMPLICATION),
+        )
+
+    def clause(self, length=3):
+        return self.chain(self.random.randint(1, length), logic.BinaryConnective.DISJUNCTION)
+
+    def sentence(self, name, formula, role=prob.FormulaRole.AXIOM, form="fof"):
+        if form == "fof":
+            formula = logic.QuantifiedFormula(
+                logic.Quantifier.UNIVERSAL, list(self.variables), formula
+            )
+        return prob.AnnotatedFormula(logic=form, name=name, role=role, formula=formula)
+
+
+def _wide(size, seed):
+    generator = ProblemGenerator(seed, symbols=size // 10 + 1, depth=1)
+    return _problem(generator, size, generator.formula)
+
+
+def _deep(size, seed, premises=10):
+    generator = ProblemGenerator(seed, symbols=premises * 2, term_depth=0)
+    return _problem(generator, premises, lambda: generator.deep_formula(size))
+
+
+def _symbol_heavy(size, seed):
+    generator = ProblemGenerator(
+        seed, symbols=size * 4, depth=2, prefix="http://example.org/ontology#"
+    )
+    return _problem(generator, size, generator.formula)
+
+
+def _equality_heavy(size, seed):
+    generator = ProblemGenerator(
+        seed, symbols=size // 10 + 1, depth=2, term_depth=2, equality=0.8
+    )
+    return _problem(generator, size, generator.formula)
+
+
+def _cnf(size, seed):
+    generator = ProblemGenerator(seed, symbols=size // 10 + 1)
+    return _problem(generator, size, generator.clause, form="cnf")
+
+
+def _fof(size, seed):
+    generator = ProblemGenerator(
+        seed, symbols=size // 10 + 1, depth=3, term_depth=2, equality=0.2
+    )
+    return _problem(generator, size, generator.formula)
+
+
+def _problem(generator, size, formula, form="fof"):
+    premises = [
+        generator.sentence("a%d" % i, formula(), form=form) for i in range(size)
+    ]
+    if form == "cnf":
+        conjecture = generator.sentence(
+            "goal", generator.clause(), role=prob.FormulaRole.NEGATED_CONJECTURE, form=form
+        )
+    else:
+        conjecture = generator.sentence(
+            "goal", generator.atom(), role=prob.FormulaRole.CONJECTURE, form=form
+        )
+    return prob.Problem(premises, [conjecture])
+
+
+WORKLOADS = OrderedDict(
+    [
+        ("wide", _wide),
+        ("deep", _deep),
+        ("symbol-heavy", _symbol_heavy),
+        ("equality-heavy", _equality_heavy),
+        ("cnf", _cnf),
+        ("fof", _fof),
+    ]
+)
+
+
+def generate(workload, size, seed=0) -> prob.Problem:
+    """
+    Generates a problem of the given `workload` (see :data:`WORKLOADS`)
+    and `size`
+    """
+    try:
+        factory = WORKLOADS[workload]
+    except KeyError:
+        raise ValueError("Unknown workload '%s'" % workload)
+    return factory(size, seed)
+
+
+def generate_text(workload, size, seed=0) -> str:
+    """
+    Like :func:`generate`, but returns the problem in TPTP syntax
+    """
+    return TPTPCompiler().compile(generate(workload, size, seed=seed)) + "\n"
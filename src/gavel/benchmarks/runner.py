@@ -0,0 +1,233 @@
+"""
+Runs benchmark scenarios and compares their results with a baseline.
+
+A scenario prepares its input once (:meth:`Scenario.setup`) and then
+executes a single operation (:meth:`Scenario.run`) repeatedly. The latency
+of every operation is measured. The peak memory of one operation is
+measured in a separate run under :mod:`tracemalloc`, because tracing slows
+down the measured operations considerably.
+"""
+import gc
+import json
+import math
+import time
+import tracemalloc
+from collections import OrderedDict
+
+SCENARIOS = OrderedDict()
+
+
+def register_scenario(name):
+    """
+    A class wrapper that registers a scenario under `name` (see
+    :func:`gavel.prover.registry.register_prover`)
+    """
+
+    def register_class(cls):
+        cls.name = name
+        SCENARIOS[name] = cls
+        return cls
+
+    return register_class
+
+
+class Scenario:
+    """
+    Base class for benchmark scenarios
+
+    Attributes
+    ----------
+    size: int
+        The size of the input (e.g. number of formulas)
+    seed: int
+        Seed for the generation of the input
+    workload: str
+        The kind of generated input (see
+        :data:`gavel.benchmarks.generator.WORKLOADS`)
+    """
+
+    name = None
+
+    def __init__(self, size=1000, seed=0, workload="wide"):
+        self.size = size
+        self.seed = seed
+        self.workload = workload
+
+    def setup(self):
+        """
+        Prepares the input. Returns a state that is passed to :meth:`run`.
+        """
+        return None
+
+    def run(self, state):
+        """
+        Executes the measured operation once
+        """
+        raise NotImplementedError
+
+    def input_bytes(self, state):
+        """
+        Size of the input of one operation in bytes, if applicable
+        """
+        return None
+
+
+def percentile(values, q):
+    """
+    Returns the `q`-th percentile (0 <= q <= 100) of `values` using linear
+    interpolation between the closest ranks
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def run_scenario(scenario: Scenario, repeat=5, warmup=1):
+    """
+    Runs `scenario` `repeat` times after `warmup` unmeasured runs.
+
+    Returns
+    -------
+        A dictionary with the throughput (`ops_per_sec`), latency
+        percentiles in seconds (`p50`, `p90`, `p99`), the peak memory of a
+        single operation in bytes (`peak_memory`) and, if applicable, the
+        throughput in bytes per second (`bytes_per_sec`)
+    """
+    state = scenario.setup()
+    for _ in range(warmup):
+        scenario.run(state)
+    latencies = []
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scenario.run(state)
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        scenario.run(state)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = OrderedDict(
+        size=scenario.size,
+        seed=scenario.seed,
+        workload=scenario.workload,
+        repeat=repeat,
+        ops_per_sec=repeat / total if total else None,
+        p50=percentile(latencies, 50),
+        p90=percentile(latencies, 90),
+        p99=percentile(latencies, 99),
+        peak_memory=peak_memory,
+    )
+    input_bytes = scenario.input_bytes(state)
+    if input_bytes is not None and total:
+        result["bytes_per_sec"] = input_bytes * repeat / total
+    return result
+
+
+def run(names=None, size=1000, repeat=5, seed=0, workload="wide"):
+    """
+    Runs the scenarios `names` (default: all registered scenarios) on
+    inputs of the given `workload`
+
+    Returns
+    -------
+        A dictionary that maps scenario names to their results
+    """
+    # Registers the built-in scenarios
+    from gavel.benchmarks import scenarios  # noqa: F401
+    from gavel.benchmarks.generator import WORKLOADS
+
+    if workload not in WORKLOADS:
+        raise ValueError("Unknown workload '%s'" % workload)
+    results = OrderedDict()
+    for name in names or list(SCENARIOS):
+        try:
+            scenario_cls = SCENARIOS[name]
+        except KeyError:
+            raise ValueError("Unknown scenario '%s'" % name)
+        results[name] = run_scenario(
+            scenario_cls(size=size, seed=seed, workload=workload), repeat=repeat
+        )
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compares `results` with `baseline` (both as returned by :func:`run`).
+    A scenario regressed if its throughput dropped or its peak memory grew
+    by more than `tolerance` (relative to the baseline).
+
+    Returns
+    -------
+        A list of human readable descriptions of all regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        parameters = ("size", "seed", "workload")
+        if [reference.get(p) for p in parameters] != [result.get(p) for p in parameters]:
+            regressions.append(
+                "%s: baseline was measured with different parameters" % name
+            )
+            continue
+        # Runs that were too fast for the clock have no throughput
+        ops_per_sec, reference_ops_per_sec = result["ops_per_sec"], reference["ops_per_sec"]
+        if (
+            ops_per_sec is not None
+            and reference_ops_per_sec is not None
+            and ops_per_sec < reference_ops_per_sec * (1 - tolerance)
+        ):
+            regressions.append(
+                "%s: %.2f ops/s (baseline %.2f ops/s)"
+                % (name, ops_per_sec, reference_ops_per_sec)
+            )
+        if result["peak_memory"] > reference["peak_memory"] * (1 + tolerance):
+            regressions.append(
+                "%s: peak memory %d bytes (baseline %d bytes)"
+                % (name, result["peak_memory"], reference["peak_memory"])
+            )
+    return regressions
+
+
+def summarize(results) -> str:
+    """
+    Renders `results` as a table
+    """
+    row = "{:<16}{:>10}{:>12}{:>12}{:>12}{:>14}{:>14}"
+    lines = [row.format("scenario", "size", "ops/s", "p50 [ms]", "p99 [ms]", "peak [KiB]", "MiB/s")]
+    for name, result in results.items():
+        bytes_per_sec = result.get("bytes_per_sec")
+        ops_per_sec = result["ops_per_sec"]
+        lines.append(
+            row.format(
+                name,
+                result["size"],
+                "%.2f" % ops_per_sec if ops_per_sec is not None else "-",
+                "%.2f" % (result["p50"] * 1000),
+                "%.2f" % (result["p99"] * 1000),
+                result["peak_memory"] // 1024,
+                "%.2f" % (bytes_per_sec / 2 ** 20) if bytes_per_sec else "-",
+            )
+        )
+    return "\n".join(lines)
+
+
+def save(results, path):
+    with open(path, "w") as fp:
+        json.dump(results, fp, indent=1)
+
+
+def load(path):
+    with open(path) as fp:
+        return json.load(fp)
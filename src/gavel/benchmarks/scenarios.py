@@ -0,0 +1,162 @@
+"""
+The built-in benchmark scenarios. All inputs are generated by
+:mod:`gavel.benchmarks.generator`, so runs with the same workload, size and
+seed are comparable.
+"""
+import os
+
+from gavel.benchmarks.generator import generate
+from gavel.benchmarks.runner import Scenario
+from gavel.benchmarks.runner import register_scenario
+from gavel.config import settings
+from gavel.dialects.base.compiler import FormulaCache
+from gavel.dialects.tptp.compiler import TPTPCompiler
+from gavel.dialects.tptp.dialect import TPTPProofDialect
+from gavel.dialects.tptp.parser import TPTPParser
+from gavel.prover import stub
+from gavel.prover.base.interface import BaseProverInterface
+from gavel.prover.eprover.interface import EProverInterface
+from gavel.selection.selector import Sine
+
+
+@register_scenario("parse")
+class ParseScenario(Scenario):
+    """
+    Parses a TPTP text with `size` formulas
+    """
+
+    compact = False
+
+    def setup(self):
+        compiler = TPTPCompiler(compact=self.compact)
+        return TPTPParser(), compiler.compile(generate(self.workload, self.size, self.seed))
+
+    def run(self, state):
+        parser, text = state
+        parser.parse(text)
+
+    def input_bytes(self, state):
+        return len(state[1].encode("utf-8"))
+
+
+@register_scenario("parse-compact")
+class CompactParseScenario(ParseScenario):
+    """
+    Like `parse`, but the text is compiled with compact symbols, as it is
+    read by provers with `compact_symbols=True`
+    """
+
+    compact = True
+
+
+@register_scenario("compile")
+class CompileScenario(Scenario):
+    """
+    Compiles a problem with `size` premises to TPTP without the formula cache
+    """
+
+    cached = False
+    compact = False
+
+    def setup(self):
+        formula_cache = FormulaCache(settings.FORMULA_CACHE_SIZE) if self.cached else None
+        compiler = TPTPCompiler(compact=self.compact, formula_cache=formula_cache)
+        return compiler, generate(self.workload, self.size, self.seed)
+
+    def run(self, state):
+        compiler, problem = state
+        compiler.compile(problem)
+
+
+@register_scenario("compile-cached")
+class CachedCompileScenario(CompileScenario):
+    """
+    Compiles the same problem repeatedly using the formula cache
+    """
+
+    cached = True
+
+
+@register_scenario("compile-compact")
+class CompactCompileScenario(CompileScenario):
+    """
+    Compiles a problem with `size` premises to TPTP with compact symbols
+    """
+
+    compact = True
+
+
+@register_scenario("compile-parallel")
+class ParallelCompileScenario(CompileScenario):
+    """
+    Compiles a problem with `size` premises to TPTP with a pool of (up to)
+    four worker processes, including the start of the pool
+    """
+
+    workers = max(2, min(4, os.cpu_count() or 1))
+
+    def setup(self):
+        compiler, problem = super(ParallelCompileScenario, self).setup()
+        # Measure the pool even for problems below the threshold
+        compiler.parallel_threshold = 0
+        return compiler, problem
+
+    def run(self, state):
+        compiler, problem = state
+        compiler.compile(problem, workers=self.workers)
+
+
+@register_scenario("sine")
+class SineScenario(Scenario):
+    """
+    Selects the premises for a conjecture from `size` axioms with SInE,
+    including the construction of the index
+    """
+
+    def setup(self):
+        return generate(self.workload, self.size, self.seed)
+
+    def run(self, problem):
+        Sine().select(problem)
+
+
+class _StubProver(BaseProverInterface):
+    """
+    Answers every problem with a proof that consists of all premises, so
+    only gavel's own overhead is measured
+    """
+
+    _prover_dialect_cls = TPTPProofDialect
+
+    def _submit_problem(self, problem_instance, *args, **kwargs):
+        return "% SZS status Theorem for goal\n% SZS output start\n{}\n% SZS output end\n".format(
+            problem_instance
+        )
+
+
+@register_scenario("prove")
+class ProveScenario(Scenario):
+    """
+    Proves a problem with `size` premises end-to-end with a stub prover:
+    compilation, submission and parsing of the returned proof
+    """
+
+    def setup(self):
+        prover = _StubProver()
+        return prover, generate(self.workload, self.size, self.seed)
+
+    def run(self, state):
+        prover, problem = state
+        prover.prove(problem)
+
+
+@register_scenario("prove-process")
+class ProcessProveScenario(ProveScenario):
+    """
+    Like `prove`, but runs the E interface with :mod:`gavel.prover.stub` as
+    prover binary, which adds temporary files and process start
+    """
+
+    def setup(self):
+        prover = EProverInterface(executable=stub.command())
+        return prover, generate(self.workload, self.size, self.seed)
@@ -16,50 +16,143 @@ Why does this file exist, and why not put this in __main__?
 """
 
 import click
+import glob
 import os
-import pkg_resources
+import sys
+from contextlib import contextmanager
 from gavel.dialects.tptp.dialect import TPTPDialect
 
-from gavel.dialects.tptp.parser import TPTPParser, TPTPProblemParser
-from gavel.prover.hets.interface import HetsProve, HetsSession, HetsEngine
+from gavel.dialects.tptp.parser import TPTPProblemParser
 from gavel.prover.registry import get_prover
-from gavel.selection.selector import Sine
-from gavel.dialects.base.dialect import get_dialect, _DIALECT_REGISTRY
+from gavel.dialects.base.compiler import CompilationContext
+from gavel.dialects.base import batch
+from gavel.dialects.base.dialect import get_dialect, available_dialects
+from gavel.instrumentation import stages as instrumentation
 from gavel import plugins
 
+# Modules that are only needed by some commands (e.g. the Hets client) are
+# imported by these commands to keep the startup of the CLI fast.
+
 
 @click.group()
 def base():
     pass
 
 
+@contextmanager
+def _profile_memory(enabled, path=None):
+    """
+    Traces the memory usage of all stages in this context if `enabled` is
+    set. Prints a summary and saves the measurements to `path` (if given).
+    """
+    if not enabled:
+        if path is not None:
+            raise click.UsageError("--profile-memory-output requires --profile-memory")
+        yield
+        return
+    from gavel.instrumentation import memory
+
+    with memory.profile() as collector:
+        yield
+    click.echo(memory.summarize(collector.records), err=True)
+    if path is not None:
+        with open(path, "w") as fp:
+            fp.write(memory.as_json(collector.records))
+
+
+def _profile_memory_options(command):
+    command = click.option(
+        "--profile-memory-output",
+        metavar="PROFILE_PATH",
+        default=None,
+        help="Save the measurements of --profile-memory as JSON to PROFILE_PATH",
+    )(command)
+    return click.option(
+        "--profile-memory",
+        is_flag=True,
+        help="Trace the memory usage of every stage and print a summary",
+    )(command)
+
+
 @click.command()
 @click.argument("p")
 @click.argument("f")
 @click.option("-s", default=None)
 @click.option("--hets", is_flag=True, default=False)
 @click.option("--plot", is_flag=True, default=False)
-def prove(p, f, s, plot, hets):
+@click.option("--stats", metavar="STATS_PATH", default=None, help="Append per-stage measurements to STATS_PATH as JSON lines")
+@_profile_memory_options
+def prove(p, f, s, plot, hets, stats, profile_memory, profile_memory_output):
     prover_interface = get_prover(p)
     prover = prover_interface()
     if hets:
+        from gavel.prover.hets.interface import HetsProve, HetsSession, HetsEngine
+
         hets_engine = HetsEngine()
         hets_session = HetsSession(hets_engine)
         prover = HetsProve(prover, hets_session)
 
     processor = TPTPProblemParser()
-    with open(f) as fp:
-        problem = processor.parse(fp.read())
+    stages = instrumentation.Instrumentation()
+    with open(f) as fp, _profile_memory(profile_memory, profile_memory_output):
+        text = fp.read()
+        with stages.stage("parse", text) as record:
+            problem = record.set_output(processor.parse(text))
         if s is not None:
+            from gavel.selection.selector import Sine
+
             selector = Sine()
-            problem = selector.select(problem)
+            with stages.stage("select", problem) as record:
+                problem = record.set_output(selector.select(problem))
         proof = prover.prove(problem)
-        if not plot:
-            for s in proof.steps:
-                print("{name}: {formula}".format(name=s.name, formula=s.formula))
-        else:
-            g = proof.get_graph()
-            g.render()
+    if stats is not None:
+        with open(stats, "a") as stats_file:
+            instrumentation.write_json_lines(proof.stages, stats_file, problem=f, prover=p)
+    if not plot:
+        for s in proof.steps:
+            print("{name}: {formula}".format(name=s.name, formula=s.formula))
+    else:
+        g = proof.get_graph()
+        g.render()
+
+
+class _AnnotationAxioms:
+    """
+    Writes a compiled problem to `stream` and collects the annotation axioms
+    at its beginning for `--save-dol`. Every axiom is preceded by a comment,
+    hence only every second line is inspected.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lines = []
+        self._buffer = ""
+        self._count = 0
+        self._collecting = True
+
+    def write(self, text):
+        self.stream.write(text)
+        if self._collecting:
+            *lines, self._buffer = (self._buffer + text).split("\n")
+            for line in lines:
+                self._add(line)
+
+    def finish(self):
+        if self._collecting and self._buffer:
+            self._add(self._buffer)
+        self._buffer = ""
+
+    def _add(self, line):
+        if not self._collecting:
+            return
+        self._count += 1
+        if self._count % 2 == 0:
+            if line.startswith('fof(annotation_axiom') or line.startswith('%'):
+                self.lines.append(line)
+            else:
+                # The remaining output is not needed anymore
+                self._collecting = False
+                self._buffer = ""
 
 
 @click.command(name='translate', context_settings=dict(
@@ -72,8 +165,14 @@ def prove(p, f, s, plot, hets):
 @click.option("--save", "-s", metavar="SAVE_PATH", default="", help="If set, saves the translation to SAVE_PATH")
 @click.option("--shorten-names", "-n", is_flag=True, help="Shorten names in output language (only for TPTP)")
 @click.option("--no-annotations", "-a", is_flag=True, help="Remove annotations in output dialect")
+@click.option("--output-dir", "-o", metavar="OUTPUT_ROOT", default=None, help="Translate all files in PATH (a directory or glob pattern) into OUTPUT_ROOT")
+@click.option("--jobs", "-j", default=1, help="Number of worker processes used to translate directories")
+@click.option("--force", is_flag=True, help="Translate all files, even if they did not change since the last run")
+@click.option("--workers", default=None, type=int, help="Number of worker processes that compile the premises of a large problem (only for TPTP)")
+@_profile_memory_options
 @click.pass_context
-def translate(ctx, frm, to, path, save, shorten_names, no_annotations):
+def translate(ctx, frm, to, path, save, shorten_names, no_annotations, output_dir, jobs, force, workers, profile_memory,
+              profile_memory_output):
     """
     Translates the file at PATH from the dialect specified by FRM to the dialect TO. You can get a list of all available dialects via the `dialects` command.
 
@@ -82,6 +181,20 @@ def translate(ctx, frm, to, path, save, shorten_names, no_annotations):
         python -m gavel translate --save=my-output.p tptp tptp my-input-file.tptp
 
         This will parse a given TPTP-file into gavels internal logic and save a new equivalent TPTP theory in my-output.txt.
+
+    The premises of large problems can be compiled by several processes:
+
+        python -m gavel translate --workers=4 tptp tptp large-problem.p
+
+    PATH may also be a directory or a glob pattern. In this case, every file is translated into the same relative location below OUTPUT_ROOT:
+
+        python -m gavel translate --output-dir=out --jobs=4 tptp tptp "Problems/**/*.p"
+
+        Files that did not change since their last translation are skipped.
+
+    If PATH is `-`, statements are read from stdin and every translated statement is written to stdout as soon as it has been parsed:
+
+        generate-axioms | python -m gavel translate tptp tptp - | vampire
     """
     # allow for arguments with variable number of values
     index = 0
@@ -102,22 +215,61 @@ def translate(ctx, frm, to, path, save, shorten_names, no_annotations):
     input_dialect = get_dialect(frm)
     output_dialect = get_dialect(to)
 
+    compiler_kwargs = dict(shorten_names=(to == TPTPDialect._identifier() and shorten_names),
+                           keep_annotations=not no_annotations)
+
+    if output_dir is not None or os.path.isdir(path) or glob.has_magic(path):
+        if profile_memory or profile_memory_output is not None:
+            raise click.UsageError("--profile-memory is only supported for single files")
+        if output_dir is None:
+            raise click.UsageError("Translating several files requires --output-dir")
+        result = batch.translate_batch(input_dialect, output_dialect, path, output_dir, jobs=jobs,
+                                       compiler_kwargs=compiler_kwargs, parser_kwargs=kwargs, force=force)
+        for relative_path, error in result.failed.items():
+            print("Warning: Could not translate", relative_path, "-", error)
+        print("Translated {}, skipped {}, failed {} file(s)".format(
+            len(result.translated), len(result.skipped), len(result.failed)))
+        return
+
     parser = input_dialect._parser_cls()
-    compiler = output_dialect._compiler_cls(shorten_names=(to == TPTPDialect._identifier() and shorten_names),
-                                            keep_annotations=not no_annotations)
+    compiler = output_dialect._compiler_cls(**compiler_kwargs)
+
+    compile_kwargs = {}
+    if workers is not None:
+        if to != TPTPDialect._identifier():
+            raise click.UsageError("--workers is only supported for TPTP output")
+        compile_kwargs["workers"] = workers
+
+    if path == "-":
+        if profile_memory or profile_memory_output is not None:
+            raise click.UsageError("--profile-memory is only supported for single files")
+        context = CompilationContext()
+        for element in parser.parse_stream(sys.stdin, **kwargs):
+            sys.stdout.write(compiler.compile(element, context=context) + "\n")
+            sys.stdout.flush()
+        return
 
     # if the parameter save is specified, the translation gets saved as a file with that name
-    translation = compiler.visit(parser.parse_from_file(path, **kwargs))
-    if save != "":
-        with open(str(save), 'w') as file:
-            file.write(translation)
-    else:
-        print(translation)
+    context = CompilationContext()
+    stages = instrumentation.Instrumentation()
+    with _profile_memory(profile_memory, profile_memory_output):
+        with stages.stage("parse") as record:
+            problem = record.set_output(parser.parse_from_file(path, **kwargs))
+        with stages.stage("compile", problem):
+            if save != "":
+                with open(str(save), 'w') as file:
+                    annotation_axioms = _AnnotationAxioms(file)
+                    compiler.compile_to(problem, annotation_axioms, context=context, **compile_kwargs)
+            else:
+                annotation_axioms = _AnnotationAxioms(sys.stdout)
+                compiler.compile_to(problem, annotation_axioms, context=context, **compile_kwargs)
+                print()
+            annotation_axioms.finish()
 
     if frm == "annotated-owl" and to == TPTPDialect._identifier() and "save-dol" in kwargs:
         ontology_text = parser.ontology_text_dol
         parser_mapping = parser.name_mapping
-        compiler_mapping = compiler.name_mapping
+        compiler_mapping = context.name_mapping
 
         owl_reserved = ['string', 'integer', 'decimal', 'float', 'Datatype', 'Class', 'ObjectProperty', 'DataProperty',
                         'AnnotationProperty', 'NamedIndividual', 'Annotations', 'Prefix', 'Ontology', 'Import',
@@ -160,14 +312,7 @@ def translate(ctx, frm, to, path, save, shorten_names, no_annotations):
 
         dol_text += '\twith translation OWL22CASL, translation CASL2TPTP_FOF\n' \
                     '\tthen logic TPTP :\n'
-        annot_axioms = translation.splitlines()
-        i = 0
-        while i < len(annot_axioms):
-            i += 1
-            line = annot_axioms[i]
-            i += 1
-            if not (line.startswith('fof(annotation_axiom') or line.startswith('%')):
-                break
+        for line in annotation_axioms.lines:
             dol_text += f'\t\t{line}\n'
         dol_text += 'end'
 
@@ -180,10 +325,186 @@ def translate(ctx, frm, to, path, save, shorten_names, no_annotations):
 
 @click.command()
 def dialects():
-    for key in _DIALECT_REGISTRY.keys():
+    for key in available_dialects():
         print(key)
 
 
+@click.command()
+@click.argument("paths", nargs=-1, required=True)
+def stats(paths):
+    """
+    Prints a per-stage summary of the measurements stored in the JSON lines files at PATHS (see `prove --stats`).
+    """
+    records = []
+    for path in paths:
+        with open(path) as fp:
+            records += instrumentation.read_json_lines(fp)
+    print(instrumentation.summarize(records))
+
+
+@click.command()
+@click.option("--host", default=None, help="Interface to listen on (default: GAVEL_DAEMON_HOST)")
+@click.option("--port", default=None, type=int, help="Port to listen on (default: GAVEL_DAEMON_PORT)")
+@click.option("--workers", "-j", default=None, type=int, help="Number of requests processed at the same time")
+def serve(host, port, workers):
+    """
+    Runs a gavel daemon that keeps parsers, parsed theories, SInE indexes and results in memory. Use the `client` commands to send requests to it.
+    """
+    from gavel.config import settings
+    from gavel.daemon.server import GavelDaemon
+
+    daemon = GavelDaemon((host or settings.DAEMON_HOST, port or settings.DAEMON_PORT), workers=workers)
+    print("Serving on http://%s:%d" % daemon.server_address[:2])
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.server_close()
+
+
+def _client_source(path):
+    # `-` sends the text from stdin instead of a path
+    if path == "-":
+        return dict(text=sys.stdin.read())
+    return dict(path=path)
+
+
+@click.group()
+@click.option("--host", default=None, help="Host of the daemon (default: GAVEL_DAEMON_HOST)")
+@click.option("--port", default=None, type=int, help="Port of the daemon (default: GAVEL_DAEMON_PORT)")
+@click.pass_context
+def client(ctx, host, port):
+    """
+    Forwards commands to a running gavel daemon (see `serve`).
+    """
+    from gavel.daemon.client import GavelClient
+
+    ctx.obj = GavelClient(host, port)
+
+
+def _client_call(call):
+    from gavel.daemon.client import DaemonError
+
+    try:
+        return call()
+    except DaemonError as e:
+        raise click.ClickException(str(e))
+
+
+@client.command(name="status")
+@click.pass_obj
+def client_status(daemon):
+    import json
+
+    print(json.dumps(_client_call(daemon.status), indent=1))
+
+
+@client.command(name="parse")
+@click.argument("frm")
+@click.argument("path")
+@click.pass_obj
+def client_parse(daemon, frm, path):
+    result = _client_call(lambda: daemon.parse(dialect=frm, **_client_source(path)))
+    print("{premises} premises, {conjectures} conjectures, {imports} imports".format(**result))
+
+
+@client.command(name="translate")
+@click.argument("frm")
+@click.argument("to")
+@click.argument("path")
+@click.option("--shorten-names", "-n", is_flag=True, help="Shorten names in output language (only for TPTP)")
+@click.option("--no-annotations", "-a", is_flag=True, help="Remove annotations in output dialect")
+@click.pass_obj
+def client_translate(daemon, frm, to, path, shorten_names, no_annotations):
+    options = dict(shorten_names=(to == TPTPDialect._identifier() and shorten_names),
+                   keep_annotations=not no_annotations)
+    result = _client_call(lambda: daemon.translate(to, dialect=frm, options=options, **_client_source(path)))
+    print(result["output"])
+
+
+@client.command(name="select")
+@click.argument("path")
+@click.option("--axioms", "-x", multiple=True, help="Axiom files that are added to the premises")
+@click.option("--max-depth", "-d", default=10, help="Maximal number of SInE iterations")
+@click.pass_obj
+def client_select(daemon, path, axioms, max_depth):
+    result = _client_call(lambda: daemon.select(axioms=list(axioms), max_depth=max_depth, **_client_source(path)))
+    print(result["output"])
+
+
+@client.command(name="prove")
+@click.argument("p")
+@click.argument("f")
+@click.option("-s", is_flag=True, default=False, help="Select premises with SInE")
+@click.option("--axioms", "-x", multiple=True, help="Axiom files that are added to the premises")
+@click.pass_obj
+def client_prove(daemon, p, f, s, axioms):
+    result = _client_call(lambda: daemon.prove(p, select=s, axioms=list(axioms), **_client_source(f)))
+    for step in result["steps"]:
+        print("{name}: {formula}".format(**step))
+
+
+@click.command()
+@click.argument("scenarios", nargs=-1)
+@click.option("--size", "-n", default=1000, help="Size of the generated inputs (e.g. number of formulas)")
+@click.option("--repeat", "-r", default=5, help="Number of measured runs per scenario")
+@click.option("--seed", default=0, help="Seed for the generated inputs")
+@click.option("--workload", "-w", default="wide", help="Kind of the generated inputs: wide, deep, symbol-heavy, equality-heavy, cnf or fof")
+@click.option("--output", "-o", metavar="RESULT_PATH", default=None, help="Save the results as JSON to RESULT_PATH")
+@click.option("--baseline", "-b", metavar="BASELINE_PATH", default=None, help="Compare the results with the JSON results at BASELINE_PATH")
+@click.option("--tolerance", default=0.2, help="Allowed relative regression compared to the baseline")
+def bench(scenarios, size, repeat, seed, workload, output, baseline, tolerance):
+    """
+    Runs the benchmark SCENARIOS (default: all of them) and reports throughput, latency percentiles and peak memory. Exits with status 1 if a scenario regressed compared to the baseline.
+    """
+    from gavel.benchmarks import runner
+
+    try:
+        results = runner.run(scenarios, size=size, repeat=repeat, seed=seed, workload=workload)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    print(runner.summarize(results))
+    if output is not None:
+        runner.save(results, output)
+    if baseline is not None:
+        regressions = runner.compare(results, runner.load(baseline), tolerance=tolerance)
+        for regression in regressions:
+            print("Regression:", regression)
+        if regressions:
+            sys.exit(1)
+
+
+@click.command()
+@click.option("--root", metavar="TPTP_ROOT", default=None, help="Root of the TPTP library (default: $TPTP_ROOT)")
+@click.option("--catalogue", metavar="INDEX_PATH", default=None, help="Location of the catalogue (default: $TPTP_INDEX)")
+@click.option("--rebuild", is_flag=True, help="Read all problems again, even if they did not change")
+@click.option("--jobs", "-j", default=None, type=int, help="Number of worker processes that read the problems (default: one per CPU)")
+def index(root, catalogue, rebuild, jobs):
+    """
+    Builds or updates the catalogue of the problems in the TPTP library. Only problems that changed since the last run are read.
+    """
+    from gavel.dialects.tptp.catalogue import Catalogue
+
+    with Catalogue(path=catalogue, root=root) as instance:
+        if not os.path.isdir(instance.problem_root):
+            raise click.UsageError("No TPTP problems found at %s" % instance.problem_root)
+        counts = instance.update(rebuild=rebuild, jobs=jobs)
+    print("Added {added}, updated {updated}, removed {removed}, unchanged {unchanged} problem(s)".format(**counts))
+
+
+@click.command(name="import-solutions")
+@click.argument("path")
+@click.option("--store", metavar="STORE_PATH", default=None, help="Location of the solutions store (default: $GAVEL_SOLUTIONS_STORE)")
+def import_solutions(path, store):
+    """
+    Imports the TSTP solutions at PATH (a directory laid out as DOMAIN/PROBLEM/SYSTEM or a tar archive of it) into the local solutions store.
+    """
+    from gavel.dialects.tptp.solutions import SolutionStore
+
+    with SolutionStore(store) as instance:
+        count = instance.import_path(path)
+    print("Imported {} solution(s)".format(count))
+
+
 def add_source(source):
     global cli
     cli.add_source(source)
@@ -192,15 +513,44 @@ def add_source(source):
 base.add_command(prove)
 base.add_command(translate)
 base.add_command(dialects)
+base.add_command(stats)
+base.add_command(serve)
+base.add_command(client)
+base.add_command(bench)
+base.add_command(index)
+base.add_command(import_solutions)
+
+
+@click.group(cls=click.CommandCollection)
+@click.option("--profile", is_flag=True, help="Profile the command and print the hot functions")
+@click.option("--profile-output", metavar="PROFILE_PREFIX", default="gavel-profile",
+              help="Save the profile to files starting with PROFILE_PREFIX")
+@click.option("--profiler", type=click.Choice(["cprofile", "sampling"]), default="cprofile",
+              help="cprofile saves pstats files per stage, sampling saves collapsed stacks for flame graphs")
+@click.option("--profile-top", default=20, help="Number of hot functions in the profile summary")
+@click.pass_context
+def cli(ctx, profile, profile_output, profiler, profile_top):
+    if not profile:
+        return
+    from gavel.instrumentation.profiling import create_profiler
+
+    profiler = create_profiler(profiler)
+
+    def finish():
+        profiler.stop()
+        click.echo(profiler.summarize(profile_top), err=True)
+        for path in profiler.save(profile_output):
+            click.echo("Saved profile to %s" % path, err=True)
+
+    profiler.start()
+    ctx.call_on_close(finish)
 
-cli = click.CommandCollection()
 
 main = cli
 
 cli.add_source(base)
-for entry_point in pkg_resources.iter_entry_points("cli"):
-    ep = entry_point.load()
-    cli.add_source(ep)
+for _, reference in plugins.entry_points("cli"):
+    cli.add_source(plugins.load(reference))
 
 if __name__ == "__main__":
     cli()
@@ -4,3 +4,26 @@ TPTP_ROOT = os.environ.get("TPTP_ROOT", "")
 
 HETS_HOST = os.environ.get("HETS_HOST", "rest.hets.eu")
 HETS_PORT = os.environ.get("HETS_PORT", 80)
+HETS_TIMEOUT = float(os.environ.get("HETS_TIMEOUT", 86400))
+HETS_POOL_SIZE = int(os.environ.get("HETS_POOL_SIZE", 8))
+
+GAVEL_HOME = os.environ.get("GAVEL_HOME", os.path.join(os.path.expanduser("~"), ".gavel"))
+
+TPTP_INDEX = os.environ.get("TPTP_INDEX", os.path.join(GAVEL_HOME, "tptp.sqlite"))
+
+SOLUTIONS_STORE = os.environ.get("GAVEL_SOLUTIONS_STORE", os.path.join(GAVEL_HOME, "solutions.sqlite"))
+
+STRATEGY_HISTORY = os.environ.get(
+    "GAVEL_STRATEGY_HISTORY", os.path.join(GAVEL_HOME, "strategy_history.json")
+)
+
+SCHEDULE_BUDGET = int(os.environ.get("GAVEL_SCHEDULE_BUDGET", 300))
+
+FORMULA_CACHE_SIZE = int(os.environ.get("GAVEL_FORMULA_CACHE_SIZE", 100000))
+
+PLUGIN_CACHE = os.environ.get("GAVEL_PLUGIN_CACHE", os.path.join(GAVEL_HOME, "plugins.json"))
+
+DAEMON_HOST = os.environ.get("GAVEL_DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.environ.get("GAVEL_DAEMON_PORT", 8417))
+DAEMON_WORKERS = int(os.environ.get("GAVEL_DAEMON_WORKERS", os.cpu_count() or 1))
+DAEMON_CACHE_SIZE = int(os.environ.get("GAVEL_DAEMON_CACHE_SIZE", 256))
@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe mapping that keeps the `maxsize` most recently used
+    entries
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_or_create(self, key, factory):
+        """
+        Returns the entry for `key`. If there is none, it is created by
+        calling `factory`. Concurrent misses may call `factory` more than
+        once; the last result wins.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, factory())
+        return value
+
+    def statistics(self):
+        return dict(size=len(self._entries), hits=self.hits, misses=self.misses)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_MISSING = object()
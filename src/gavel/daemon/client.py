@@ -0,0 +1,74 @@
+"""
+A thin client for :mod:`gavel.daemon.server`. It only depends on the
+standard library, so starting it is cheap.
+"""
+import json
+import os
+from urllib import error
+from urllib import request
+
+from gavel.config import settings
+
+
+class DaemonError(Exception):
+    """
+    Raised if the daemon rejects a request or cannot be reached
+    """
+
+
+class GavelClient:
+    def __init__(self, host=None, port=None, timeout=None):
+        self.host = host or settings.DAEMON_HOST
+        self.port = port or settings.DAEMON_PORT
+        self.timeout = timeout
+
+    @property
+    def url(self):
+        return "http://%s:%d" % (self.host, self.port)
+
+    def _call(self, endpoint, payload=None):
+        data = None
+        if payload is not None:
+            data = json.dumps(payload).encode("utf-8")
+        req = request.Request(
+            "%s/%s" % (self.url, endpoint),
+            data=data,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with request.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8"))["error"]
+            except (ValueError, KeyError):
+                message = str(e)
+            raise DaemonError(message)
+        except error.URLError as e:
+            raise DaemonError("Could not reach gavel daemon at %s: %s" % (self.url, e.reason))
+
+    @staticmethod
+    def _source(path=None, text=None, **payload):
+        # The daemon resolves paths, hence they have to be absolute
+        if text is not None:
+            payload["text"] = text
+        else:
+            payload["path"] = os.path.abspath(path)
+        if "axioms" in payload:
+            payload["axioms"] = [os.path.abspath(p) for p in payload["axioms"]]
+        return payload
+
+    def status(self):
+        return self._call("status")
+
+    def parse(self, path=None, text=None, **payload):
+        return self._call("parse", self._source(path, text, **payload))
+
+    def translate(self, to, path=None, text=None, **payload):
+        return self._call("translate", self._source(path, text, to=to, **payload))
+
+    def select(self, path=None, text=None, **payload):
+        return self._call("select", self._source(path, text, **payload))
+
+    def prove(self, prover, path=None, text=None, **payload):
+        return self._call("prove", self._source(path, text, prover=prover, **payload))
@@ -0,0 +1,347 @@
+"""
+A long-running gavel process that answers `parse`, `translate`, `select` and
+`prove` requests over a local HTTP API. Parsed problems and axiom sets, SInE
+indexes and results are kept in memory, so repeated work on the same
+theories does not pay for interpreter start, grammar construction and
+parsing again:
+
+.. code::
+
+    gavel serve --port 8417
+    gavel client prove vampire problem.p
+
+Every endpoint accepts a JSON object via POST. Sources are passed either as
+`path` (read by the daemon) or as `text`.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from gavel.config import settings
+from gavel.daemon.cache import LRUCache
+from gavel.dialects.base.compiler import CompilationContext
+from gavel.dialects.base.compiler import FormulaCache
+from gavel.dialects.base.dialect import get_dialect
+from gavel.logic.problem import Problem
+from gavel.logic.status import StatusNoSuccess
+from gavel.logic.status import get_status
+from gavel.prover.registry import get_prover
+
+
+class DaemonRequestError(Exception):
+    """
+    Raised for malformed requests. Reported to the client with status 400.
+    """
+
+
+def _dialect(identifier):
+    try:
+        return get_dialect(identifier)
+    except KeyError:
+        raise DaemonRequestError("Unknown dialect '%s'" % identifier)
+
+
+def _definitive(result):
+    # Missing proofs, timeouts and other failures may turn out differently
+    # when the same problem is asked again
+    proof_status = get_status(result["status"])
+    return proof_status is not None and not issubclass(proof_status, StatusNoSuccess)
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Workspace:
+    """
+    The warm state of a daemon: sources, parsed problems, SInE indexes,
+    compiled formulas, prover instances and results. All methods are safe to be called from
+    several threads.
+    """
+
+    def __init__(self, cache_size=None):
+        cache_size = cache_size or settings.DAEMON_CACHE_SIZE
+        self.sources = LRUCache(cache_size)
+        self.problems = LRUCache(cache_size)
+        self.indexes = LRUCache(cache_size)
+        self.results = LRUCache(cache_size)
+        # Shared premises are compiled once for all problems and options
+        self.formulas = FormulaCache(settings.FORMULA_CACHE_SIZE)
+        self._parsers = {}
+        self._provers = {}
+        self._lock = threading.Lock()
+
+    def source(self, payload):
+        """
+        Returns the `(digest, text)` of the source described by `payload`
+        """
+        if payload.get("text") is not None:
+            text = payload["text"]
+            return _digest(text), text
+        if payload.get("path") is None:
+            raise DaemonRequestError("Either 'path' or 'text' is required")
+        return self._file(payload["path"])
+
+    def _file(self, path):
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise DaemonRequestError(str(e))
+
+        def read():
+            with open(path) as fp:
+                text = fp.read()
+            return _digest(text), text
+
+        return self.sources.get_or_create(
+            (path, stat.st_mtime_ns, stat.st_size), read
+        )
+
+    def _parser(self, dialect):
+        with self._lock:
+            parser = self._parsers.get(dialect)
+            if parser is None:
+                parser = self._parsers[dialect] = _dialect(dialect)._parser_cls()
+            return parser
+
+    def _parse(self, dialect, digest, text) -> Problem:
+        return self.problems.get_or_create(
+            (dialect, digest), lambda: self._parser(dialect).parse(text)
+        )
+
+    def problem(self, payload):
+        """
+        Returns the problem described by `payload` and the digests of all
+        sources it was built from. Axiom files listed in `axioms` are added
+        to its premises.
+        """
+        dialect = payload.get("dialect", "tptp")
+        digest, text = self.source(payload)
+        problem = self._parse(dialect, digest, text)
+        # Identifies the premises, which are shared by all problems that
+        # only add conjectures to the same axioms
+        premise_key = (digest,) if problem.premises else ()
+        axiom_digests = []
+        premises = []
+        for path in payload.get("axioms", []):
+            axiom_digest, axiom_text = self._file(path)
+            axiom_digests.append(axiom_digest)
+            premises.extend(self._parse(dialect, axiom_digest, axiom_text).premises)
+        if axiom_digests:
+            problem = Problem(
+                premises + list(problem.premises), problem.conjectures, problem.imports
+            )
+        return problem, (digest, tuple(axiom_digests), premise_key)
+
+    def _selected(self, payload, problem, digests):
+        from gavel.selection.selector import Sine
+
+        selector = Sine()
+        _, axiom_digests, premise_key = digests
+        index = self.indexes.get_or_create(
+            (payload.get("dialect", "tptp"),) + axiom_digests + premise_key,
+            lambda: selector.build_index(problem),
+        )
+        return selector.select(
+            problem, max_depth=payload.get("max_depth", 10), index=index
+        )
+
+    def _compiler(self, dialect, options=None):
+        compiler = _dialect(dialect)._compiler_cls(**(options or {}))
+        if hasattr(compiler, "formula_cache"):
+            compiler.formula_cache = self.formulas
+        return compiler
+
+    def _cached(self, key, compute, cacheable=None):
+        result = self.results.get(key)
+        if result is not None:
+            return dict(result, cached=True)
+        result = compute()
+        if cacheable is None or cacheable(result):
+            self.results.put(key, result)
+        return dict(result, cached=False)
+
+    def parse(self, payload):
+        problem, digests = self.problem(payload)
+        return dict(
+            digest=digests[0],
+            premises=len(problem.premises),
+            conjectures=len(problem.conjectures),
+            imports=len(problem.imports),
+        )
+
+    def translate(self, payload):
+        if "to" not in payload:
+            raise DaemonRequestError("'to' is required")
+        options = payload.get("options", {})
+        problem, digests = self.problem(payload)
+        key = (
+            "translate",
+            payload.get("dialect", "tptp"),
+            payload["to"],
+            json.dumps(options, sort_keys=True),
+            digests,
+        )
+
+        def compute():
+            compiler = self._compiler(payload["to"], options)
+            context = CompilationContext()
+            output = compiler.compile(problem, context=context)
+            return dict(output=output, name_mapping=context.name_mapping)
+
+        return self._cached(key, compute)
+
+    def select(self, payload):
+        problem, digests = self.problem(payload)
+        key = ("select", payload.get("dialect", "tptp"), payload.get("max_depth", 10), digests)
+
+        def compute():
+            selected = self._selected(payload, problem, digests)
+            compiler = self._compiler("tptp")
+            return dict(
+                premises=[p.name for p in selected.premises],
+                output=compiler.compile(selected),
+            )
+
+        return self._cached(key, compute)
+
+    def _prover(self, name):
+        # Prover interfaces keep per-call state in contexts and can be shared
+        with self._lock:
+            prover = self._provers.get(name)
+            if prover is None:
+                try:
+                    prover_cls = get_prover(name)
+                except KeyError:
+                    raise DaemonRequestError("Unknown prover '%s'" % name)
+                prover = self._provers[name] = prover_cls()
+            return prover
+
+    def prove(self, payload):
+        if "prover" not in payload:
+            raise DaemonRequestError("'prover' is required")
+        problem, digests = self.problem(payload)
+        select = payload.get("select", False)
+        key = (
+            "prove",
+            payload["prover"],
+            payload.get("dialect", "tptp"),
+            select and payload.get("max_depth", 10),
+            digests,
+        )
+
+        def compute():
+            selected = self._selected(payload, problem, digests) if select else problem
+            proof = self._prover(payload["prover"]).prove(selected)
+            if proof is None:
+                return dict(status=None, steps=[])
+            return dict(
+                status=getattr(proof.status, "_name", None),
+                steps=[
+                    dict(name=step.name, formula=str(step.formula))
+                    for step in proof.steps
+                ],
+            )
+
+        return self._cached(key, compute, cacheable=_definitive)
+
+    def statistics(self):
+        return dict(
+            sources=self.sources.statistics(),
+            problems=self.problems.statistics(),
+            indexes=self.indexes.statistics(),
+            results=self.results.statistics(),
+            formulas=dict(size=len(self.formulas)),
+        )
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    server: "GavelDaemon"
+
+    endpoints = ("parse", "translate", "select", "prove")
+
+    def _respond(self, body, status=200):
+        body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.strip("/") == "status":
+            self._respond(self.server.status())
+        else:
+            self._respond(dict(error="Not found"), status=404)
+
+    def do_POST(self):
+        endpoint = self.path.strip("/")
+        if endpoint not in self.endpoints:
+            self._respond(dict(error="Not found"), status=404)
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            self._respond(dict(error="Invalid JSON: %s" % e), status=400)
+            return
+        start = time.perf_counter()
+        try:
+            with self.server.slots:
+                result = getattr(self.server.workspace, endpoint)(payload)
+        except DaemonRequestError as e:
+            self._respond(dict(error=str(e)), status=400)
+            return
+        except Exception as e:
+            self._respond(dict(error="%s: %s" % (type(e).__name__, e)), status=500)
+            return
+        result["time"] = time.perf_counter() - start
+        self._respond(result)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GavelDaemon(ThreadingHTTPServer):
+    """
+    Serves the API on `address`. Every request is handled in its own thread,
+    at most `workers` requests are processed at the same time.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=None, workers=None, workspace: Workspace = None):
+        super(GavelDaemon, self).__init__(
+            address or (settings.DAEMON_HOST, settings.DAEMON_PORT), DaemonHandler
+        )
+        self.workers = workers or settings.DAEMON_WORKERS
+        self.slots = threading.BoundedSemaphore(self.workers)
+        self.workspace = workspace or Workspace()
+        self.started = time.time()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def status(self):
+        return dict(
+            uptime=time.time() - self.started,
+            workers=self.workers,
+            caches=self.workspace.statistics(),
+        )
+
+    def start(self):
+        """
+        Serves requests from a background thread
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
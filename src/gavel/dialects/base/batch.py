@@ -0,0 +1,225 @@
+"""
+Translation of many files between dialects. Files are translated by a pool
+of worker processes that create their parser and compiler only once. A
+manifest in the output directory records the content hash of every
+successfully translated file, so unchanged files are skipped on the next
+run.
+"""
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+MANIFEST_NAME = ".gavel-manifest.json"
+
+_WORKER = {}
+
+
+def file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def collect_sources(path):
+    """
+    Expands `path` (a file, a directory or a glob pattern) into the files to
+    translate.
+
+    Returns
+    -------
+        A list of `(source, relative_path)` pairs where `relative_path` is
+        the location of `source` relative to the root of `path`
+    """
+    if os.path.isdir(path):
+        sources = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                sources.append((source, os.path.relpath(source, path)))
+        return sources
+    if glob.has_magic(path):
+        root = _glob_root(path)
+        return [
+            (source, os.path.relpath(source, root))
+            for source in sorted(glob.glob(path, recursive=True))
+            if os.path.isfile(source)
+        ]
+    return [(path, os.path.basename(path))]
+
+
+def _glob_root(pattern):
+    # The longest leading part of the pattern without wildcards
+    parts = []
+    for part in pattern.split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.curdir
+
+
+class TranslationManifest:
+    """
+    Maps relative source paths to the content hash and the settings of
+    their last successful translation. Stored as JSON at `path`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as fp:
+                self.entries = json.load(fp)
+
+    def is_current(self, relative_path, digest, settings, target):
+        entry = self.entries.get(relative_path)
+        return (
+            entry is not None
+            and entry["digest"] == digest
+            and entry["settings"] == settings
+            and os.path.exists(target)
+        )
+
+    def record(self, relative_path, digest, settings):
+        self.entries[relative_path] = dict(digest=digest, settings=settings)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as fp:
+            json.dump(self.entries, fp, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class BatchResult:
+    """
+    Outcome of :func:`translate_batch`
+
+    Attributes
+    ----------
+    translated: list
+        Relative paths of the translated files
+    skipped: list
+        Relative paths of files that did not change since the last run
+    failed: dict
+        Maps relative paths of files that could not be translated to the error
+    """
+
+    def __init__(self):
+        self.translated = []
+        self.skipped = []
+        self.failed = {}
+
+
+def _init_worker(input_dialect_cls, output_dialect_cls, compiler_kwargs, parser_kwargs):
+    _WORKER["parser"] = input_dialect_cls._parser_cls()
+    _WORKER["compiler"] = output_dialect_cls._compiler_cls(**compiler_kwargs)
+    _WORKER["parser_kwargs"] = parser_kwargs
+
+
+def _translate_file(source, target):
+    problem = _WORKER["parser"].parse_from_file(source, **_WORKER["parser_kwargs"])
+    directory = os.path.dirname(target)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first such that a failed translation never
+    # leaves a truncated output behind
+    tmp_target = target + ".tmp"
+    try:
+        with open(tmp_target, "w") as fp:
+            _WORKER["compiler"].compile_to(problem, fp)
+        os.replace(tmp_target, target)
+    finally:
+        if os.path.exists(tmp_target):
+            os.remove(tmp_target)
+
+
+def translate_batch(
+    input_dialect_cls,
+    output_dialect_cls,
+    path,
+    output_root,
+    jobs=1,
+    compiler_kwargs=None,
+    parser_kwargs=None,
+    force=False,
+):
+    """
+    Translates all files in `path` (a file, directory or glob pattern) and
+    writes the results to the same relative locations below `output_root`.
+
+    Parameters
+    ----------
+    input_dialect_cls, output_dialect_cls
+        The dialects to translate from and to
+    path: str
+        The files to translate
+    output_root: str
+        The directory the translations are written to
+    jobs: int
+        Number of worker processes
+    compiler_kwargs, parser_kwargs: dict
+        Arguments passed to the compiler and to the parser
+    force: bool
+        Translate all files, even if they did not change
+
+    Returns
+    -------
+        A :class:`BatchResult`
+    """
+    compiler_kwargs = dict(compiler_kwargs or {})
+    parser_kwargs = dict(parser_kwargs or {})
+    os.makedirs(output_root, exist_ok=True)
+    manifest = TranslationManifest(os.path.join(output_root, MANIFEST_NAME))
+    settings = dict(
+        input=input_dialect_cls._identifier(),
+        output=output_dialect_cls._identifier(),
+        compiler=compiler_kwargs,
+        parser=parser_kwargs,
+    )
+    result = BatchResult()
+    pending = []
+    for source, relative_path in collect_sources(path):
+        target = os.path.join(output_root, relative_path)
+        digest = file_digest(source)
+        if not force and manifest.is_current(relative_path, digest, settings, target):
+            result.skipped.append(relative_path)
+        else:
+            pending.append((source, relative_path, target, digest))
+
+    initargs = (input_dialect_cls, output_dialect_cls, compiler_kwargs, parser_kwargs)
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=initargs
+        ) as executor:
+            futures = [
+                executor.submit(_translate_file, source, target)
+                for source, _, target, _ in pending
+            ]
+            outcomes = [_outcome(future.result) for future in futures]
+    else:
+        _init_worker(*initargs)
+        outcomes = [
+            _outcome(lambda: _translate_file(source, target))
+            for source, _, target, _ in pending
+        ]
+
+    for (source, relative_path, target, digest), error in zip(pending, outcomes):
+        if error is None:
+            manifest.record(relative_path, digest, settings)
+            result.translated.append(relative_path)
+        else:
+            result.failed[relative_path] = error
+    manifest.save()
+    return result
+
+
+def _outcome(call):
+    try:
+        call()
+    except Exception as e:
+        return e
+    return None
@@ -1,22 +1,197 @@
+import contextvars
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import gavel.logic.logic as fol
 from gavel.logic import problem
 
 
+class CompilationContext:
+    """
+    Holds the state of a single compilation, e.g. the mapping from symbols
+    used in gavel to the symbols in the output. Compilers keep all per-call
+    state in a context, hence a single compiler can be used from several
+    threads or asyncio tasks at the same time.
+    """
+
+    def __init__(self):
+        self.name_mapping = {}
+        # Generated identifiers of compact compilations and their inverse
+        self.short_names = {}
+        self.short_variable_names = {}
+        self.reverse_mapping = {}
+
+
+class FormulaCache:
+    """
+    A thread-safe LRU cache for the compiled text of formulas. Entries are
+    keyed by the identity of the formula and the options of the compiler.
+    Together with the text, the entries of the name mapping that the
+    compilation produced are stored, such that a cache hit leaves the
+    context in the same state as a compilation would.
+
+    The cache only holds weak references to the formulas and drops the
+    entries of a formula as soon as it is garbage collected. Formulas must
+    not be modified after they have been compiled; use :meth:`clear`
+    otherwise.
+
+    Compilers do not use a cache unless one is passed to them, e.g.
+    `TPTPCompiler(formula_cache=FormulaCache(settings.FORMULA_CACHE_SIZE))`.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        # Reentrant, since a garbage collection while the lock is held may
+        # run the callback of a dead formula
+        self._lock = threading.RLock()
+
+    def get(self, formula, options):
+        """
+        Returns the cached `(text, name_mapping)` pair for `formula` or
+        `None`.
+        """
+        key = (id(formula), options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0]() is not formula:
+                # The formula died and its id has been reused
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, formula, options, text, name_mapping):
+        if self.maxsize <= 0:
+            return
+        key = (id(formula), options)
+        reference = weakref.ref(formula, self._remover(key))
+        with self._lock:
+            self._entries[key] = (reference, text, name_mapping)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _remover(self, key):
+        # The callback must not keep the cache alive
+        cache = weakref.ref(self)
+
+        def remove(reference):
+            owner = cache()
+            if owner is not None:
+                with owner._lock:
+                    entry = owner._entries.get(key)
+                    if entry is not None and entry[0] is reference:
+                        del owner._entries[key]
+
+        return remove
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_CURRENT_CONTEXT = contextvars.ContextVar("gavel_compilation_context", default=None)
+
+
+def _visit_string(compiler, obj, **kwargs):
+    return obj
+
+
 class Compiler:
-    def visit(self, obj, *args, **kwargs):
-        if isinstance(obj, str):
-            return obj
-        if hasattr(obj, "__visit_name__"):
-            meth = getattr(self, "visit_%s" % obj.__visit_name__, None)
+    _visitors = {}
+    """
+    Dispatch table that maps node classes to visitor methods
+    """
+
+    @property
+    def context(self) -> CompilationContext:
+        """
+        The context of the running compilation. Outside of :meth:`compile`,
+        a context that is private to this compiler instance is used.
+        """
+        context = _CURRENT_CONTEXT.get()
+        if context is None:
+            context = self.__dict__.get("_default_context")
+            if context is None:
+                context = self._default_context = CompilationContext()
+        return context
+
+    @contextmanager
+    def _activate(self, context: CompilationContext = None):
+        token = _CURRENT_CONTEXT.set(context or CompilationContext())
+        try:
+            yield
+        finally:
+            _CURRENT_CONTEXT.reset(token)
+
+    def compile(self, obj, context: CompilationContext = None, **kwargs):
+        """
+        Compiles `obj` within `context`. If no context is passed, a fresh one
+        is used.
+        """
+        with self._activate(context):
+            return self.visit(obj, **kwargs)
+
+    def compile_to(self, obj, stream, context: CompilationContext = None, **kwargs):
+        """
+        Compiles `obj` within `context` and writes the result to the
+        file-like object `stream`. The parts returned by
+        :meth:`iter_compile` are written as soon as they are compiled, so the
+        complete result is never held in memory.
+        """
+        with self._activate(context):
+            for part in self.iter_compile(obj, **kwargs):
+                stream.write(part)
+
+    def iter_compile(self, obj, **kwargs):
+        """
+        Yields the compilation of `obj` in consecutive parts. Compilers that
+        can compile large structures (e.g. problems) piece by piece should
+        override this method.
+        """
+        yield self.visit(obj, **kwargs)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every compiler class gets its own dispatch table
+        cls._visitors = {}
+
+    @classmethod
+    def _resolve_visitor(cls, obj):
+        """
+        Looks up the visitor method for the class of `obj` and caches it in
+        the dispatch table of this compiler class.
+        """
+        node_cls = type(obj)
+        if issubclass(node_cls, str):
+            visitor = _visit_string
+        elif hasattr(obj, "__visit_name__"):
+            visitor = getattr(cls, "visit_%s" % obj.__visit_name__, None)
+            if visitor is None:
+                raise Exception(
+                    "Compiler '{name}' not found for {cls}".format(
+                        name=obj.__visit_name__, cls=node_cls
+                    )
+                )
         else:
             raise Exception(f"{obj} has no visitor name")
-        if meth is None:
-            raise Exception(
-                "Compiler '{name}' not found for {cls}".format(
-                    name=obj.__visit_name__, cls=type(obj)
-                )
-            )
-        return meth(obj, **kwargs)
+        cls._visitors[node_cls] = visitor
+        return visitor
+
+    def visit(self, obj, *args, **kwargs):
+        try:
+            visitor = self._visitors[type(obj)]
+        except KeyError:
+            visitor = self._resolve_visitor(obj)
+        return visitor(self, obj, **kwargs)
 
     def visit_quantifier(self, quantifier: fol.Quantifier):
         raise NotImplementedError
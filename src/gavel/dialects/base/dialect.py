@@ -1,17 +1,35 @@
 from typing import Iterable
 
+from gavel.dialects.base.compiler import CompilationContext
 from gavel.dialects.base.compiler import Compiler
 from gavel.dialects.base.parser import Parser
 from gavel.logic.problem import Problem
 from gavel.logic.solution import Proof
+from gavel import plugins
 
 _DIALECT_REGISTRY = {}
 
+BUILTIN_DIALECTS = {
+    "id": "gavel.dialects.base.dialect:IdentityDialect",
+    "tptp": "gavel.dialects.tptp.dialect:TPTPProblemDialect",
+    "tptp-proof": "gavel.dialects.tptp.dialect:TPTPProofDialect",
+}
+"""
+Dialects that ship with gavel. Further dialects are announced by plugins in
+the entry point group `gavel.dialects`.
+"""
+
 
 class Dialect:
     _parser_cls = Parser
     _compiler_cls = Compiler
 
+    supports_compact_symbols = False
+    """
+    Whether the dialect can replace all symbols by short generated
+    identifiers (see :meth:`compact`)
+    """
+
     def __init__(
         self,
         parser_args=None,
@@ -34,11 +52,34 @@ class Dialect:
         _DIALECT_REGISTRY[cls._identifier()] = cls
 
     def compile(self, obj, *args, **kwargs):
-        return self._compiler.visit(obj, *args, **kwargs)
+        return self._compiler.compile(obj, *args, **kwargs)
+
+    def compile_to(self, obj, stream, *args, **kwargs):
+        return self._compiler.compile_to(obj, stream, *args, **kwargs)
 
     def parse(self, obj, *args, **kwargs):
         return self._parser.parse(obj, *args, **kwargs)
 
+    @classmethod
+    def compact(cls) -> "Dialect":
+        """
+        Creates an instance of this dialect that compiles every symbol to a
+        short generated identifier. The original symbols are restored by
+        :meth:`restore_symbols`.
+        """
+        raise NotImplementedError(
+            "The dialect '%s' does not support compact symbols" % cls._identifier()
+        )
+
+    def restore_symbols(self, element, context: CompilationContext):
+        """
+        Replaces the identifiers generated by a compact compilation within
+        `context` in `element` (e.g. a parsed proof) by the original symbols
+        """
+        raise NotImplementedError(
+            "The dialect '%s' does not support compact symbols" % self._identifier()
+        )
+
     @classmethod
     def _identifier(cls) -> str:
         raise NotImplementedError
@@ -56,5 +97,29 @@ class IdentityDialect(Dialect):
         return "id"
 
 
+def _dialect_references():
+    references = dict(BUILTIN_DIALECTS)
+    references.update(plugins.entry_points("gavel.dialects"))
+    return references
+
+
 def get_dialect(identifier) -> Dialect:
+    """
+    Returns the dialect class registered as `identifier`. The module that
+    defines the dialect is imported on first use.
+    """
+    if identifier not in _DIALECT_REGISTRY:
+        reference = _dialect_references().get(identifier)
+        if reference is not None:
+            _DIALECT_REGISTRY.setdefault(identifier, plugins.load(reference))
+        else:
+            plugins.load_plugins()
     return _DIALECT_REGISTRY[identifier]
+
+
+def available_dialects():
+    """
+    Returns the identifiers of all known dialects
+    """
+    plugins.load_plugins()
+    return sorted(set(_DIALECT_REGISTRY) | set(_dialect_references()))
@@ -50,6 +50,14 @@ class StringBasedParser(Parser[str, Target], ABC):
     def parse_from_file(self, file_path, *args, **kwargs) -> Iterable[Target]:
         return self.parse(self._unpack_file(file_path))
 
+    def parse_stream(self, stream, *args, **kwargs) -> Iterable[Target]:
+        """
+        Parses the text read from the file-like object `stream`. Parsers
+        that can process their input statement by statement should override
+        this method to yield results before the stream is exhausted.
+        """
+        return self.parse(stream.read(), *args, **kwargs)
+
     def is_valid(self, inp: str) -> bool:
         """
         Verify if `inp` is a sting representation that is parsable by this
@@ -100,6 +108,16 @@ class ProblemParser(Parser[Parseable, Problem]):
                 raise ParserException("Unknown element:" + str(s))
         return Problem(premises, conjectures, imports)
 
+    def parse_stream(self, stream, *args, **kwargs) -> Iterable:
+        """
+        Yields the sentences and imports read from the file-like object
+        `stream` in the order they appear.
+        """
+        for s in self.logic_parser.parse_stream(stream, *args, **kwargs):
+            if not isinstance(s, (Sentence, Import)):
+                raise ParserException("Unknown element:" + str(s))
+            yield s
+
 
 class ParserException(Exception):
     pass
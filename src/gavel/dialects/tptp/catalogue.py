@@ -0,0 +1,283 @@
+"""
+A SQLite catalogue of the problems in a TPTP library. It stores the metadata
+of every problem (domain, name, SPC, status, rating, included axiom files,
+formula and symbol counts and a content hash) as found in the problem's
+header, so subsets of the library can be selected without walking or
+parsing it:
+
+.. code::
+
+    catalogue = Catalogue()
+    catalogue.update()
+    for entry in catalogue.problems(domain="SET", status="Theorem", max_rating=0.5):
+        print(entry.path)
+
+:meth:`Catalogue.update` only reads files whose modification time or size
+changed since the last update.
+"""
+import os
+import sqlite3
+
+from gavel.config import settings
+from gavel.dialects.base.batch import file_digest
+from gavel.dialects.tptp.header import ProblemHeader
+from gavel.dialects.tptp.header import problem_files
+from gavel.dialects.tptp.header import scan
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    path TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    name TEXT NOT NULL,
+    spc TEXT,
+    status TEXT,
+    rating REAL,
+    formulas INTEGER,
+    predicates INTEGER,
+    functors INTEGER,
+    variables INTEGER,
+    digest TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS includes (
+    path TEXT NOT NULL REFERENCES problems(path) ON DELETE CASCADE,
+    include TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS problems_domain ON problems(domain);
+CREATE INDEX IF NOT EXISTS problems_spc ON problems(spc);
+CREATE INDEX IF NOT EXISTS problems_status ON problems(status);
+CREATE INDEX IF NOT EXISTS problems_rating ON problems(rating);
+CREATE INDEX IF NOT EXISTS includes_path ON includes(path);
+CREATE INDEX IF NOT EXISTS includes_include ON includes(include);
+"""
+
+_COLUMNS = (
+    "path",
+    "domain",
+    "name",
+    "spc",
+    "status",
+    "rating",
+    "formulas",
+    "predicates",
+    "functors",
+    "variables",
+    "digest",
+    "mtime_ns",
+    "size",
+)
+
+
+def _row(header: ProblemHeader, root):
+    """
+    The row of the problem described by `header` in the `problems` table
+    """
+    stat = os.stat(header.path)
+    return (
+        os.path.relpath(header.path, root),
+        header.domain,
+        header.name,
+        header.spc,
+        header.status,
+        header.rating,
+        header.formulas,
+        header.syntax.get("predicates"),
+        header.syntax.get("functors"),
+        header.syntax.get("variables"),
+        file_digest(header.path),
+        stat.st_mtime_ns,
+        stat.st_size,
+    )
+
+
+class CatalogueEntry:
+    """
+    The catalogue record of a problem. `path` is relative to the `Problems`
+    directory of the library, all other attributes are taken from the
+    header of the problem and are `None` if absent.
+    """
+
+    __slots__ = _COLUMNS
+
+    def __init__(self, *values):
+        for column, value in zip(_COLUMNS, values):
+            setattr(self, column, value)
+
+    def __repr__(self):
+        return "CatalogueEntry(%s)" % self.path
+
+
+class Catalogue:
+    """
+    A catalogue of the problems below `root/Problems`, stored at `path`.
+
+    Parameters
+    ----------
+    path: str
+        Location of the SQLite database (default: `TPTP_INDEX`)
+    root: str
+        Root of the TPTP library (default: `TPTP_ROOT`)
+    """
+
+    def __init__(self, path=None, root=None):
+        self.path = path or settings.TPTP_INDEX
+        self.root = root or settings.TPTP_ROOT
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def problem_root(self):
+        return os.path.join(self.root, "Problems")
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def update(self, rebuild=False, jobs=None):
+        """
+        Adds new and changed problems to the catalogue and removes deleted
+        ones. Files are only read if their modification time or size changed.
+        With `rebuild`, all files are read again. The headers are read by
+        `jobs` worker processes (see :func:`gavel.dialects.tptp.header.scan`).
+
+        Returns
+        -------
+            A dictionary with the number of `added`, `updated`, `removed`
+            and `unchanged` problems
+        """
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self._connection.execute(
+                "SELECT path, mtime_ns, size FROM problems"
+            )
+        }
+        changed = []
+        counts = dict(added=0, updated=0, removed=0, unchanged=0)
+        for path in problem_files(self.root):
+            relative_path = os.path.relpath(path, self.problem_root)
+            stat = os.stat(path)
+            previous = known.pop(relative_path, None)
+            if previous is None:
+                counts["added"] += 1
+            elif rebuild or previous != (stat.st_mtime_ns, stat.st_size):
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            changed.append(path)
+        counts["removed"] = len(known)
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM problems WHERE path = ?", [(p,) for p in known]
+            )
+            for header in scan(changed, jobs=jobs):
+                self._store(_row(header, self.problem_root), header.includes)
+        return counts
+
+    def _store(self, row, includes):
+        self._connection.execute("DELETE FROM includes WHERE path = ?", (row[0],))
+        self._connection.execute(
+            "INSERT OR REPLACE INTO problems (%s) VALUES (%s)"
+            % (", ".join(_COLUMNS), ", ".join("?" * len(_COLUMNS))),
+            row,
+        )
+        self._connection.executemany(
+            "INSERT INTO includes (path, include) VALUES (?, ?)",
+            [(row[0], include) for include in includes],
+        )
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM problems").fetchone()[0]
+
+    def problems(
+        self,
+        domain=None,
+        spc=None,
+        status=None,
+        min_rating=None,
+        max_rating=None,
+        includes=None,
+        max_formulas=None,
+        limit=None,
+    ):
+        """
+        Returns the entries of all problems that match the given filters,
+        ordered by path
+
+        Parameters
+        ----------
+        domain: str
+            Domain of the problem (e.g. `SET`)
+        spc: str
+            SPC of the problem. Patterns are matched with SQL `LIKE`
+            semantics, e.g. `FOF_THM_%`.
+        status: str
+            SZS status of the problem (e.g. `Theorem`)
+        min_rating, max_rating: float
+            Bounds of the rating of the problem
+        includes: str
+            Only problems that include this axiom file (e.g.
+            `Axioms/SET001-0.ax`)
+        max_formulas: int
+            Upper bound for the number of formulas
+        limit: int
+            Maximal number of entries
+        """
+        conditions = []
+        parameters = []
+        for column, operator, value in (
+            ("domain", "=", domain),
+            ("spc", "LIKE", spc),
+            ("status", "=", status),
+            ("rating", ">=", min_rating),
+            ("rating", "<=", max_rating),
+            ("formulas", "<=", max_formulas),
+        ):
+            if value is not None:
+                conditions.append("%s %s ?" % (column, operator))
+                parameters.append(value)
+        if includes is not None:
+            conditions.append(
+                "path IN (SELECT path FROM includes WHERE include = ?)"
+            )
+            parameters.append(includes)
+        query = "SELECT %s FROM problems" % ", ".join(_COLUMNS)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        return [CatalogueEntry(*row) for row in self._connection.execute(query, parameters)]
+
+    def paths(self, **filters):
+        """
+        Absolute paths of all problems that match `filters` (see
+        :meth:`problems`)
+        """
+        return [
+            os.path.join(self.problem_root, entry.path)
+            for entry in self.problems(**filters)
+        ]
+
+    def includes(self, path):
+        """
+        The axiom files included by the problem at `path` (relative to the
+        `Problems` directory)
+        """
+        return [
+            include
+            for include, in self._connection.execute(
+                "SELECT include FROM includes WHERE path = ? ORDER BY rowid", (path,)
+            )
+        ]
@@ -1,16 +1,160 @@
+import gc
+import multiprocessing
+
 import gavel.logic.logic as fol
+from concurrent.futures import ProcessPoolExecutor
+from gavel.dialects.base.compiler import CompilationContext
 from gavel.dialects.base.compiler import Compiler
+from gavel.dialects.base.compiler import FormulaCache
 from gavel.logic import problem
+from enum import Enum
+from itertools import chain
+from itertools import count
 import re
 
+_INVALID_SYMBOL_CHARACTERS = re.compile("[^A-z_0-9]")
 
-class TPTPCompiler(Compiler):
+# Number of shards per worker used by parallel compilation
+_SHARDS_PER_WORKER = 4
+
+# Problems that are compiled in parallel. Forked workers inherit them, since
+# pickling the premises costs more than compiling them.
+_PARALLEL_COMPILATIONS = {}
+_PARALLEL_TOKENS = count()
+
+
+def _compile_shard(token, start, stop, kwargs):
+    compiler_cls, options, premises = _PARALLEL_COMPILATIONS[token]
+    compiler = compiler_cls(**options)
+    context = CompilationContext()
+    with compiler._activate(context):
+        text = "\n".join(compiler.visit(s, **kwargs) for s in premises[start:stop])
+    return text, context.name_mapping
 
-    def __init__(self, shorten_names=False, keep_annotations=True):
+
+class TPTPCompiler(Compiler):
+    parallel_threshold = 5000
+    """
+    Minimal number of premises for which parallel compilation starts a
+    process pool. Smaller problems compile faster than the pool starts.
+    """
+
+    def __init__(
+        self,
+        shorten_names=False,
+        keep_annotations=True,
+        compact=False,
+        formula_cache: FormulaCache = None,
+    ):
+        """
+        Parameters
+        ----------
+        shorten_names: bool
+            Only keep the part of IRI-like symbols after the last `/` or `#`
+        keep_annotations: bool
+            Emit annotations of formulas as comments
+        compact: bool
+            Replace every functor, predicate and constant by a generated
+            identifier (`s1`, `s2`, ...), every variable by `V1`, `V2`, ...
+            and omit annotations and quotes. The
+            original symbols are recorded in the `reverse_mapping` of the
+            compilation context (see :func:`restore_symbols`).
+        formula_cache: :class:`gavel.dialects.base.compiler.FormulaCache`
+            A cache for compiled annotated formulas, which may be shared by
+            several compilers. Formulas are not cached by default.
+        """
+        self._symbol_cache = {}
         self.shorten_names = shorten_names
         self.keep_annotations = keep_annotations
-        # maps symbols used in internal Gavel to symbols in TPTP output
-        self.name_mapping = {}
+        self.compact = compact
+        self.formula_cache = formula_cache
+
+    @property
+    def shorten_names(self):
+        return self._shorten_names
+
+    @shorten_names.setter
+    def shorten_names(self, value):
+        # Normalized names depend on this option
+        self._shorten_names = value
+        self._symbol_cache.clear()
+
+    def _options(self):
+        """
+        Keyword arguments that create a compiler with the same settings
+        """
+        return dict(
+            shorten_names=self.shorten_names,
+            keep_annotations=self.keep_annotations,
+            compact=self.compact,
+        )
+
+    def compile(self, obj, context: CompilationContext = None, workers=None, **kwargs):
+        """
+        Compiles `obj` within `context`. If `obj` is a problem with at least
+        :attr:`parallel_threshold` premises and `workers` is greater than
+        one, its premises are compiled by a pool of `workers` forked
+        processes. The result is identical to the sequential compilation.
+        On platforms without `fork`, problems are always compiled
+        sequentially. :meth:`compile_to` accepts `workers` as well.
+        """
+        if self._parallel(obj, workers):
+            with self._activate(context):
+                return "".join(self._iter_parallel(obj, workers, **kwargs))
+        return super(TPTPCompiler, self).compile(obj, context=context, **kwargs)
+
+    def _parallel(self, obj, workers):
+        return (
+            workers is not None
+            and workers > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+            and isinstance(obj, problem.Problem)
+            and len(obj.premises) >= max(self.parallel_threshold, workers + 1)
+            # Generated identifiers must be unique across all shards
+            and not self.compact
+        )
+
+    def _iter_parallel(self, obj: problem.Problem, workers, **kwargs):
+        premises = list(obj.premises)
+        shard_size = -(-len(premises) // (workers * _SHARDS_PER_WORKER))
+        token = next(_PARALLEL_TOKENS)
+        _PARALLEL_COMPILATIONS[token] = (type(self), self._options(), premises)
+        separator = ""
+        try:
+            for element in obj.imports:
+                yield separator + self.visit(element, **kwargs)
+                separator = "\n"
+            # The cyclic garbage collector would touch (and thereby copy)
+            # every inherited object in the workers
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=gc.disable,
+            ) as executor:
+                futures = [
+                    executor.submit(_compile_shard, token, i, i + shard_size, kwargs)
+                    for i in range(0, len(premises), shard_size)
+                ]
+                # Merging in shard order yields the same mapping as a
+                # sequential compilation
+                for future in futures:
+                    text, name_mapping = future.result()
+                    self.context.name_mapping.update(name_mapping)
+                    yield separator + text
+                    separator = "\n"
+        finally:
+            del _PARALLEL_COMPILATIONS[token]
+        for element in obj.conjectures:
+            yield separator + self.visit(element, **kwargs)
+            separator = "\n"
+
+    @property
+    def name_mapping(self):
+        """
+        Maps symbols used in internal Gavel to symbols in TPTP output. The
+        mapping belongs to the running compilation (see :meth:`compile`).
+        """
+        return self.context.name_mapping
 
     def visit_defined_constant(self, obj: fol.DefinedConstant):
         return self.visit(obj.value)
@@ -24,136 +168,96 @@ class TPTPCompiler(Compiler):
         else:
             return result
 
-    def visit(self, obj, **kwargs):
-        if isinstance(obj, str):
-            return obj
-        meth = getattr(self, "visit_%s" % obj.__visit_name__, None)
-
-        if meth is None:
-            raise Exception(
-                "Compiler '{name}' not found for {cls}".format(
-                    name=obj.__visit_name__, cls=type(obj)
-                )
-            )
-        return meth(obj, **kwargs)
+    _QUANTIFIER_MAP = {
+        fol.Quantifier.UNIVERSAL: "!",
+        fol.Quantifier.EXISTENTIAL: "?",
+    }
+
+    _ROLE_MAP = {
+        problem.FormulaRole.AXIOM: "axiom",
+        problem.FormulaRole.HYPOTHESIS: "hypothesis",
+        problem.FormulaRole.DEFINITION: "definition",
+        problem.FormulaRole.ASSUMPTION: "assumption",
+        problem.FormulaRole.LEMMA: "lemma",
+        problem.FormulaRole.THEOREM: "theorem",
+        problem.FormulaRole.COROLLARY: "corollary",
+        problem.FormulaRole.CONJECTURE: "conjecture",
+        problem.FormulaRole.PLAIN: "plain",
+        problem.FormulaRole.FINITE_INTERPRETATION_DOMAIN: "fi_domain",
+        problem.FormulaRole.FINITE_INTERPRETATION_FUNCTORS: "fi_functors",
+        problem.FormulaRole.FINITE_INTERPRETATION_PREDICATES: "fi_predicates",
+        problem.FormulaRole.UNKNOWN: "unknown",
+        problem.FormulaRole.TYPE: "type",
+        problem.FormulaRole.NEGATED_CONJECTURE: "negated_conjecture",
+    }
+
+    _BINARY_CONNECTIVE_MAP = {
+        fol.BinaryConnective.CONJUNCTION: "&",
+        fol.BinaryConnective.DISJUNCTION: "|",
+        fol.BinaryConnective.BIIMPLICATION: "<=>",
+        fol.BinaryConnective.IMPLICATION: "=>",
+        fol.BinaryConnective.REVERSE_IMPLICATION: "<=",
+        fol.BinaryConnective.SIMILARITY: "<~>",
+        fol.BinaryConnective.NEGATED_CONJUNCTION: "!&",
+        fol.BinaryConnective.NEGATED_DISJUNCTION: "!|",
+        fol.BinaryConnective.EQ: "=",
+        fol.BinaryConnective.NEQ: "!=",
+        fol.BinaryConnective.APPLY: "@",
+        fol.BinaryConnective.PRODUCT: "*",
+        fol.BinaryConnective.UNION: "U",
+        fol.BinaryConnective.GENTZEN_ARROW: "-->",
+        fol.BinaryConnective.ASSIGN: ":=",
+        fol.BinaryConnective.ARROW: ">",
+    }
+
+    _DEFINED_PREDICATE_MAP = {
+        fol.DefinedPredicate.DISTINCT: "$distinct",
+        fol.DefinedPredicate.LESS: "$less",
+        fol.DefinedPredicate.LESS_EQ: "$lesseq",
+        fol.DefinedPredicate.GREATER: "$greater",
+        fol.DefinedPredicate.GREATER_EQ: "$greatereq",
+        fol.DefinedPredicate.IS_INT: "$is_int",
+        fol.DefinedPredicate.IS_RAT: "$is_rat",
+        fol.DefinedPredicate.BOX_P: "$box_P",
+        fol.DefinedPredicate.BOX_I: "$box_i",
+        fol.DefinedPredicate.BOX_INT: "$box_int",
+        fol.DefinedPredicate.BOX: "$box",
+        fol.DefinedPredicate.DIA_P: "$dia_P",
+        fol.DefinedPredicate.DIA_I: "$dia_i",
+        fol.DefinedPredicate.DIA_INT: "$dia_int",
+        fol.DefinedPredicate.DIA: "$dia",
+    }
+
+    _UNARY_CONNECTIVE_MAP = {
+        fol.UnaryConnective.NEGATION: "~",
+    }
+
+    _PREDEFINED_CONSTANT_MAP = {
+        fol.PredefinedConstant.FALSUM: "$false",
+        fol.PredefinedConstant.VERUM: "$true",
+    }
+
+    @staticmethod
+    def _lookup(table, key):
+        try:
+            return table[key]
+        except KeyError:
+            raise NotImplementedError(key)
 
     def visit_quantifier(self, quantifier: fol.Quantifier):
-        if quantifier.is_universal():
-            return "!"
-        else:
-            return "?"
+        return self._lookup(self._QUANTIFIER_MAP, quantifier)
 
     def visit_formula_role(self, role: problem.FormulaRole):
-        if role == problem.FormulaRole.AXIOM:
-            return "axiom"
-        elif role == problem.FormulaRole.HYPOTHESIS:
-            return "hypothesis"
-        elif role == problem.FormulaRole.DEFINITION:
-            return "definition"
-        elif role == problem.FormulaRole.ASSUMPTION:
-            return "assumption"
-        elif role == problem.FormulaRole.LEMMA:
-            return "lemma"
-        elif role == problem.FormulaRole.THEOREM:
-            return "theorem"
-        elif role == problem.FormulaRole.COROLLARY:
-            return "corollary"
-        elif role == problem.FormulaRole.CONJECTURE:
-            return "conjecture"
-        elif role == problem.FormulaRole.PLAIN:
-            return "plain"
-        elif role == problem.FormulaRole.FINITE_INTERPRETATION_DOMAIN:
-            return "fi_domain"
-        elif role == problem.FormulaRole.FINITE_INTERPRETATION_FUNCTORS:
-            return "fi_functors"
-        elif role == problem.FormulaRole.FINITE_INTERPRETATION_PREDICATES:
-            return "fi_predicates"
-        elif role == problem.FormulaRole.UNKNOWN:
-            return "unknown"
-        elif role == problem.FormulaRole.TYPE:
-            return "type"
-        elif role == problem.FormulaRole.NEGATED_CONJECTURE:
-            return "negated_conjecture"
-        else:
-            raise NotImplementedError
+        return self._lookup(self._ROLE_MAP, role)
 
     def visit_binary_connective(self, connective: fol.BinaryConnective):
-        if connective == fol.BinaryConnective.CONJUNCTION:
-            return "&"
-        elif connective == fol.BinaryConnective.DISJUNCTION:
-            return "|"
-        elif connective == fol.BinaryConnective.BIIMPLICATION:
-            return "<=>"
-        elif connective == fol.BinaryConnective.IMPLICATION:
-            return "=>"
-        elif connective == fol.BinaryConnective.REVERSE_IMPLICATION:
-            return "<="
-        elif connective == fol.BinaryConnective.SIMILARITY:
-            return "<~>"
-        elif connective == fol.BinaryConnective.NEGATED_CONJUNCTION:
-            return "!&"
-        elif connective == fol.BinaryConnective.NEGATED_DISJUNCTION:
-            return "!|"
-        elif connective == fol.BinaryConnective.EQ:
-            return "="
-        elif connective == fol.BinaryConnective.NEQ:
-            return "!="
-        elif connective == fol.BinaryConnective.APPLY:
-            return "@"
-        elif connective == fol.BinaryConnective.MAPPING:
-            return ":"
-        elif connective == fol.BinaryConnective.PRODUCT:
-            return "*"
-        elif connective == fol.BinaryConnective.UNION:
-            return "U"
-        elif connective == fol.BinaryConnective.GENTZEN_ARROW:
-            return "-->"
-        elif connective == fol.BinaryConnective.ASSIGN:
-            return ":="
-        elif connective == fol.BinaryConnective.ARROW:
-            return ">"
-        else:
-            raise NotImplementedError
+        return self._lookup(self._BINARY_CONNECTIVE_MAP, connective)
 
     def visit_defined_predicate(self, predicate: fol.DefinedPredicate):
-        if predicate == fol.DefinedPredicate.DISTINCT:
-            return "$distinct"
-        elif predicate == fol.DefinedPredicate.LESS:
-            return "$less"
-        elif predicate == fol.DefinedPredicate.LESS_EQ:
-            return "$lesseq"
-        elif predicate == fol.DefinedPredicate.GREATER:
-            return "$greater"
-        elif predicate == fol.DefinedPredicate.GREATER_EQ:
-            return "$greatereq"
-        elif predicate == fol.DefinedPredicate.IS_INT:
-            return "$is_int"
-        elif predicate == fol.DefinedPredicate.IS_RAT:
-            return "$is_rat"
-        elif predicate == fol.DefinedPredicate.BOX_P:
-            return "$box_P"
-        elif predicate == fol.DefinedPredicate.BOX_I:
-            return "$box_i"
-        elif predicate == fol.DefinedPredicate.BOX_INT:
-            return "$box_int"
-        elif predicate == fol.DefinedPredicate.BOX:
-            return "$box"
-        elif predicate == fol.DefinedPredicate.DIA_P:
-            return "$dia_P"
-        elif predicate == fol.DefinedPredicate.DIA_I:
-            return "$dia_i"
-        elif predicate == fol.DefinedPredicate.DIA_INT:
-            return "$dia_int"
-        elif predicate == fol.DefinedPredicate.DIA:
-            return "$dia"
-        else:
-            raise NotImplementedError
+        return self._lookup(self._DEFINED_PREDICATE_MAP, predicate)
 
     def visit_unary_connective(self, predicate: fol.UnaryConnective):
-        if predicate == fol.UnaryConnective.NEGATION:
-            return "~"
-        else:
-            raise NotImplementedError
+        return self._lookup(self._UNARY_CONNECTIVE_MAP, predicate)
 
     def visit_unary_formula(self, formula: fol.UnaryFormula):
         return "{}{}".format(
@@ -167,8 +271,35 @@ class TPTPCompiler(Compiler):
             self.parenthesise(formula.formula),
         )
 
+    def _cache_options(self):
+        # Subclasses may compile the same formula differently
+        return type(self), self.shorten_names, self.keep_annotations
+
     def visit_annotated_formula(self, anno: problem.AnnotatedFormula):
-        if anno.annotation is None or not self.keep_annotations:
+        cache = self.formula_cache
+        # Compact identifiers depend on the order of compilation
+        if cache is None or self.compact:
+            return self._compile_annotated_formula(anno)
+        options = self._cache_options()
+        context = self.context
+        hit = cache.get(anno, options)
+        if hit is not None:
+            text, entries = hit
+            context.name_mapping.update(entries)
+            return text
+        # Collect the symbols of this formula in a separate mapping
+        name_mapping = context.name_mapping
+        context.name_mapping = entries = {}
+        try:
+            text = self._compile_annotated_formula(anno)
+        finally:
+            context.name_mapping = name_mapping
+        name_mapping.update(entries)
+        cache.put(anno, options, text, entries)
+        return text
+
+    def _compile_annotated_formula(self, anno: problem.AnnotatedFormula):
+        if anno.annotation is None or not self.keep_annotations or self.compact:
             return "{}({},{},({})).".format(
                 anno.logic, anno.name, self.visit(anno.role), self.visit(anno.formula)
             )
@@ -198,22 +329,14 @@ class TPTPCompiler(Compiler):
             return "(" + s + ")"
 
     def visit_functor_expression(self, expression: fol.FunctorExpression):
-        name = ""
-        if expression.functor:
-            name = self.shorten_name(expression.functor)
-            name = name[:1].lower() + name[1:]
-            name = re.sub("[^A-z_0-9]", "_", name)
-            self.name_mapping[expression.functor] = name
-        return "'{}'({})".format(name, ",".join(map(self.visit, expression.arguments)))
+        return "{}({})".format(
+            self._symbol(expression.functor), ",".join(map(self.visit, expression.arguments))
+        )
 
     def visit_predicate_expression(self, expression: fol.PredicateExpression):
-        name = ""
-        if expression.predicate:
-            name = self.shorten_name(expression.predicate)
-            name = name[:1].lower() + name[1:]
-            name = re.sub("[^A-z_0-9]", "_", name)
-            self.name_mapping[expression.predicate] = name
-        return "'{}'({})".format(name, ",".join(map(self.visit, expression.arguments)))
+        return "{}({})".format(
+            self._symbol(expression.predicate), ",".join(map(self.visit, expression.arguments))
+        )
 
     def visit_typed_variable(self, variable: fol.TypedVariable):
         return "{}:{}".format(variable.name, self.visit(variable.vtype))
@@ -253,9 +376,9 @@ class TPTPCompiler(Compiler):
     def visit_variable(self, variable: fol.Variable):
         name = ""
         if variable.symbol:
-            name = self.shorten_name(variable.symbol)
-            name = name[:1].upper() + name[1:]
-            name = re.sub("[^A-z_0-9]", "_", name)
+            if self.compact:
+                return self._compact_symbol(variable.symbol, variable=True)
+            name = self.normalize_symbol(variable.symbol, variable=True)
             self.name_mapping[variable.symbol] = name
         return name
 
@@ -263,29 +386,74 @@ class TPTPCompiler(Compiler):
         return "\"" + variable.symbol + "\""
 
     def visit_constant(self, constant: fol.Constant):
-        name = ""
-        if constant.symbol:
-            name = self.shorten_name(constant.symbol)
-            name = name[:1].lower() + name[1:]
-            name = re.sub('[^A-z_0-9]', '_', name)
-            self.name_mapping[constant.symbol] = name
+        return self._symbol(constant.symbol)
+
+    def _symbol(self, symbol):
+        """
+        Returns the output for the functor, predicate or constant `symbol`
+        """
+        if not symbol:
+            return "''"
+        if self.compact:
+            return self._compact_symbol(symbol)
+        name = self.normalize_symbol(symbol)
+        self.name_mapping[symbol] = name
         return f"'{name}'"
 
+    def _compact_symbol(self, symbol, variable=False):
+        context = self.context
+        names = context.short_variable_names if variable else context.short_names
+        name = names.get(symbol)
+        if name is None:
+            # Provers name their own variables X1, X2, ...
+            name = ("V%d" if variable else "s%d") % (len(names) + 1)
+            names[symbol] = name
+            context.reverse_mapping[name] = symbol
+        self.name_mapping[symbol] = name
+        return name
+
     def visit_problem(self, problem: problem.Problem):
-        L = [self.visit(i) for i in problem.imports] + [self.visit(axiom) for axiom in problem.premises] + [self.visit(c) for c in problem.conjectures]
-        return "\n".join(L)
+        return "".join(self._iter_problem(problem))
+
+    def iter_compile(self, obj, workers=None, **kwargs):
+        if self._parallel(obj, workers):
+            return self._iter_parallel(obj, workers, **kwargs)
+        if isinstance(obj, problem.Problem):
+            return self._iter_problem(obj)
+        return super(TPTPCompiler, self).iter_compile(obj, **kwargs)
+
+    def _iter_problem(self, problem: problem.Problem):
+        separator = ""
+        for element in chain(problem.imports, problem.premises, problem.conjectures):
+            yield separator + self.visit(element)
+            separator = "\n"
 
     def visit_predefined_constant(self, obj: fol.PredefinedConstant):
-        if obj == fol.PredefinedConstant.FALSUM:
-            return "$false"
-        elif obj == fol.PredefinedConstant.VERUM:
-            return "$true"
-        else:
-            raise NotImplementedError
+        return self._lookup(self._PREDEFINED_CONSTANT_MAP, obj)
 
     def visit_import(self, imp: problem.Import):
         return "import(%s)" % imp.path
 
+    def normalize_symbol(self, symbol, variable=False):
+        """
+        Returns the name under which `symbol` is emitted. Variables start with
+        an upper case letter, all other symbols with a lower case letter. The
+        result is cached, so every distinct symbol is normalized only once.
+        """
+        key = (symbol, variable)
+        try:
+            return self._symbol_cache[key]
+        except KeyError:
+            pass
+        name = self.shorten_name(symbol)
+        if variable:
+            name = name[:1].upper() + name[1:]
+        else:
+            name = name[:1].lower() + name[1:]
+        name = _INVALID_SYMBOL_CHARACTERS.sub("_", name)
+        self._symbol_cache[key] = name
+        return name
+
     def shorten_name(self, name):
         cut_position = 0
         # shorten name by taking only part after last / or # (but at least 3 characters)
@@ -299,3 +467,47 @@ class TPTPCompiler(Compiler):
                 cut_position = hashtag_pos + 1
 
         return name[cut_position:]
+
+
+_RENAMED_ATTRIBUTES = {
+    fol.Variable: "symbol",
+    fol.Constant: "symbol",
+    fol.DefinedConstant: None,
+    fol.FunctorExpression: "functor",
+    fol.PredicateExpression: "predicate",
+}
+
+
+def restore_symbols(element, reverse_mapping):
+    """
+    Replaces the identifiers generated by a compact :class:`TPTPCompiler` in
+    `element` (e.g. a proof parsed from a prover's output) by the original
+    symbols. `element` is modified in place and returned.
+
+    Parameters
+    ----------
+    element
+        A logic element, sentence, problem or proof
+    reverse_mapping: dict
+        The `reverse_mapping` of the compilation context of the problem
+    """
+    stack = [element]
+    seen = set()
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+            continue
+        if not hasattr(obj, "__dict__") or isinstance(obj, Enum) or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        attribute = _RENAMED_ATTRIBUTES.get(type(obj))
+        if attribute is not None:
+            name = getattr(obj, attribute)
+            if isinstance(name, str):
+                # The proof parser keeps quotes of quoted atoms
+                original = reverse_mapping.get(name.strip("'"))
+                if original is not None:
+                    setattr(obj, attribute, original)
+        stack.extend(obj.__dict__.values())
+    return element
@@ -0,0 +1,165 @@
+"""
+Parallel iteration over many problem files, e.g. the whole TPTP library:
+
+.. code::
+
+    corpus = Corpus(problem_files(), jobs=8, progress=True)
+    for path, problem in corpus:
+        ...
+    for path, error in corpus.failures:
+        print(path, error)
+
+Files are parsed by a pool of worker processes that create their parser only
+once. At most `prefetch` files are parsed ahead of the consumer, so memory
+usage stays bounded even if the consumer is slow. Files that cannot be
+parsed are reported in :attr:`Corpus.failures` and do not end the iteration.
+"""
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+
+from gavel.dialects.tptp.parser import TPTPProblemParser
+
+_WORKER = {}
+
+
+def _init_worker(parser_cls, parser=None):
+    _WORKER["parser"] = parser if parser is not None else parser_cls()
+
+
+def _parse(parser, path):
+    """
+    Returns `(path, problem, error)`, where `error` describes why `path`
+    could not be parsed (if so)
+    """
+    try:
+        with open(path) as fp:
+            return path, parser.parse(fp.read()), None
+    except Exception as e:
+        return path, None, "%s: %s" % (type(e).__name__, e)
+
+
+def _parse_in_worker(path):
+    return _parse(_WORKER["parser"], path)
+
+
+def print_progress(done, total, path):
+    """
+    Reports the progress on stderr
+    """
+    sys.stderr.write("\r%d/%d %s" % (done, total, os.path.basename(path)))
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+class Corpus:
+    """
+    Parses the files at `paths` with `jobs` worker processes (default: one
+    per CPU) and yields `(path, problem)` pairs.
+
+    Parameters
+    ----------
+    paths: Iterable[str]
+        The files to parse
+    parser_cls
+        Class of the parser (default:
+        :class:`gavel.dialects.tptp.parser.TPTPProblemParser`)
+    parser
+        A configured parser that is used instead of a new instance of
+        `parser_cls`. It is copied to the worker processes, hence it has to
+        be picklable.
+    jobs: int
+        Number of worker processes. With a single job, files are parsed in
+        the current process.
+    prefetch: int
+        Maximal number of files that are parsed ahead of the consumer
+        (default: four per job)
+    ordered: bool
+        Whether problems are yielded in the order of `paths` or as soon as
+        they are parsed
+    progress
+        A function `progress(done, total, path)` that is called after each
+        file, or `True` to print the progress to stderr
+
+    Attributes
+    ----------
+    failures: list
+        `(path, error)` pairs of all files that could not be parsed
+    """
+
+    def __init__(
+        self,
+        paths,
+        parser_cls=TPTPProblemParser,
+        parser=None,
+        jobs=None,
+        prefetch=None,
+        ordered=True,
+        progress=None,
+    ):
+        self.paths = list(paths)
+        self.parser_cls = parser_cls
+        self.parser = parser
+        self.jobs = jobs or os.cpu_count() or 1
+        self.prefetch = max(1, prefetch or 4 * self.jobs)
+        self.ordered = ordered
+        self.progress = print_progress if progress is True else progress
+        self.failures = []
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        self.failures = []
+        done = 0
+        for path, problem, error in self._results():
+            done += 1
+            if self.progress is not None:
+                self.progress(done, len(self.paths), path)
+            if error is not None:
+                self.failures.append((path, error))
+            else:
+                yield path, problem
+
+    def _results(self):
+        if self.jobs == 1:
+            parser = self.parser if self.parser is not None else self.parser_cls()
+            for path in self.paths:
+                yield _parse(parser, path)
+            return
+        paths = iter(self.paths)
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(self.parser_cls, self.parser),
+        ) as executor:
+
+            def submit():
+                for path in paths:
+                    return executor.submit(_parse_in_worker, path)
+                return None
+
+            pending = deque()
+            for _ in range(self.prefetch):
+                future = submit()
+                if future is None:
+                    break
+                pending.append(future)
+            while pending:
+                if self.ordered:
+                    finished = [pending.popleft()]
+                else:
+                    completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    finished = [f for f in pending if f in completed]
+                    for future in finished:
+                        pending.remove(future)
+                for future in finished:
+                    # Refill before blocking on the result
+                    replacement = submit()
+                    if replacement is not None:
+                        pending.append(replacement)
+                    yield future.result()
@@ -1,11 +1,29 @@
+from gavel.dialects.base.compiler import CompilationContext
 from gavel.dialects.base.dialect import Dialect
 from gavel.dialects.tptp.compiler import TPTPCompiler
+from gavel.dialects.tptp.compiler import restore_symbols
 from gavel.dialects.tptp.parser import SimpleTPTPProofParser
 from gavel.dialects.tptp.parser import TPTPProblemParser
 from gavel.logic.problem import Problem
 
 
-class TPTPProblemDialect(Dialect):
+class _CompactSymbols:
+    """
+    Compact symbols for dialects that compile with a :class:`TPTPCompiler`
+    (see `TPTPCompiler(compact=True)`)
+    """
+
+    supports_compact_symbols = True
+
+    @classmethod
+    def compact(cls):
+        return cls(compiler_kwargs=dict(compact=True))
+
+    def restore_symbols(self, element, context: CompilationContext):
+        return restore_symbols(element, context.reverse_mapping)
+
+
+class TPTPProblemDialect(_CompactSymbols, Dialect):
     _parser_cls = TPTPProblemParser
     _compiler_cls = TPTPCompiler
 
@@ -18,7 +36,7 @@ class TPTPProblemDialect(Dialect):
 TPTPDialect = TPTPProblemDialect
 
 
-class TPTPProofDialect(Dialect):
+class TPTPProofDialect(_CompactSymbols, Dialect):
     _parser_cls = SimpleTPTPProofParser
     _compiler_cls = TPTPCompiler
 
@@ -0,0 +1,182 @@
+"""
+A scanner for the comment headers of TPTP problems. The header of a problem
+contains its metadata (domain, status, rating, SPC, syntax statistics, ...)
+in a fixed format:
+
+.. code::
+
+    % File     : SET001+1 : TPTP v8.1.0. Released v1.0.0.
+    % Domain   : Set Theory
+    % Status   : Theorem
+    % Rating   : 0.00 v8.1.0, 0.17 v7.5.0
+    % Syntax   : Number of formulae    :    4 (   1 unt;   0 def)
+    %            Number of atoms       :   10 (   2 equ)
+    % SPC      : FOF_THM_RFO_SEQ
+
+The grammar of :class:`gavel.dialects.tptp.parser.TPTPParser` ignores
+comments. The scanner reads the header block and the includes of a problem
+and stops at its first formula, so it runs at about the speed of the disk.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from gavel.config import settings
+
+_FIELD = re.compile(r"^%\s(\w[\w ]*?)\s*:\s?(.*)$")
+_CONTINUATION = re.compile(r"^%\s+:?\s*(.*)$")
+_INCLUDE = re.compile(r"^include\(\s*'([^']*)'")
+_COUNT = re.compile(r"Number of (\w+)\s*:\s*(\d+)")
+_RATING = re.compile(r"(\d+(?:\.\d+)?)\s+(v[\d.]+)")
+_FORMULA_START = re.compile(r"^(fof|cnf|tff|thf|tcf|tpi)\(")
+
+
+def _first_word(value):
+    if value:
+        return value.split()[0]
+    return None
+
+
+class ProblemHeader:
+    """
+    The metadata in the header of a TPTP problem. Attributes are `None`
+    if the header does not contain them.
+
+    Attributes
+    ----------
+    path: str
+        Location of the problem
+    name: str
+        Name of the problem (e.g. `SET001+1`)
+    domain: str
+        Abbreviation of the domain (e.g. `SET`)
+    fields: dict
+        All header fields as text, e.g. `fields["English"]`
+    status: str
+        SZS status (e.g. `Theorem`)
+    spc: str
+        Specialist problem class (e.g. `FOF_THM_RFO_SEQ`)
+    rating: float
+        The current rating
+    ratings: list
+        All ratings as `(rating, version)` pairs, the current one first
+    syntax: dict
+        The syntax statistics, e.g. `syntax["predicates"]`
+    includes: list
+        The included axiom files
+    """
+
+    __slots__ = (
+        "path",
+        "name",
+        "domain",
+        "fields",
+        "status",
+        "spc",
+        "rating",
+        "ratings",
+        "syntax",
+        "includes",
+    )
+
+    def __init__(self, path=None, fields=None, includes=None):
+        self.path = path
+        self.fields = fields or {}
+        self.includes = includes or []
+        self.name = None
+        self.domain = None
+        if path is not None:
+            self.name = os.path.splitext(os.path.basename(path))[0]
+            self.domain = os.path.basename(os.path.dirname(path))
+        self.status = _first_word(self.fields.get("Status"))
+        self.spc = _first_word(self.fields.get("SPC"))
+        self.ratings = [
+            (float(rating), version)
+            for rating, version in _RATING.findall(self.fields.get("Rating", ""))
+        ]
+        self.rating = self.ratings[0][0] if self.ratings else None
+        self.syntax = {
+            key.lower(): int(value)
+            for key, value in _COUNT.findall(self.fields.get("Syntax", ""))
+        }
+
+    @property
+    def formulas(self):
+        """
+        Number of formulas (or clauses in CNF problems)
+        """
+        return self.syntax.get("formulae", self.syntax.get("clauses"))
+
+    def __repr__(self):
+        return "ProblemHeader(%s)" % (self.name or self.path)
+
+
+def parse_header(lines, path=None) -> ProblemHeader:
+    """
+    Extracts the header from the `lines` of a problem. Stops at the first
+    formula.
+    """
+    fields = {}
+    includes = []
+    key = None
+    for line in lines:
+        line = line.rstrip()
+        if _FORMULA_START.match(line):
+            break
+        match = _INCLUDE.match(line)
+        if match:
+            includes.append(match.group(1))
+            continue
+        match = _FIELD.match(line)
+        if match:
+            key = match.group(1)
+            fields[key] = match.group(2).strip()
+            continue
+        match = _CONTINUATION.match(line)
+        if match and key is not None and match.group(1):
+            fields[key] += " " + match.group(1).strip()
+        elif not line.startswith("%") or line.startswith("%-"):
+            key = None
+    return ProblemHeader(path, fields, includes)
+
+
+def read_header(path) -> ProblemHeader:
+    """
+    Reads the header of the problem at `path`
+    """
+    with open(path, errors="replace") as fp:
+        return parse_header(fp, path=path)
+
+
+def problem_files(root=None):
+    """
+    Yields the paths of all problems below `root/Problems` (default:
+    `TPTP_ROOT`) in a deterministic order
+    """
+    for directory, dirs, files in os.walk(os.path.join(root or settings.TPTP_ROOT, "Problems")):
+        dirs.sort()
+        for name in sorted(files):
+            if name != "README":
+                yield os.path.join(directory, name)
+
+
+def scan(paths, jobs=None, chunksize=64):
+    """
+    Reads the headers of all problems at `paths` with `jobs` worker
+    processes (default: one per CPU). Yields the headers in the order of
+    `paths`.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        yield from map(read_header, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(read_header, paths, chunksize=chunksize)
+
+
+def scan_library(root=None, jobs=None):
+    """
+    Reads the headers of all problems in the TPTP library at `root`
+    (default: `TPTP_ROOT`)
+    """
+    return scan(problem_files(root), jobs=jobs)
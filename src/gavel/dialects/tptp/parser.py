@@ -1,9 +1,7 @@
 import os
 import re
 import sys
-from bs4 import BeautifulSoup
 from typing import Iterable
-import requests
 import multiprocessing as mp
 from itertools import chain
 try:
@@ -106,18 +104,35 @@ class TPTPTransformer(Transformer):
     def transform(self, tree):
         pass
 
-    def visit(self, obj: Tree, **kwargs):
-        if isinstance(obj, str):
-            return obj
-        meth = getattr(self, "visit_%s" % obj.data, None)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visitors = {}
 
-        if meth is None:
+    _visitors = {}
+    """
+    Dispatch table that maps rule names to visitor methods
+    """
+
+    @classmethod
+    def _resolve_visitor(cls, obj: Tree):
+        visitor = getattr(cls, "visit_%s" % obj.data, None)
+        if visitor is None:
             raise Exception(
                 "Visitor '{name}' not found for {cls}".format(
                     name=obj.data, cls=type(obj)
                 )
             )
-        return meth(obj, **kwargs)
+        cls._visitors[obj.data] = visitor
+        return visitor
+
+    def visit(self, obj: Tree, **kwargs):
+        if isinstance(obj, str):
+            return obj
+        try:
+            visitor = self._visitors[obj.data]
+        except KeyError:
+            visitor = self._resolve_visitor(obj)
+        return visitor(self, obj, **kwargs)
 
     def visit_file_source(self, obj):
         file_name = self.visit(obj.children[0]).replace("'", "")
@@ -321,16 +336,34 @@ class TPTPTransformer(Transformer):
         for c in obj:
             yield self.visit(c)
 
-lark_grammar = Lark.open(
-    os.path.join(os.path.dirname(__file__), "tptp.lark"),
-    start=["start"],
-    parser="lalr",
-    transformer=TPTPTransformer())
+_LARK_GRAMMAR = None
+
+
+def get_grammar() -> Lark:
+    """
+    Returns the TPTP parser. It is built on first use because building it
+    takes a significant share of gavel's startup time.
+    """
+    global _LARK_GRAMMAR
+    if _LARK_GRAMMAR is None:
+        _LARK_GRAMMAR = Lark.open(
+            os.path.join(os.path.dirname(__file__), "tptp.lark"),
+            start=["start"],
+            parser="lalr",
+            transformer=TPTPTransformer())
+    return _LARK_GRAMMAR
+
+
+def __getattr__(name):
+    # `lark_grammar` used to be built at import time
+    if name == "lark_grammar":
+        return get_grammar()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
 def do(string):
     try:
-        return list(lark_grammar.parse(string))
+        return list(get_grammar().parse(string))
     except Exception as e:
         raise Exception(str(e))
 
@@ -377,6 +410,14 @@ class TPTPParser(LogicParser, StringBasedParser):
         inputs = self.stream_lines(structure)
         return list(chain(*map(do, inputs)))
 
+    def parse_stream(self, stream, *args, **kwargs):
+        """
+        Yields the statements read from the file-like object `stream` as
+        soon as each of them is complete.
+        """
+        for statement in self.stream_lines(chain.from_iterable(stream)):
+            yield from do(statement)
+
 
 class TPTPProblemParser(ProblemParser, StringBasedParser):
     logic_parser_cls = TPTPParser
@@ -417,11 +458,27 @@ def get_all_files(path):
                 yield os.path.join(root, file)
 
 
-def all_problems(processor: StringBasedParser):
-    for f in get_all_files(os.path.join(settings.TPTP_ROOT, "Problems")):
-        with open(f, "r") as infile:
-            for problem in processor.parse(infile.readlines()):
-                yield f, problem
+def all_problems(processor: StringBasedParser, jobs=1, ordered=True, progress=None):
+    """
+    Parses all problems in the TPTP library with `processor` and yields
+    `(path, problem)` pairs (see :class:`gavel.dialects.tptp.corpus.Corpus`).
+    With several `jobs`, every worker process uses a copy of `processor`.
+    Each file is passed to `processor.parse` as a single string, not as a
+    list of lines. Files that cannot be parsed are skipped with a warning.
+    """
+    from gavel.dialects.tptp.corpus import Corpus
+    from gavel.dialects.tptp.header import problem_files
+
+    corpus = Corpus(
+        problem_files(settings.TPTP_ROOT),
+        parser=processor,
+        jobs=jobs,
+        ordered=ordered,
+        progress=progress,
+    )
+    yield from corpus
+    for path, error in corpus.failures:
+        print("Warning: Could not parse", path, "-", error)
 
 
 def _extract_pre(strings):
@@ -443,12 +500,31 @@ def all_available_problem_names(path, system=""):
         yield os.path.normpath(file).split(os.sep)[-2:]
 
 
-def _load_solution(domain, name):
+def load_solution(domain, name, system="E---2.5"):
+    """
+    Returns the proof of the problem `name` by `system`. Solutions are
+    taken from the local solutions store (see
+    :class:`gavel.dialects.tptp.solutions.SolutionStore`) if it contains
+    them and are fetched from tptp.org otherwise.
+    """
+    if os.path.exists(settings.SOLUTIONS_STORE):
+        from gavel.dialects.tptp.solutions import SolutionStore
+
+        with SolutionStore(settings.SOLUTIONS_STORE) as store:
+            solution = store.get(domain, name, system)
+            if solution is not None:
+                return solution.proof
+    return parse_solution(_load_solution(domain, name, system=system))
+
+
+def _load_solution(domain, name, system="E---2.5"):
+    import requests
+
     response = requests.get(
         "http://www.tptp.org/cgi-bin/SeeTPTP?Category=Solutions"
         "&Domain={domain}"
         "&File={problem}"
-        "&System=E---2.5".format(domain=domain, problem=name)
+        "&System={system}".format(domain=domain, problem=name, system=system)
     )
     raw_string = response.content.decode("utf-8")
     return "\n".join(_extract_pre(raw_string.split("\n")))
@@ -456,6 +532,8 @@ def _load_solution(domain, name):
 
 def parse_solution(prover_output):
     if prover_output:
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(
             prover_output
         )  # "".join(map(h.handle, prover_output.split("\n")))
@@ -0,0 +1,239 @@
+"""
+An offline store of TSTP solutions. A solutions directory (laid out as
+`<domain>/<problem>/<system>`, e.g. `SET/SET001+1/E---2.5.s`) or a tar
+archive of it is imported once into a compressed SQLite database, which
+answers lookups without network access:
+
+.. code::
+
+    store = SolutionStore()
+    store.import_path("TSTP/Solutions")
+    proof = store.get("SET", "SET001+1", "E---2.5").proof
+
+Solutions are only read, decompressed and parsed when their text or proof
+is accessed.
+"""
+import os
+import re
+import sqlite3
+import tarfile
+import zlib
+
+from gavel.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    domain TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    system TEXT NOT NULL,
+    status TEXT,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (domain, problem, system)
+);
+CREATE INDEX IF NOT EXISTS solutions_problem ON solutions(problem);
+CREATE INDEX IF NOT EXISTS solutions_system ON solutions(system);
+"""
+
+_STATUS = re.compile(rb"SZS status (\w+)")
+_SOLUTION_EXTENSIONS = (".s", ".out", ".txt")
+
+
+def _key(path):
+    """
+    Extracts `(domain, problem, system)` from the last three components of
+    `path`
+    """
+    parts = path.replace("\\", "/").split("/")
+    if len(parts) < 3:
+        return None
+    domain, problem, system = parts[-3:]
+    base, extension = os.path.splitext(system)
+    if extension in _SOLUTION_EXTENSIONS:
+        system = base
+    return domain, problem, system
+
+
+def _row(key, data):
+    status = _STATUS.search(data)
+    return key + (
+        status.group(1).decode("ascii") if status else None,
+        len(data),
+        zlib.compress(data),
+    )
+
+
+class StoredSolution:
+    """
+    A solution in a :class:`SolutionStore`. The compressed text is read from
+    the store when it is accessed, the proof is parsed on first access. Both
+    require the store to be open.
+
+    Attributes
+    ----------
+    domain, problem, system: str
+        The key of the solution
+    status: str
+        The SZS status reported in the solution (if any)
+    """
+
+    def __init__(self, domain, problem, system, status, store):
+        self.domain = domain
+        self.problem = problem
+        self.system = system
+        self.status = status
+        self._store = store
+        self._proof = None
+
+    @property
+    def text(self) -> str:
+        data = self._store._data(self.domain, self.problem, self.system)
+        return zlib.decompress(data).decode("utf-8", "replace")
+
+    @property
+    def proof(self):
+        """
+        The parsed proof, `None` if the solution does not report a success
+        """
+        from gavel.dialects.tptp.parser import SimpleTPTPProofParser
+        from gavel.logic import status
+
+        szs_status = status.get_status(self.status)
+        if self._proof is None and szs_status is not None:
+            if issubclass(szs_status, status.StatusSuccess):
+                # Comments of E start with '#' and are not valid TPTP
+                text = "\n".join(
+                    line for line in self.text.split("\n") if not line.startswith("#")
+                )
+                self._proof = SimpleTPTPProofParser().parse(text)
+        return self._proof
+
+    def __repr__(self):
+        return "StoredSolution(%s/%s/%s)" % (self.domain, self.problem, self.system)
+
+
+class SolutionStore:
+    """
+    Solutions keyed by `(domain, problem, system)`, stored at `path`
+    (default: `SOLUTIONS_STORE`)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.SOLUTIONS_STORE
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def _insert(self, rows):
+        with self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO solutions (domain, problem, system, status, size, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._connection.total_changes - before
+
+    def import_directory(self, path) -> int:
+        """
+        Imports all solutions below the directory `path`. Returns the number
+        of imported solutions.
+        """
+
+        def rows():
+            for directory, dirs, files in os.walk(path):
+                for name in files:
+                    source = os.path.join(directory, name)
+                    key = _key(os.path.relpath(source, path))
+                    if key is not None:
+                        with open(source, "rb") as fp:
+                            yield _row(key, fp.read())
+
+        return self._insert(rows())
+
+    def import_archive(self, path) -> int:
+        """
+        Imports all solutions in the (optionally compressed) tar archive at
+        `path`. Returns the number of imported solutions.
+        """
+
+        def rows():
+            with tarfile.open(path) as archive:
+                for member in archive:
+                    key = _key(member.name) if member.isfile() else None
+                    if key is not None:
+                        yield _row(key, archive.extractfile(member).read())
+
+        return self._insert(rows())
+
+    def import_path(self, path) -> int:
+        """
+        Imports a solutions directory or archive
+        """
+        if os.path.isdir(path):
+            return self.import_directory(path)
+        return self.import_archive(path)
+
+    def solutions(self, domain=None, problem=None, system=None, status=None):
+        """
+        Yields all solutions that match the given filters. Their texts are
+        only read from the store when they are accessed.
+        """
+        conditions = []
+        parameters = []
+        for column, value in (
+            ("domain", domain),
+            ("problem", problem),
+            ("system", system),
+            ("status", status),
+        ):
+            if value is not None:
+                conditions.append("%s = ?" % column)
+                parameters.append(value)
+        query = "SELECT domain, problem, system, status FROM solutions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY domain, problem, system"
+        for row in self._connection.execute(query, parameters):
+            yield StoredSolution(*row, self)
+
+    def get(self, domain, problem, system) -> StoredSolution:
+        """
+        Returns the solution of `problem` by `system` or `None`
+        """
+        return next(self.solutions(domain=domain, problem=problem, system=system), None)
+
+    def _data(self, domain, problem, system):
+        row = self._connection.execute(
+            "SELECT data FROM solutions WHERE domain = ? AND problem = ? AND system = ?",
+            (domain, problem, system),
+        ).fetchone()
+        if row is None:
+            raise KeyError("%s/%s/%s is not in the store" % (domain, problem, system))
+        return row[0]
+
+    def systems(self, domain, problem):
+        """
+        The systems that have a solution for `problem`
+        """
+        return [
+            system
+            for system, in self._connection.execute(
+                "SELECT system FROM solutions WHERE domain = ? AND problem = ? ORDER BY system",
+                (domain, problem),
+            )
+        ]
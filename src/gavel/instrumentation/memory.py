@@ -0,0 +1,173 @@
+"""
+Memory profiling of pipeline stages with :mod:`tracemalloc`.
+
+While :func:`profile` is active, every stage (see
+:meth:`gavel.instrumentation.stages.Instrumentation.stage`) records
+
+* `memory_peak`: the peak of traced memory during the stage, relative to the
+  traced memory at its start,
+* `memory_retained`: the traced memory that is still allocated at the end of
+  the stage (e.g. the parsed problem) and
+* `memory_top`: the allocation sites that retained the most memory.
+
+All values are in bytes. Tracing slows down the profiled operations
+considerably and the measurements are only meaningful if a single pipeline
+runs at a time.
+
+Before Python 3.9, :mod:`tracemalloc` cannot reset its peak. The peak of a
+stage is then only exact if the stage exceeds the peak of everything traced
+before it; otherwise the larger of the memory at its start and its end is
+reported.
+"""
+import json
+import threading
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from gavel.instrumentation import stages
+
+_IGNORED_FILES = (
+    __file__,
+    stages.__file__,
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<unknown>",
+)
+
+# Python 3.9+
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+
+class MemoryInstrument(stages.Instrument):
+    """
+    Records the memory usage of every stage. Requires :mod:`tracemalloc` to
+    be tracing.
+
+    Parameters
+    ----------
+    top: int
+        Number of allocation sites that are recorded per stage
+    """
+
+    def __init__(self, top=10):
+        self.top = top
+        self._frames = []
+        self._lock = threading.Lock()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def stage_started(self, record: stages.StageRecord):
+        with self._lock:
+            snapshot = self._snapshot() if self.top else None
+            current, peak = tracemalloc.get_traced_memory()
+            if _reset_peak is not None:
+                if self._frames:
+                    # The peak is reset for this stage, hence the enclosing
+                    # stage has to remember its own peak
+                    self._frames[-1]["peak"] = max(self._frames[-1]["peak"], peak)
+                _reset_peak()
+            self._frames.append(
+                dict(start=current, peak=current, traced_peak=peak, snapshot=snapshot)
+            )
+
+    def stage_finished(self, record: stages.StageRecord):
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            frame = self._frames.pop()
+            if _reset_peak is None and peak <= frame["traced_peak"]:
+                # The stage stayed below the peak of earlier allocations
+                peak = current
+            peak = max(frame["peak"], peak)
+            if self._frames:
+                self._frames[-1]["peak"] = max(self._frames[-1]["peak"], peak)
+            record.metrics["memory_peak"] = peak - frame["start"]
+            record.metrics["memory_retained"] = current - frame["start"]
+            if frame["snapshot"] is not None:
+                record.metrics["memory_top"] = self._top_sites(frame["snapshot"])
+
+    def _top_sites(self, start_snapshot):
+        differences = self._snapshot().compare_to(start_snapshot, "lineno")
+        return [
+            OrderedDict(
+                site="%s:%d" % (d.traceback[0].filename, d.traceback[0].lineno),
+                size=d.size_diff,
+                count=d.count_diff,
+            )
+            for d in differences[: self.top]
+            if d.size_diff > 0
+        ]
+
+
+@contextmanager
+def profile(top=10, frames=1):
+    """
+    Traces the memory usage of all stages that run within this context.
+
+    Parameters
+    ----------
+    top: int
+        Number of allocation sites that are recorded per stage
+    frames: int
+        Number of frames stored per allocation by :mod:`tracemalloc`
+
+    Returns
+    -------
+        A :class:`gavel.instrumentation.stages.RecordCollector` with the
+        records of all profiled stages
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    collector = stages.RecordCollector()
+    instrument = MemoryInstrument(top=top)
+    stages.install(instrument)
+    stages.install(collector)
+    try:
+        yield collector
+    finally:
+        stages.uninstall(collector)
+        stages.uninstall(instrument)
+        if started:
+            tracemalloc.stop()
+
+
+def as_json(records) -> str:
+    return json.dumps(
+        [
+            record.as_dict() if isinstance(record, stages.StageRecord) else record
+            for record in records
+        ],
+        indent=1,
+    )
+
+
+def summarize(records, top=3) -> str:
+    """
+    Renders the memory usage of `records` as a table followed by the `top`
+    allocation sites of every stage
+    """
+    row = "{:<16}{:>14}{:>16}"
+    lines = [row.format("stage", "peak [KiB]", "retained [KiB]")]
+    sites = []
+    for record in records:
+        d = record.as_dict() if isinstance(record, stages.StageRecord) else record
+        lines.append(
+            row.format(
+                d["stage"],
+                d.get("memory_peak", 0) // 1024,
+                d.get("memory_retained", 0) // 1024,
+            )
+        )
+        for site in d.get("memory_top", [])[:top]:
+            sites.append(
+                "  {:<14}{:>10} KiB  {}".format(d["stage"], site["size"] // 1024, site["site"])
+            )
+    if sites:
+        lines.append("")
+        lines.append("Top allocation sites:")
+        lines.extend(sites)
+    return "\n".join(lines)
@@ -0,0 +1,250 @@
+"""
+CPU profiling of whole runs and of their stages (see
+:meth:`gavel.instrumentation.stages.Instrumentation.stage`).
+
+Two profilers are available:
+
+* :class:`DeterministicProfiler` uses :mod:`cProfile` and keeps a separate
+  profile per stage. The profiles are saved in the :mod:`pstats` format,
+  e.g. for `snakeviz` or `gprof2dot`.
+* :class:`SamplingProfiler` periodically samples the stack of the profiled
+  thread. It slows the profiled code down much less and saves the samples as
+  collapsed stacks (one `frame;frame;frame count` line per stack, the first
+  frame is the stage), which can be rendered by `flamegraph.pl` or
+  `speedscope`.
+
+Only stages that run in the thread that started the profiler are profiled
+separately.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from collections import OrderedDict
+
+from gavel.instrumentation import stages
+
+PROFILERS = ("cprofile", "sampling")
+
+_NO_STAGE = "main"
+
+
+def _shorten(filename):
+    """
+    Strips the longest `sys.path` entry from `filename`
+    """
+    prefixes = [p for p in sys.path if p and filename.startswith(p + os.sep)]
+    if prefixes:
+        return filename[len(max(prefixes, key=len)) + 1 :]
+    return filename
+
+
+class Profiler(stages.Instrument):
+    """
+    Base class for profilers. A profiler is an instrument that is installed
+    for all stages between :meth:`start` and :meth:`stop`.
+    """
+
+    def __init__(self):
+        self._thread = None
+
+    def _owns(self):
+        return threading.get_ident() == self._thread
+
+    def start(self):
+        self._thread = threading.get_ident()
+        stages.install(self)
+
+    def stop(self):
+        stages.uninstall(self)
+
+    def save(self, prefix):
+        """
+        Writes the results to files starting with `prefix` and returns their
+        paths
+        """
+        raise NotImplementedError
+
+    def hot_functions(self, top=20):
+        """
+        Returns up to `top` tuples `(function, self, total)` ordered by the
+        time spent in the functions themselves
+        """
+        raise NotImplementedError
+
+    def summarize(self, top=20) -> str:
+        row = "{:>12}{:>12}  {}"
+        lines = [row.format("self", "total", "function")]
+        for function, own, total in self.hot_functions(top):
+            lines.append(row.format(own, total, function))
+        return "\n".join(lines)
+
+
+class DeterministicProfiler(Profiler):
+    """
+    Profiles with :mod:`cProfile`. Every stage is recorded in its own
+    profile, time spent outside of stages is recorded in the `main` profile.
+    """
+
+    def __init__(self):
+        super(DeterministicProfiler, self).__init__()
+        self.profiles = OrderedDict([(_NO_STAGE, cProfile.Profile())])
+        self._active = []
+
+    def start(self):
+        super(DeterministicProfiler, self).start()
+        self._active = [self.profiles[_NO_STAGE]]
+        self._active[-1].enable()
+
+    def stop(self):
+        self._active.pop().disable()
+        super(DeterministicProfiler, self).stop()
+
+    def stage_started(self, record: stages.StageRecord):
+        if not self._owns():
+            return
+        self._active[-1].disable()
+        profile = self.profiles.get(record.stage)
+        if profile is None:
+            profile = self.profiles[record.stage] = cProfile.Profile()
+        self._active.append(profile)
+        profile.enable()
+
+    def stage_finished(self, record: stages.StageRecord):
+        if not self._owns():
+            return
+        self._active.pop().disable()
+        self._active[-1].enable()
+
+    def statistics(self) -> pstats.Stats:
+        """
+        The combined statistics of all stages (`None` if nothing was
+        recorded)
+        """
+        profiles = [p for p in self.profiles.values() if p.getstats()]
+        if not profiles:
+            return None
+        statistics = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            statistics.add(profile)
+        return statistics
+
+    def save(self, prefix):
+        statistics = self.statistics()
+        if statistics is None:
+            return []
+        paths = [prefix + ".pstats"]
+        statistics.dump_stats(paths[0])
+        for stage, profile in self.profiles.items():
+            if profile.getstats():
+                paths.append("%s.%s.pstats" % (prefix, stage))
+                profile.dump_stats(paths[-1])
+        return paths
+
+    def hot_functions(self, top=20):
+        statistics = self.statistics()
+        if statistics is None:
+            return []
+        entries = sorted(statistics.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            (
+                "%s (%s:%d)" % (function, _shorten(filename), line),
+                "%.3fs" % own,
+                "%.3fs" % total,
+            )
+            for (filename, line, function), (_, _, own, total, _) in entries[:top]
+        ]
+
+
+class SamplingProfiler(Profiler):
+    """
+    Samples the stack of the thread that started the profiler every
+    `interval` seconds from a background thread.
+    """
+
+    def __init__(self, interval=0.005):
+        super(SamplingProfiler, self).__init__()
+        self.interval = interval
+        self.samples = Counter()
+        self._stages = [_NO_STAGE]
+        self._running = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        super(SamplingProfiler, self).start()
+        self._running.set()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._running.clear()
+        self._sampler.join()
+        super(SamplingProfiler, self).stop()
+
+    def stage_started(self, record: stages.StageRecord):
+        if self._owns():
+            self._stages.append(record.stage)
+
+    def stage_finished(self, record: stages.StageRecord):
+        if self._owns():
+            self._stages.pop()
+
+    def _sample(self):
+        labels = {}
+        while self._running.is_set():
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self._thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = "%s (%s:%d)" % (
+                        code.co_name,
+                        _shorten(code.co_filename),
+                        code.co_firstlineno,
+                    )
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                stack.append(self._stages[-1])
+                self.samples[tuple(reversed(stack))] += 1
+
+    def save(self, prefix):
+        path = prefix + ".collapsed"
+        with open(path, "w") as fp:
+            for stack, count in self.samples.most_common():
+                fp.write("%s %d\n" % (";".join(stack), count))
+        return [path]
+
+    def hot_functions(self, top=20):
+        own = Counter()
+        total = Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            # Recursive functions are only counted once per sample
+            for function in set(stack[1:]):
+                total[function] += count
+        samples = sum(self.samples.values()) or 1
+        return [
+            (
+                function,
+                "%.1f%%" % (100.0 * count / samples),
+                "%.1f%%" % (100.0 * total[function] / samples),
+            )
+            for function, count in own.most_common(top)
+        ]
+
+
+def create_profiler(name) -> Profiler:
+    """
+    Creates the profiler `name` (one of :data:`PROFILERS`)
+    """
+    if name == "cprofile":
+        return DeterministicProfiler()
+    if name == "sampling":
+        return SamplingProfiler()
+    raise ValueError("Unknown profiler '%s'" % name)
@@ -0,0 +1,263 @@
+"""
+Instrumentation of the stages of gavel's pipelines (e.g. the stages of
+:meth:`gavel.prover.base.interface.BaseProverInterface.prove`).
+
+Every stage is wrapped in :meth:`Instrumentation.stage`, which measures wall
+time, CPU time and the size of the stage's input and output. Additional
+measurements can be plugged in by subclassing :class:`Instrument`.
+"""
+import contextvars
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_FORMULA_START = re.compile(r"^\s*(fof|cnf|tff|thf|tcf|tpi)\(", re.M)
+
+_GLOBAL_INSTRUMENTS = []
+
+# The records of the stages that are running in the current thread or task
+_ACTIVE_RECORDS = contextvars.ContextVar("gavel_active_records", default=())
+
+
+class StageRecord:
+    """
+    Measurements of a single execution of a stage.
+
+    Attributes
+    ----------
+    stage: str
+        Name of the stage
+    wall_time: float
+        Elapsed wall clock time in seconds
+    cpu_time: float
+        CPU time spent by the executing thread in seconds
+    child_cpu_time: float
+        CPU time spent by the child processes that were started by this
+        stage via :func:`check_output` (e.g. a prover binary) in seconds.
+        `None` on platforms that cannot measure it.
+    input_bytes, output_bytes: int
+        Size of textual input and output of the stage (if applicable)
+    input_formulas, output_formulas: int
+        Number of formulas in the input and output of the stage (if known)
+    metrics: dict
+        Additional values recorded by instruments
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.wall_time = None
+        self.cpu_time = None
+        self.child_cpu_time = None
+        self.input_bytes = None
+        self.input_formulas = None
+        self.output_bytes = None
+        self.output_formulas = None
+        self.metrics = {}
+
+    def set_output(self, output):
+        """
+        Measures `output` as result of this stage and returns it unchanged.
+        """
+        self.output_bytes, self.output_formulas = measure(output)
+        return output
+
+    def as_dict(self):
+        d = OrderedDict(
+            stage=self.stage,
+            wall_time=self.wall_time,
+            cpu_time=self.cpu_time,
+            child_cpu_time=self.child_cpu_time,
+            input_bytes=self.input_bytes,
+            input_formulas=self.input_formulas,
+            output_bytes=self.output_bytes,
+            output_formulas=self.output_formulas,
+        )
+        d.update(self.metrics)
+        return d
+
+
+def measure(obj):
+    """
+    Estimates the size of `obj` in bytes and formulas.
+
+    Returns
+    -------
+        A tuple `(bytes, formulas)`. Either value is `None` if it is not
+        applicable to `obj`.
+    """
+    if obj is None:
+        return None, None
+    if isinstance(obj, str):
+        size = len(obj) if obj.isascii() else len(obj.encode("utf-8"))
+        return size, len(_FORMULA_START.findall(obj))
+    if isinstance(obj, os.PathLike) and os.path.isfile(obj):
+        return os.path.getsize(obj), None
+    if isinstance(obj, bytes):
+        return len(obj), len(_FORMULA_START.findall(obj.decode("utf-8", "replace")))
+    if hasattr(obj, "premises") and hasattr(obj, "conjectures"):
+        return None, len(obj.premises) + len(obj.conjectures)
+    if hasattr(obj, "steps"):
+        return None, len(obj.steps)
+    return None, None
+
+
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def check_output(args, **kwargs) -> bytes:
+    """
+    Like :func:`subprocess.check_output`, but adds the CPU time of the
+    process (and of the children it waited for) to the `child_cpu_time` of
+    all running stages. The time is taken from the resource usage of this
+    very process, hence stages that run concurrently in several threads are
+    measured correctly.
+    """
+    if not hasattr(os, "wait4"):
+        return subprocess.check_output(args, **kwargs)
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, **kwargs)
+    try:
+        with process.stdout:
+            output = process.stdout.read()
+        _, status, usage = os.wait4(process.pid, 0)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    # The process has been reaped, Popen must not wait for it again
+    process.returncode = _exit_code(status)
+    for record in _ACTIVE_RECORDS.get():
+        record.child_cpu_time += usage.ru_utime + usage.ru_stime
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args, output=output)
+    return output
+
+
+class Instrument:
+    """
+    Base class for instruments that hook into every stage
+    """
+
+    def stage_started(self, record: StageRecord):
+        pass
+
+    def stage_finished(self, record: StageRecord):
+        pass
+
+
+class RecordCollector(Instrument):
+    """
+    Collects the records of all stages it observes, e.g. across a batch of
+    problems.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def stage_finished(self, record: StageRecord):
+        with self._lock:
+            self.records.append(record)
+
+
+def install(instrument: Instrument):
+    """
+    Registers `instrument` for all stages of all pipelines
+    """
+    _GLOBAL_INSTRUMENTS.append(instrument)
+
+
+def uninstall(instrument: Instrument):
+    _GLOBAL_INSTRUMENTS.remove(instrument)
+
+
+class Instrumentation:
+    """
+    A collection of instruments. Instances do not store any per-call state and
+    may be shared between threads.
+    """
+
+    def __init__(self, *instruments: Instrument):
+        self.instruments = list(instruments)
+
+    @contextmanager
+    def stage(self, name, payload=None):
+        """
+        Context manager that measures the enclosed stage. `payload` is the
+        input of this stage. The output can be registered via
+        :meth:`StageRecord.set_output`.
+        """
+        record = StageRecord(name)
+        record.input_bytes, record.input_formulas = measure(payload)
+        instruments = self.instruments + _GLOBAL_INSTRUMENTS
+        for instrument in instruments:
+            instrument.stage_started(record)
+        if hasattr(os, "wait4"):
+            record.child_cpu_time = 0.0
+        token = _ACTIVE_RECORDS.set(_ACTIVE_RECORDS.get() + (record,))
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - wall_start
+            record.cpu_time = time.thread_time() - cpu_start
+            _ACTIVE_RECORDS.reset(token)
+            for instrument in reversed(instruments):
+                instrument.stage_finished(record)
+
+
+def write_json_lines(records, fp, **fields):
+    """
+    Writes one JSON object per record to `fp`. Additional `fields` (e.g. the
+    name of the problem) are added to every line.
+    """
+    for record in records:
+        d = OrderedDict(fields)
+        d.update(record.as_dict() if isinstance(record, StageRecord) else record)
+        fp.write(json.dumps(d) + "\n")
+
+
+def read_json_lines(fp):
+    return [json.loads(line) for line in fp if line.strip()]
+
+
+def summarize(records) -> str:
+    """
+    Aggregates `records` (:class:`StageRecord` instances or their dictionary
+    representation) per stage and renders them as a table.
+    """
+    totals = OrderedDict()
+    for record in records:
+        d = record.as_dict() if isinstance(record, StageRecord) else record
+        total = totals.setdefault(
+            d["stage"],
+            dict(count=0, wall_time=0.0, cpu_time=0.0, input_bytes=0, output_bytes=0),
+        )
+        total["count"] += 1
+        for key in ("wall_time", "cpu_time", "input_bytes", "output_bytes"):
+            total[key] += d.get(key) or 0
+    row = "{:<16}{:>8}{:>12}{:>12}{:>12}{:>14}{:>14}"
+    lines = [
+        row.format("stage", "count", "wall [s]", "mean [s]", "cpu [s]", "in [bytes]", "out [bytes]")
+    ]
+    for stage, total in totals.items():
+        lines.append(
+            row.format(
+                stage,
+                total["count"],
+                "%.4f" % total["wall_time"],
+                "%.4f" % (total["wall_time"] / total["count"]),
+                "%.4f" % total["cpu_time"],
+                total["input_bytes"],
+                total["output_bytes"],
+            )
+        )
+    return "\n".join(lines)
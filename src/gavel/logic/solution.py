@@ -1,11 +1,15 @@
 from abc import ABC
 from enum import Enum
+from typing import TYPE_CHECKING
 from typing import Iterable
 from typing import List
-import graphviz as gv
 from gavel.logic.logic import LogicElement
 from gavel.logic import status
 
+if TYPE_CHECKING:
+    # Imported on demand by Proof.get_graph, it is slow to import
+    import graphviz
+
 
 class ProofStep(ABC):
     def is_axiom(self):
@@ -39,6 +43,8 @@ class Proof:
         self.steps = steps or []
         self.status = status
         self._used_axioms = None
+        # Measurements of the stages that produced this proof
+        self.stages = []
 
     @property
     def used_axioms(self):
@@ -49,7 +55,9 @@ class Proof:
     def _iterate_used_axioms(self):
         raise NotImplementedError
 
-    def get_graph(self) -> gv.Digraph:
+    def get_graph(self) -> "graphviz.Digraph":
+        import graphviz as gv
+
         g = gv.Digraph()
         labels = {}
         for s in self.steps:
@@ -1,4 +1,152 @@
-import pkg_resources
+"""
+Discovery of plugins. Plugins announce their dialects, provers and command
+line sources through entry points, e.g.
 
-for entry_point in pkg_resources.iter_entry_points("gavel.plugins"):
-    entry_point.load()
+.. code::
+
+    entry_points={
+        "gavel.dialects": ["owl = gavel_owl.dialect:OWLDialect"],
+        "gavel.provers": ["myprover = my_package.interface:MyProver"],
+        "cli": ["owl = gavel_owl.cli:owl_cli"],
+    }
+
+Only the metadata of the entry points is read at startup. The referenced
+objects are imported when they are requested for the first time (see
+:func:`gavel.dialects.base.dialect.get_dialect` and
+:func:`gavel.prover.registry.get_prover`). The discovered entry points are
+cached in `GAVEL_PLUGIN_CACHE` until the installed distributions change.
+
+Entry points in the legacy group `gavel.plugins` are imported as a whole by
+:func:`load_plugins`.
+"""
+import importlib
+import json
+import os
+import sys
+
+from gavel.config import settings
+
+GROUPS = ("gavel.dialects", "gavel.provers", "gavel.plugins", "cli")
+
+_DISCOVERED = None
+_LOADED = False
+
+
+_METADATA_SUFFIXES = (".dist-info", ".egg-info", ".egg")
+
+
+def _fingerprint():
+    """
+    Identifies the installed distributions by the names and modification
+    times of their metadata. Other files on the path (e.g. in the working
+    directory) do not affect it.
+    """
+    fingerprint = []
+    working_directory = os.path.abspath(os.curdir)
+    for path in sys.path:
+        if not path or os.path.abspath(path) == working_directory:
+            continue
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(_METADATA_SUFFIXES):
+                        fingerprint.append(
+                            [path, entry.name, entry.stat().st_mtime_ns]
+                        )
+        except OSError:
+            # Missing directories and zip archives carry no metadata
+            pass
+    fingerprint.sort()
+    return fingerprint
+
+
+def _scan():
+    from importlib import metadata
+
+    eps = metadata.entry_points()
+    discovered = {}
+    for group in GROUPS:
+        if hasattr(eps, "select"):
+            selected = eps.select(group=group)
+        else:
+            selected = eps.get(group, [])
+        discovered[group] = [[ep.name, ep.value] for ep in selected]
+    return discovered
+
+
+def _read_cache(path):
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, cache):
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "w") as fp:
+            json.dump(cache, fp)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The cache is an optimisation only
+        pass
+
+
+def discover(refresh=False):
+    """
+    Returns the entry points of all groups in :data:`GROUPS` as a dictionary
+    that maps groups to lists of `[name, reference]` pairs.
+
+    Parameters
+    ----------
+    refresh: bool
+        Ignore the cache and read the metadata of all installed distributions
+    """
+    global _DISCOVERED
+    if _DISCOVERED is None or refresh:
+        path = settings.PLUGIN_CACHE
+        fingerprint = _fingerprint()
+        cache = _read_cache(path) if path else None
+        if cache and not refresh and cache.get("fingerprint") == fingerprint:
+            _DISCOVERED = cache.get("entry_points")
+        else:
+            _DISCOVERED = _scan()
+            updated = dict(fingerprint=fingerprint, entry_points=_DISCOVERED)
+            # Unchanged caches are not rewritten
+            if path and updated != cache:
+                _write_cache(path, updated)
+    return _DISCOVERED
+
+
+def entry_points(group):
+    """
+    Returns the `(name, reference)` pairs registered for `group`
+    """
+    return [tuple(entry) for entry in discover().get(group, [])]
+
+
+def load(reference):
+    """
+    Imports the object referenced by `reference` (`module:attribute`)
+    """
+    module_name, _, attributes = reference.partition(":")
+    obj = importlib.import_module(module_name.strip())
+    for attribute in filter(None, attributes.strip().split(".")):
+        obj = getattr(obj, attribute)
+    return obj
+
+
+def load_plugins():
+    """
+    Imports all plugins of the legacy group `gavel.plugins`. Subsequent calls
+    do nothing.
+    """
+    global _LOADED
+    if not _LOADED:
+        _LOADED = True
+        for _, reference in entry_points("gavel.plugins"):
+            load(reference)
@@ -1,2 +0,0 @@
-from gavel.prover.vampire import interface
-from gavel.prover.eprover import interface
@@ -1,12 +1,65 @@
+import os
+import tempfile
 from typing import Iterable
 
+from gavel.dialects.base.compiler import CompilationContext
 from gavel.dialects.base.dialect import Compiler
 from gavel.dialects.base.dialect import Dialect, IdentityDialect
 from gavel.dialects.base.dialect import Problem
+from gavel.instrumentation.stages import Instrumentation
 from gavel.logic.logic import LogicElement
 from gavel.logic.solution import Proof
 
 
+class ProblemFile(os.PathLike):
+    """
+    A problem that has been written to a file, e.g. to be passed to a prover
+    binary. Temporary problem files are deleted by :meth:`remove`.
+    """
+
+    def __init__(self, path, delete=True):
+        self.path = path
+        self.delete = delete
+
+    @classmethod
+    def temporary(cls, suffix=".p"):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        return cls(path)
+
+    def open(self, mode="w"):
+        return open(self.path, mode)
+
+    def remove(self):
+        if self.delete and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __fspath__(self):
+        return self.path
+
+    def __str__(self):
+        return self.path
+
+
+class ProverContext:
+    """
+    Holds the state of a single call of :meth:`BaseProverInterface.prove`.
+    Prover interfaces must not store per-call state on the instance, hence a
+    single instance can serve several threads or asyncio tasks at once.
+
+    Attributes
+    ----------
+    flags: list
+        The flags used for this call. Initially a copy of the prover's flags
+    compilation: :class:`gavel.dialects.base.compiler.CompilationContext`
+        The context used to compile the problem into the prover's format
+    """
+
+    def __init__(self, flags=None):
+        self.flags = list(flags or [])
+        self.compilation = CompilationContext()
+
+
 class BaseProverInterface:
     """
     Base class for prover support
@@ -18,9 +71,25 @@ class BaseProverInterface:
     and parse from a format supported by the prover
     """
 
+    _default_flags = []
+    """
+    Command line flags that are always required to talk to the prover, e.g.
+    to select the input and output syntax
+    """
+
     def __init__(self, *args, **kwargs):
         self.flags = []
-        self.dialect = self._prover_dialect_cls()
+        self.compact_symbols = kwargs.get("compact_symbols", False)
+        if self.compact_symbols:
+            if not self._prover_dialect_cls.supports_compact_symbols:
+                raise ValueError(
+                    "%s does not support compact symbols: its dialect '%s' cannot compile them"
+                    % (type(self).__name__, self._prover_dialect_cls._identifier())
+                )
+            self.dialect = self._prover_dialect_cls.compact()
+        else:
+            self.dialect = self._prover_dialect_cls()
+        self.instrumentation = kwargs.get("instrumentation") or Instrumentation()
 
     def prove(self, problem: Problem, *args, **kwargs) -> Proof:
         """
@@ -36,17 +105,42 @@ class BaseProverInterface:
 
         Returns
         -------
-            A proof if the proof was successful
+            A proof if the proof was successful. The measurements of each
+            stage are available in `Proof.stages`.
         """
+        context = self._create_context(problem)
+        stages = []
+        with self.instrumentation.stage("bootstrap", problem) as record:
+            stages.append(record)
+            problem_instance = record.set_output(
+                self._bootstrap_problem(problem, context=context)
+            )
+        with self.instrumentation.stage("submit", problem_instance) as record:
+            stages.append(record)
+            raw_proof_result = record.set_output(
+                self._submit_problem(problem_instance, context=context)
+            )
+        with self.instrumentation.stage("post_process", raw_proof_result) as record:
+            stages.append(record)
+            prover_output = record.set_output(
+                self._post_process_proof(raw_proof_result, context=context)
+            )
+        with self.instrumentation.stage("build", prover_output) as record:
+            stages.append(record)
+            proof = record.set_output(
+                self._build_proof(prover_output, problem, context=context)
+            )
+        if proof is not None:
+            proof.stages = stages
+        return proof
+
+    def _create_context(self, problem: Problem = None) -> ProverContext:
+        """
+        Creates the context for a single call of :meth:`prove`
+        """
+        return ProverContext(flags=self.flags)
 
-        return self._build_proof(
-            self._post_process_proof(
-                self._submit_problem(self._bootstrap_problem(problem))
-            ),
-            problem,
-        )
-
-    def _bootstrap_problem(self, problem: Problem):
+    def _bootstrap_problem(self, problem: Problem, context: ProverContext = None):
         """
         Transforms the given `problem` into a format that is understood
         by this prover.
@@ -57,12 +151,16 @@ class BaseProverInterface:
         problem
             A problem instance
 
+        context
+            The context of this call
+
         Returns
         -------
 
         A problem format that is understood by the prover
         """
-        return self.dialect.compile(problem)
+        context = context or self._create_context(problem)
+        return self.dialect.compile(problem, context=context.compilation)
 
     def _submit_problem(self, problem_instance, *args, **kwargs):
         """
@@ -75,6 +173,9 @@ class BaseProverInterface:
         problem_instance
             A problem
 
+        context
+            The context of this call (passed as keyword argument)
+
         Returns
         -------
 
@@ -82,7 +183,7 @@ class BaseProverInterface:
         """
         raise NotImplementedError
 
-    def _post_process_proof(self, raw_proof_result):
+    def _post_process_proof(self, raw_proof_result, context: ProverContext = None):
         """
         Apply some transformation to make the output of the prover processable
         by `_prover_dialect_cls`
@@ -97,7 +198,9 @@ class BaseProverInterface:
 
         return raw_proof_result
 
-    def _build_proof(self, prover_output, problem: Problem) -> Proof:
+    def _build_proof(
+        self, prover_output, problem: Problem, context: ProverContext = None
+    ) -> Proof:
         """
         Parses the proof returned by the prover.
 
@@ -111,7 +214,26 @@ class BaseProverInterface:
         -------
             A proof object
         """
-        return self.dialect.parse(prover_output)
+        proof = self.dialect.parse(prover_output)
+        if self.compact_symbols and context is not None:
+            self.dialect.restore_symbols(proof, context.compilation)
+        return proof
+
+    @classmethod
+    def _time_limit_flags(cls, seconds):
+        """
+        Command line flags that limit the runtime of the prover to `seconds`.
+
+        Parameters
+        ----------
+        seconds: int
+            The time limit in seconds
+
+        Returns
+        -------
+            A list of flags. Empty, if the prover does not support time limits
+        """
+        return []
 
 
 class BaseResultHandler:
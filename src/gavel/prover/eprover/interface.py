@@ -3,9 +3,11 @@ from gavel.dialects.base.dialect import Problem
 from gavel.dialects.tptp.dialect import TPTPProofDialect
 from gavel.prover.base.interface import BaseProverInterface
 from gavel.prover.base.interface import BaseResultHandler
-import subprocess as sub
-import tempfile
+from gavel.prover.base.interface import ProblemFile
+from gavel.instrumentation import stages
 import os
+import shlex
+from itertools import chain
 
 
 class EDialect(TPTPProofDialect):
@@ -19,26 +21,50 @@ class EDialect(TPTPProofDialect):
 @register_prover("eprover")
 class EProverInterface(BaseProverInterface):
     _prover_dialect_cls = EDialect
+    _default_flags = ["--output-level=2", "--tptp-in", "--tstp-out"]
 
-    def _bootstrap_problem(self, problem: Problem):
-        problem_string = "\n".join(self.dialect.compile(l) for l in problem.premises)
-        for conjecture in problem.conjectures:
-            problem_string += self.dialect.compile(conjecture)
-        return problem_string
-
-    def _submit_problem(self, problem_instance, *args, **kwargs):
-        with tempfile.NamedTemporaryFile() as tf:
-            tf.write(problem_instance.encode())
-            tf.seek(0)
-            result = sub.check_output(
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flags = kwargs.get("flags", []) or list(self._default_flags)
+        # A command line that replaces the binary at `EPROVER`
+        self.executable = kwargs.get("executable")
+
+    def _command(self):
+        if self.executable:
+            return shlex.split(self.executable)
+        # `EPROVER` is the path of the binary, which may contain spaces
+        return [os.environ.get("EPROVER", "eprover")]
+
+    @classmethod
+    def _time_limit_flags(cls, seconds):
+        return ["--cpu-limit=%d" % seconds]
+
+    def _bootstrap_problem(self, problem: Problem, context=None):
+        context = context or self._create_context(problem)
+        compilation = context.compilation
+        problem_file = ProblemFile.temporary()
+        try:
+            with problem_file.open() as stream:
+                for sentence in chain(problem.premises, problem.conjectures):
+                    self.dialect.compile_to(sentence, stream, context=compilation)
+                    stream.write("\n")
+        except BaseException:
+            problem_file.remove()
+            raise
+        return problem_file
+
+    def _submit_problem(self, problem_instance, *args, context=None, **kwargs):
+        flags = context.flags if context is not None else self.flags
+        try:
+            result = stages.check_output(
                 [
-                    os.environ.get("EPROVER", "eprover"),
-                    "--output-level=2",
-                    "--tptp-in",
-                    "--tstp-out",
-                    tf.name,
+                    *self._command(),
+                    *flags,
+                    str(problem_instance),
                 ]
             ).decode("utf-8")
+        finally:
+            problem_instance.remove()
         return result
 
 
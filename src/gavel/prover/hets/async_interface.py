@@ -0,0 +1,227 @@
+"""
+An asynchronous client for the Hets REST interface. Requests are issued from
+a bounded pool of worker threads that share a pool of HTTP connections, so
+many problems can be pushed through a single Hets deployment in parallel.
+"""
+import asyncio
+import functools
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from typing import List
+from urllib.parse import quote
+
+import requests as req
+from requests.adapters import HTTPAdapter
+
+from gavel.config import settings
+from gavel.logic.problem import Problem
+from gavel.logic.solution import Proof
+from gavel.prover.base.interface import BaseProverInterface
+from gavel.prover.hets.interface import HetsEngine
+from gavel.prover.hets.interface import content_digest
+from gavel.prover.hets.interface import include_statement
+
+
+class AsyncHetsSession:
+    """
+    Asynchronous counterpart of :class:`gavel.prover.hets.interface.HetsSession`.
+    At most `pool_size` requests are in flight at the same time. Identical
+    contents are only uploaded once per session.
+
+    Use it as an asynchronous context manager:
+
+    .. code::
+
+        async with AsyncHetsSession(HetsEngine()) as session:
+            name = await session.upload(problem_string)
+    """
+
+    def __init__(self, engine: HetsEngine, pool_size=None, timeout=None):
+        self.engine = engine
+        self.pool_size = pool_size or settings.HETS_POOL_SIZE
+        self.timeout = timeout or settings.HETS_TIMEOUT
+        self.http_session = req.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size, pool_block=True
+        )
+        self.http_session.mount("http://", adapter)
+        self.http_session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size)
+        self._names = itertools.count()
+        # maps content hashes to (pending) uploads
+        self.uploads = {}
+        self.folder = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def open(self):
+        if self.folder is None:
+            folder = await self.get(["folder"])
+            self.folder = folder.decode("utf-8")[len("/tmp/") :]
+        return self
+
+    async def close(self):
+        """
+        Waits for all requests in flight and releases the worker threads and
+        connections. The event loop keeps running other tasks meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        self.http_session.close()
+
+    async def _request(self, method, paths, **kwargs):
+        url = self.engine.connection_string
+        if paths is not None:
+            url += "/" + "/".join(paths)
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self._executor,
+            functools.partial(
+                self.http_session.request, method, url, timeout=self.timeout, **kwargs
+            ),
+        )
+        assert 200 <= response.status_code < 300, response.content
+        return response.content
+
+    async def get(self, paths, **kwargs):
+        return await self._request("GET", paths, **kwargs)
+
+    async def post(self, paths, **kwargs):
+        return await self._request("POST", paths, **kwargs)
+
+    def add_file(self, content):
+        return "f%d" % next(self._names)
+
+    async def upload(self, content, name=None):
+        """
+        Uploads `content` into the session's folder and returns the name of
+        the remote file. If identical content has been uploaded before, the
+        existing file is reused.
+        """
+        await self.open()
+        digest = content_digest(content)
+        upload = self.uploads.get(digest)
+        if upload is None:
+            upload = asyncio.ensure_future(
+                self._upload(content, name or self.add_file(content))
+            )
+            self.uploads[digest] = upload
+        try:
+            return await asyncio.shield(upload)
+        except Exception:
+            if self.uploads.get(digest) is upload:
+                del self.uploads[digest]
+            raise
+
+    async def _upload(self, content, name):
+        await self.post(
+            ["uploadFile", quote(self.folder, safe=""), quote(name, safe="")],
+            data=content,
+        )
+        return name
+
+    async def prove(self, name, goals: List[dict], premises=None):
+        """
+        Submits all `goals` for the file `name` in a single request.
+
+        Returns
+        -------
+            The results of all goals in the order Hets reported them
+        """
+        body = dict(format="json", goals=goals)
+        if premises is not None:
+            body["premiseSelection"] = dict(kind="manual", manualPremises=premises)
+        response = await self.post(
+            ["prove", "%2F".join(["", "tmp", self.folder, name])], json=body
+        )
+        return [
+            goal
+            for node in json.loads(response.decode("utf-8"))["prover_output"]
+            for goal in node["goals"]
+        ]
+
+
+class AsyncHetsProve:
+    """
+    Proves problems via Hets using an :class:`AsyncHetsSession`. All
+    conjectures of a problem are submitted as a batch of goals in a single
+    `prove` request. If `share_premises` is set, the premises are uploaded
+    as a separate file that is included by the conjectures (see
+    :class:`gavel.prover.hets.interface.HetsProve`).
+    """
+
+    def __init__(
+        self,
+        prover_interface: BaseProverInterface,
+        session: AsyncHetsSession,
+        reasoner="EProver",
+        time_limit=100,
+        share_premises=False,
+    ):
+        self.dialect = prover_interface._prover_dialect_cls()
+        self.session = session
+        self.reasoner = reasoner
+        self.time_limit = time_limit
+        self.share_premises = share_premises
+
+    async def _bootstrap_problem(self, problem: Problem):
+        premises = "\n".join(self.dialect.compile(s) for s in problem.premises)
+        if self.share_premises:
+            premise_file = await self.session.upload(premises)
+            premises = include_statement(self.session.folder, premise_file)
+        return "\n".join(
+            [premises] + [self.dialect.compile(s) for s in problem.conjectures]
+        )
+
+    def _goals(self, name, problem: Problem):
+        return [
+            dict(
+                node=name,
+                conjecture=conjecture.name,
+                reasonerConfiguration=dict(
+                    timeLimit=self.time_limit, reasoner=self.reasoner
+                ),
+                useTheorems=False,
+            )
+            for conjecture in problem.conjectures
+        ]
+
+    async def prove(self, problem: Problem) -> List[Proof]:
+        """
+        Proves all conjectures of `problem`.
+
+        Returns
+        -------
+            One proof per conjecture, in the order of the conjectures
+        """
+        name = await self.session.upload(await self._bootstrap_problem(problem))
+        results = await self.session.prove(
+            name,
+            self._goals(name, problem),
+            premises=[p.name for p in problem.premises],
+        )
+        # Hets does not guarantee the order of the goals
+        goals = {goal.get("name"): goal for goal in results}
+        proofs = []
+        for conjecture in problem.conjectures:
+            goal = goals.get(conjecture.name)
+            if goal is None:
+                raise RuntimeError(
+                    "Hets did not report a result for conjecture '%s'" % conjecture.name
+                )
+            proofs.append(self.dialect.parse(goal["prover_output"]))
+        return proofs
+
+    async def prove_many(self, problems: Iterable[Problem]) -> List[List[Proof]]:
+        """
+        Proves all `problems` concurrently. The results are in the same order
+        as `problems`.
+        """
+        return await asyncio.gather(*(self.prove(p) for p in problems))
@@ -1,5 +1,8 @@
+import hashlib
 import json
 import tempfile
+import threading
+from concurrent.futures import Future
 from typing import Iterable
 from urllib.parse import quote
 
@@ -44,55 +47,134 @@ def connection_wrapper(f):
     return inner
 
 
+def content_digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def include_statement(folder, name):
+    """
+    A TPTP include of the file `name` that has been uploaded into `folder`
+    """
+    return "include('/tmp/{folder}/{name}').".format(folder=folder, name=name)
+
+
 class HetsSession:
+    """
+    A session on a Hets server. Uploaded contents are identified by their
+    hash: uploading content that has already been uploaded in this session
+    returns the existing remote file instead of sending it again.
+    """
+
     def __init__(self, engine, *args, **kwargs):
         super(HetsSession, self).__init__(*args, **kwargs)
         self.engine = engine
         self.http_session = req.Session()
         self.folder = self.get(["folder"]).decode("utf-8")[len("/tmp/") :]
         self.files = []
+        # maps content hashes to futures of the names of the uploaded files
+        self.uploads = {}
+        self._lock = threading.Lock()
 
     def add_file(self, content):
-        f_name = "f%d" % len(self.files)
-        self.files.append(f_name)
+        with self._lock:
+            f_name = "f%d" % len(self.files)
+            self.files.append(f_name)
         return f_name
 
     @connection_wrapper
     def get(self, *args, **kwargs):
-        return self.http_session.get(*args, timeout=86400, **kwargs)
+        return self.http_session.get(*args, timeout=settings.HETS_TIMEOUT, **kwargs)
 
     @connection_wrapper
     def post(self, *args, **kwargs):
-        return self.http_session.post(*args, timeout=86400, **kwargs)
+        return self.http_session.post(*args, timeout=settings.HETS_TIMEOUT, **kwargs)
 
     @staticmethod
     def encode(path):
         return quote(path, safe="")
 
     def upload(self, name, content):
+        """
+        Uploads `content` as `name` unless identical content has been (or is
+        being) uploaded in this session. Concurrent uploads of the same
+        content wait for the first one.
+
+        Returns
+        -------
+            The encoded names of the remote folder and file
+        """
         enc_folder = quote(self.folder, safe="")
-        enc_file = quote(name, safe="")
-        self.post(["uploadFile", enc_folder, enc_file], data=content)
-        return enc_folder, enc_file
+        digest = content_digest(content)
+        with self._lock:
+            upload = self.uploads.get(digest)
+            if upload is None:
+                upload = self.uploads[digest] = Future()
+                pending = upload
+            else:
+                pending = None
+        if pending is None:
+            return enc_folder, quote(upload.result(), safe="")
+        try:
+            self.post(["uploadFile", enc_folder, quote(name, safe="")], data=content)
+        except BaseException as e:
+            # Later calls may retry the upload
+            with self._lock:
+                del self.uploads[digest]
+            pending.set_exception(e)
+            raise
+        pending.set_result(name)
+        return enc_folder, quote(name, safe="")
+
+    def upload_content(self, content):
+        """
+        Uploads `content` unless identical content has been uploaded before.
+        A file name is only allocated for new content.
+
+        Returns
+        -------
+            The encoded names of the remote folder and file
+        """
+        with self._lock:
+            existing = self.uploads.get(content_digest(content))
+        if existing is not None:
+            return quote(self.folder, safe=""), quote(existing.result(), safe="")
+        return self.upload(self.add_file(content), content)
 
 
 class HetsProve(BaseProverInterface):
+    """
+    Proves problems via Hets.
+
+    If `share_premises` is set, the premises of a problem are uploaded as a
+    separate file that is included by the file containing the conjectures.
+    Problems that share their premises then only upload them once.
+    """
+
     def __init__(
         self,
         prover_interface: BaseProverInterface,
         session: HetsSession,
         *args,
+        share_premises=False,
         **kwargs
     ):
         self._prover_dialect_cls = prover_interface._prover_dialect_cls
         super(HetsProve, self).__init__()
         self.session = session
+        self.share_premises = share_premises
 
-    def _bootstrap_problem(self, problem: Problem):
-        problem_string = "\n".join(self.dialect.compile(l) for l in problem.premises)
-        problem_string += self.dialect.compile(problem.conjecture)
-        name = self.session.add_file(problem_string)
-        return self.session.upload(name, problem_string), problem
+    def _bootstrap_problem(self, problem: Problem, context=None):
+        context = context or self._create_context(problem)
+        compilation = context.compilation
+        problem_string = "\n".join(
+            self.dialect.compile(l, context=compilation) for l in problem.premises
+        )
+        if self.share_premises:
+            folder_name, premise_file = self.session.upload_content(problem_string)
+            problem_string = include_statement(self.session.folder, premise_file)
+        for conjecture in problem.conjectures:
+            problem_string += "\n" + self.dialect.compile(conjecture, context=compilation)
+        return self.session.upload_content(problem_string), problem
 
     def _submit_problem(self, problem_instance, *args, **kwargs):
         (folder_name, file_name), problem = problem_instance
@@ -118,5 +200,5 @@ class HetsProve(BaseProverInterface):
         assert len(goals) == 1
         return goals[0]["prover_output"]
 
-    def _post_process_proof(self, raw_proof_result):
+    def _post_process_proof(self, raw_proof_result, context=None):
         return raw_proof_result
@@ -0,0 +1,139 @@
+"""
+A local stand-in for the Hets REST interface. It implements the `folder`,
+`uploadFile` and `prove` endpoints used by gavel's Hets clients and answers
+every goal with a canned prover output. It is meant for tests and for
+benchmarking the client side without a Hets deployment:
+
+.. code::
+
+    python -m gavel.prover.hets.server --port 8000
+"""
+import argparse
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import unquote
+
+
+def canned_prover_output(content, goal):
+    return "% SZS status Theorem for {node}\n".format(node=goal.get("node"))
+
+
+class HetsStandInHandler(BaseHTTPRequestHandler):
+    server: "HetsStandInServer"
+
+    def _segments(self):
+        return [unquote(s) for s in self.path.split("?")[0].split("/") if s]
+
+    def _respond(self, body, content_type="text/plain", status=200):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        segments = self._segments()
+        if segments == ["folder"]:
+            self._respond("/tmp/" + self.server.create_folder())
+        else:
+            self._respond("Not found", status=404)
+
+    def do_POST(self):
+        segments = self._segments()
+        body = self._read_body()
+        if len(segments) == 3 and segments[0] == "uploadFile":
+            self.server.store(segments[1], segments[2], body.decode("utf-8"))
+            self._respond("")
+        elif len(segments) == 2 and segments[0] == "prove":
+            path = segments[1].strip("/").split("/")
+            content = self.server.files.get(tuple(path[-2:]))
+            if content is None:
+                self._respond("Unknown file", status=404)
+                return
+            request = json.loads(body.decode("utf-8"))
+            nodes = {}
+            for goal in request.get("goals", []):
+                nodes.setdefault(goal.get("node"), []).append(
+                    dict(
+                        name=goal.get("conjecture"),
+                        result="Proved",
+                        prover_output=self.server.prover_output(content, goal),
+                    )
+                )
+            self.server.count("prove")
+            self._respond(
+                json.dumps(
+                    dict(
+                        prover_output=[
+                            dict(node=node, goals=goals) for node, goals in nodes.items()
+                        ]
+                    )
+                ),
+                content_type="application/json",
+            )
+        else:
+            self._respond("Not found", status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HetsStandInServer(ThreadingHTTPServer):
+    """
+    Stand-in Hets server. `prover_output` is called with the content of the
+    uploaded file and the goal and returns the prover output for this goal.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), prover_output=canned_prover_output):
+        super(HetsStandInServer, self).__init__(address, HetsStandInHandler)
+        self.prover_output = prover_output
+        self.files = {}
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def create_folder(self):
+        self.count("folder")
+        return uuid.uuid4().hex
+
+    def store(self, folder, name, content):
+        with self._lock:
+            self.files[(folder, name)] = content
+            self.requests["uploadFile"] = self.requests.get("uploadFile", 0) + 1
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def start(self):
+        """
+        Serves requests from a background thread
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arguments = arg_parser.parse_args()
+    HetsStandInServer((arguments.host, arguments.port)).serve_forever()
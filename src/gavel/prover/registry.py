@@ -1,5 +1,17 @@
+from gavel import plugins
+
 PROVERS = {}
 
+BUILTIN_PROVERS = {
+    "eprover": "gavel.prover.eprover.interface:EProverInterface",
+    "schedule": "gavel.prover.scheduler:StrategyScheduler",
+    "vampire": "gavel.prover.vampire.interface:VampireInterface",
+}
+"""
+Provers that ship with gavel. Further provers are announced by plugins in
+the entry point group `gavel.provers`.
+"""
+
 
 def register_prover(name):
     """
@@ -22,6 +34,13 @@ def get_prover(name):
     :param name:  Identifier of some prover
     :return: The prover associated with `name`
     """
+    if name not in PROVERS:
+        references = dict(BUILTIN_PROVERS)
+        references.update(plugins.entry_points("gavel.provers"))
+        if name in references:
+            PROVERS.setdefault(name, plugins.load(references[name]))
+        else:
+            plugins.load_plugins()
     return PROVERS[name]
 
 
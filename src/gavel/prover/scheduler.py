@@ -0,0 +1,290 @@
+import json
+import math
+import os
+import threading
+import time
+
+from gavel.config import settings
+from gavel.dialects.base.dialect import Problem
+from gavel.logic import logic
+from gavel.logic import status
+from gavel.prover.base.interface import BaseProverInterface
+from gavel.prover.base.interface import ProverContext
+from gavel.prover.registry import get_prover
+from gavel.prover.registry import register_prover
+
+
+class Strategy:
+    """
+    A single entry of a strategy schedule: a registered prover together with
+    the flags it is called with.
+
+    Attributes
+    ----------
+    prover: str
+        Name of a registered prover (see :func:`gavel.prover.registry.get_prover`)
+    flags: list
+        Additional flags passed to the prover
+    time_slice: int
+        Fixed number of seconds granted to this strategy. If `None`, the
+        scheduler derives a slice from the recorded history.
+    """
+
+    def __init__(self, prover, flags=None, time_slice=None):
+        self.prover = prover
+        self.flags = list(flags or [])
+        self.time_slice = time_slice
+
+    @property
+    def key(self):
+        return " ".join([self.prover] + self.flags)
+
+    def __repr__(self):
+        return "Strategy(%s)" % self.key
+
+
+DEFAULT_PORTFOLIO = [
+    Strategy("vampire", ["--mode casc"]),
+    Strategy("eprover", ["--auto"]),
+    Strategy("vampire", ["--mode casc_sat"]),
+    Strategy("eprover", ["--auto-schedule"]),
+]
+
+
+class ProblemFeatures:
+    """
+    Coarse features of a problem that are used to look up which strategies
+    performed well on similar problems in the past.
+    """
+
+    def __init__(self, size: int, has_equality: bool, form: str):
+        self.size = size
+        self.has_equality = has_equality
+        self.form = form
+
+    @classmethod
+    def from_problem(cls, problem: Problem):
+        sentences = list(problem.premises) + list(problem.conjectures)
+        logics = {str(getattr(s, "logic", "fof")) for s in sentences}
+        if logics == {"cnf"}:
+            form = "cnf"
+        elif logics.issubset({"fof", "cnf"}):
+            form = "fof"
+        else:
+            form = "+".join(sorted(logics))
+        return cls(
+            size=len(sentences),
+            has_equality=any(_has_equality(s.formula) for s in sentences),
+            form=form,
+        )
+
+    @property
+    def key(self):
+        # Problems are bucketed by the order of magnitude of their size
+        return "size=%d;equality=%d;form=%s" % (
+            int(math.log10(self.size + 1)),
+            self.has_equality,
+            self.form,
+        )
+
+
+def _has_equality(formula) -> bool:
+    stack = [formula]
+    while stack:
+        element = stack.pop()
+        if isinstance(element, logic.BinaryFormula):
+            if element.operator in (logic.BinaryConnective.EQ, logic.BinaryConnective.NEQ):
+                return True
+            stack.append(element.left)
+            stack.append(element.right)
+        elif isinstance(element, (logic.UnaryFormula, logic.QuantifiedFormula)):
+            stack.append(element.formula)
+        elif isinstance(element, logic.PredicateExpression):
+            if element.predicate == logic.DefinedPredicate.DISTINCT:
+                return True
+    return False
+
+
+class StrategyHistory:
+    """
+    Records which strategies solved problems with which features. The history
+    is stored as JSON at `path` (default: `GAVEL_STRATEGY_HISTORY`) and maps
+    feature keys to per-strategy statistics.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.STRATEGY_HISTORY
+        self._lock = threading.Lock()
+        self.records = self._load()
+
+    def _load(self):
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as fp:
+                return json.load(fp)
+        return {}
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as fp:
+                json.dump(self.records, fp, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def record(self, features: ProblemFeatures, strategy: Strategy, solved: bool, elapsed: float):
+        with self._lock:
+            entry = self.records.setdefault(features.key, {}).setdefault(
+                strategy.key, dict(attempts=0, solved=0, time=0.0)
+            )
+            entry["attempts"] += 1
+            if solved:
+                entry["solved"] += 1
+                entry["time"] += elapsed
+
+    def statistics(self, features: ProblemFeatures, strategy: Strategy):
+        """
+        Returns the statistics of `strategy` for problems like `features`. If
+        the strategy has never been tried on such problems, the statistics
+        over all problems are used instead.
+        """
+        entry = self.records.get(features.key, {}).get(strategy.key)
+        if entry is not None:
+            return entry
+        total = dict(attempts=0, solved=0, time=0.0)
+        for strategies in self.records.values():
+            for key, value in strategies.get(strategy.key, {}).items():
+                total[key] += value
+        return total
+
+    def score(self, features: ProblemFeatures, strategy: Strategy) -> float:
+        entry = self.statistics(features, strategy)
+        # Laplace smoothing gives untried strategies a fair chance
+        return (entry["solved"] + 1) / (entry["attempts"] + 2)
+
+    def expected_time(self, features: ProblemFeatures, strategy: Strategy):
+        entry = self.statistics(features, strategy)
+        if entry["solved"]:
+            return entry["time"] / entry["solved"]
+        return None
+
+    def rank(self, features: ProblemFeatures, strategies):
+        # `sorted` is stable, hence ties keep the order of the portfolio
+        return sorted(strategies, key=lambda s: -self.score(features, s))
+
+
+class ScheduleContext(ProverContext):
+    """
+    The context of a single call of :meth:`StrategyScheduler.prove`
+
+    Attributes
+    ----------
+    features: :class:`ProblemFeatures`
+        The features of the problem
+    attempts: list
+        The :class:`gavel.instrumentation.stages.StageRecord` of every
+        strategy that has been run. The metrics `strategy`, `time_slice`
+        and `solved` describe the attempt.
+    """
+
+    def __init__(self, features: ProblemFeatures, flags=None):
+        super(ScheduleContext, self).__init__(flags=flags)
+        self.features = features
+        self.attempts = []
+
+
+@register_prover("schedule")
+class StrategyScheduler(BaseProverInterface):
+    """
+    Runs a sequence of strategies within a total time budget. The order of
+    the strategies and their time slices are derived from a
+    :class:`StrategyHistory` that is updated after every run.
+
+    The strategies are run in the `submit` stage of :meth:`prove`; the proof
+    of the successful (or last) strategy is returned.
+    """
+
+    min_slice = 1
+
+    def __init__(self, *args, budget=None, strategies=None, history=None, **kwargs):
+        super(StrategyScheduler, self).__init__(*args, **kwargs)
+        self.budget = budget or settings.SCHEDULE_BUDGET
+        self.strategies = list(strategies or DEFAULT_PORTFOLIO)
+        self.history = history or StrategyHistory()
+
+    def schedule(self, problem: Problem):
+        """
+        Returns the planned sequence of `(strategy, time_slice)` pairs for
+        `problem` assuming every strategy uses up its slice.
+        """
+        features = ProblemFeatures.from_problem(problem)
+        ranked = self.history.rank(features, self.strategies)
+        remaining = self.budget
+        plan = []
+        for index, strategy in enumerate(ranked):
+            if remaining < self.min_slice:
+                break
+            time_slice = self._time_slice(features, strategy, remaining, len(ranked) - index)
+            plan.append((strategy, time_slice))
+            remaining -= time_slice
+        return plan
+
+    def _create_context(self, problem: Problem = None) -> "ScheduleContext":
+        return ScheduleContext(ProblemFeatures.from_problem(problem), flags=self.flags)
+
+    def _submit_problem(self, problem_instance, *args, context=None, **kwargs):
+        """
+        Runs the strategies in the order of the schedule until one of them
+        succeeds or the budget is used up. Every strategy is measured as a
+        `strategy` stage, which contains the stages of the prover it runs.
+        """
+        context = context or self._create_context(problem_instance)
+        features = context.features
+        ranked = self.history.rank(features, self.strategies)
+        remaining = self.budget
+        proof = None
+        for index, strategy in enumerate(ranked):
+            if remaining < self.min_slice:
+                break
+            time_slice = self._time_slice(features, strategy, remaining, len(ranked) - index)
+            with self.instrumentation.stage("strategy", problem_instance) as record:
+                record.metrics.update(strategy=strategy.key, time_slice=time_slice)
+                start = time.monotonic()
+                try:
+                    proof = record.set_output(
+                        self._run_strategy(strategy, problem_instance, time_slice)
+                    )
+                except Exception as e:
+                    print("Warning: Strategy", strategy.key, "failed:", e)
+                    proof = None
+                elapsed = time.monotonic() - start
+                solved = proof is not None and isinstance(proof.status, status.StatusSuccess)
+                record.metrics["solved"] = solved
+            context.attempts.append(record)
+            self.history.record(features, strategy, solved, elapsed)
+            remaining -= elapsed
+            if solved:
+                break
+        self.history.save()
+        return proof
+
+    def _time_slice(self, features, strategy, remaining, pending):
+        if strategy.time_slice:
+            time_slice = strategy.time_slice
+        else:
+            expected = self.history.expected_time(features, strategy)
+            if expected is not None:
+                time_slice = 2 * expected
+            else:
+                time_slice = remaining / pending
+        return int(max(self.min_slice, min(remaining, math.ceil(time_slice))))
+
+    def _run_strategy(self, strategy: Strategy, problem: Problem, time_slice: int):
+        prover_cls = get_prover(strategy.prover)
+        flags = (
+            list(prover_cls._default_flags)
+            + strategy.flags
+            + prover_cls._time_limit_flags(time_slice)
+        )
+        return prover_cls(flags=flags, instrumentation=self.instrumentation).prove(problem)
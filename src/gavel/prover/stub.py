@@ -0,0 +1,124 @@
+"""
+A fake prover that answers every problem with a canned SZS result. It stands
+in for a real prover binary, so the overhead of the interfaces (compilation,
+temporary files, process start and parsing of the output) can be measured
+offline. The stub is installed as `gavel-stub-prover` and can replace a
+prover via its environment variable:
+
+.. code::
+
+    EPROVER=$(which gavel-stub-prover) gavel prove eprover problem.p
+    VAMPIRE=$(which gavel-stub-prover) gavel prove vampire problem.p
+
+Within Python, :func:`command` can be passed as `executable` instead:
+
+.. code::
+
+    prover = EProverInterface(executable=stub.command())
+    proof = prover.prove(problem)
+
+All command line flags are ignored, the last argument that names an existing
+file is read as the problem (otherwise the problem is read from stdin). The
+behaviour is configured with environment variables:
+
+* `GAVEL_STUB_STATUS`: The reported SZS status (default: `Theorem`). A proof
+  is only written for `Theorem` and `Unsatisfiable`.
+* `GAVEL_STUB_DELAY`: Seconds to sleep before answering (default: 0)
+* `GAVEL_STUB_WORK`: Seconds of busy work before answering (default: 0)
+* `GAVEL_STUB_STEPS`: Number of inference steps that are appended to the
+  proof (default: 0). Use this to produce large proofs.
+* `GAVEL_STUB_ECHO`: Whether the formulas of the problem are repeated in the
+  proof (default: 1)
+
+This module only depends on the standard library, so its start-up time is
+close to that of the interpreter.
+"""
+import os
+import shlex
+import sys
+import time
+
+_PROOF_STATUSES = ("Theorem", "Unsatisfiable")
+_SENTENCE_PREFIXES = ("fof(", "cnf(", "tff(", "thf(")
+
+
+def command() -> str:
+    """
+    The command line that runs the stub with the current interpreter,
+    suitable as `executable` of the E and Vampire interfaces. The environment
+    variables `EPROVER` and `VAMPIRE` only take a path, use the
+    `gavel-stub-prover` script there.
+    """
+    return "%s -m gavel.prover.stub" % shlex.quote(sys.executable)
+
+
+def read_sentences(stream):
+    """
+    Yields the annotated formulas of the TPTP text in `stream`. Comments and
+    includes are skipped, sentences may span several lines.
+    """
+    sentence = []
+    for line in stream:
+        line = line.strip()
+        if not sentence and not line.startswith(_SENTENCE_PREFIXES):
+            continue
+        sentence.append(line)
+        if line.endswith(")."):
+            yield " ".join(sentence)
+            sentence = []
+
+
+def _input(argv):
+    for argument in reversed(argv):
+        if not argument.startswith("-") and os.path.isfile(argument):
+            return open(argument)
+    return sys.stdin
+
+
+def respond(sentences, status="Theorem", steps=0, echo=True, name="stub"):
+    """
+    Yields the lines of the answer to a problem that consists of `sentences`
+    """
+    yield "% SZS status {} for {}".format(status, name)
+    if status not in _PROOF_STATUSES:
+        return
+    yield "% SZS output start Proof for {}".format(name)
+    if echo:
+        yield from sentences
+    parent = ""
+    for i in range(steps):
+        yield "fof(stub{},plain,~p(c{}),inference(stub,[status(thm)],[{}])).".format(
+            i, i, parent
+        )
+        parent = "stub%d" % i
+    yield "fof(stub_refutation,plain,$false,inference(stub,[],[{}])).".format(parent)
+    yield "% SZS output end Proof for {}".format(name)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    stream = _input(argv)
+    try:
+        sentences = list(read_sentences(stream))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    time.sleep(float(os.environ.get("GAVEL_STUB_DELAY", 0)))
+    deadline = time.perf_counter() + float(os.environ.get("GAVEL_STUB_WORK", 0))
+    while time.perf_counter() < deadline:
+        pass
+    output = sys.stdout
+    for line in respond(
+        sentences,
+        status=os.environ.get("GAVEL_STUB_STATUS", "Theorem"),
+        steps=int(os.environ.get("GAVEL_STUB_STEPS", 0)),
+        echo=os.environ.get("GAVEL_STUB_ECHO", "1") not in ("0", "false", ""),
+    ):
+        output.write(line)
+        output.write("\n")
+    output.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
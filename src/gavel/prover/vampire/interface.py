@@ -4,57 +4,95 @@ from gavel.prover.registry import register_prover
 from gavel.logic.logic import PredefinedConstant
 from gavel.dialects.base.dialect import Problem
 from gavel.dialects.tptp.dialect import TPTPProofDialect
+from gavel.dialects.tptp.parser import TPTPParser
 from gavel.prover.base.interface import BaseProverInterface
 from gavel.prover.base.interface import BaseResultHandler
+from gavel.prover.base.interface import ProblemFile
+from gavel.instrumentation import stages
 import subprocess as sub
-import tempfile
+import shlex
+import shutil
 import os
+from itertools import chain
 
 @register_prover("vampire")
 class VampireInterface(BaseProverInterface):
     _prover_dialect_cls = TPTPProofDialect
+    _default_flags = ["-p tptp", "--input_syntax tptp"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         flags = kwargs.get("flags", [])
         if not flags:
-            flags = ["-p tptp", "--input_syntax tptp", "-t 300"]
+            flags = self._default_flags + self._time_limit_flags(300)
         self.flags = flags
+        # A command line that replaces the binary at `VAMPIRE`
+        self.executable = kwargs.get("executable")
 
-    def _bootstrap_problem(self, problem: Problem):
-        problem_string = "\n".join(self.dialect.compile(l) for l in problem.premises)
-        for imp in problem.imports:
-            with open(imp.path) as impf:
-                problem_string += impf.read()
+    def _command(self):
+        if self.executable:
+            return shlex.split(self.executable)
+        # `VAMPIRE` is the path of the binary, which may contain spaces
+        return [os.environ.get("VAMPIRE", "vampire")]
 
-        for conjecture in problem.conjectures:
-            problem_string += self.dialect.compile(conjecture)
-        if len(problem.conjectures) == 1 and problem.conjectures[0].formula == PredefinedConstant.FALSUM:
-            mode = "--mode casc_sat"
-        else:
-            mode = "--mode casc"
-        self.flags = [mode] + self.flags
-        return problem_string
+    @classmethod
+    def _time_limit_flags(cls, seconds):
+        return ["-t %d" % seconds]
+
+    def _bootstrap_problem(self, problem: Problem, context=None):
+        context = context or self._create_context(problem)
+        compilation = context.compilation
+        problem_file = ProblemFile.temporary()
+        try:
+            with problem_file.open() as stream:
+                for premise in problem.premises:
+                    self.dialect.compile_to(premise, stream, context=compilation)
+                    stream.write("\n")
+                for imp in problem.imports:
+                    if self.compact_symbols:
+                        # The symbols of imported axioms have to be renamed as well
+                        for sentence in TPTPParser().parse_from_file(imp.path):
+                            self.dialect.compile_to(sentence, stream, context=compilation)
+                            stream.write("\n")
+                    else:
+                        with open(imp.path) as impf:
+                            shutil.copyfileobj(impf, stream)
+                        stream.write("\n")
+                for conjecture in problem.conjectures:
+                    self.dialect.compile_to(conjecture, stream, context=compilation)
+                    stream.write("\n")
+        except BaseException:
+            problem_file.remove()
+            raise
+        if not any(flag.startswith("--mode") for flag in context.flags):
+            if len(problem.conjectures) == 1 and problem.conjectures[0].formula == PredefinedConstant.FALSUM:
+                mode = "--mode casc_sat"
+            else:
+                mode = "--mode casc"
+            context.flags = [mode] + context.flags
+        return problem_file
 
-    def _submit_problem(self, problem_instance, *args, **kwargs):
-        with tempfile.NamedTemporaryFile() as tf:
-            tf.write(problem_instance.encode())
-            tf.seek(0)
-            try:
-                result = sub.check_output(
-                    " ".join([
-                        os.environ.get("VAMPIRE", "vampire"),
-                        *self.flags,
-                        tf.name,
-                    ]), shell=True).decode("utf-8")
-            except sub.CalledProcessError as e:
-                if not re.search(r"SZS status (\w+)", e.output.decode("utf-8")):
-                    raise RuntimeError("command '{}' return with error (code {}): {}".format(e.cmd, e.returncode, e.output))
-                result = e.output.decode("utf-8")
+    def _submit_problem(self, problem_instance, *args, context=None, **kwargs):
+        flags = context.flags if context is not None else self.flags
+        try:
+            result = stages.check_output(
+                [
+                    *self._command(),
+                    # Flags like "-t 300" hold an option and its value
+                    *chain.from_iterable(shlex.split(flag) for flag in flags),
+                    str(problem_instance),
+                ]
+            ).decode("utf-8")
+        except sub.CalledProcessError as e:
+            if not re.search(r"SZS status (\w+)", e.output.decode("utf-8")):
+                raise RuntimeError("command '{}' return with error (code {}): {}".format(e.cmd, e.returncode, e.output))
+            result = e.output.decode("utf-8")
+        finally:
+            problem_instance.remove()
 
         return result
 
-    def _post_process_proof(self, raw_proof_result):
+    def _post_process_proof(self, raw_proof_result, context=None):
         match = re.search(r"\%\s+SZS\s+status[^\n]*\n\%\s*\#?\s*SZS\soutput\sstart[^\n]*\n(?P<proof_text>(.|\n)*)\%\s*\#?\s*SZS\soutput\send", raw_proof_result)
         if match:
             return match.group(0)
@@ -1,7 +1,6 @@
 from itertools import chain
-from typing import List, Dict
+from typing import List
 
-from gavel.logic.logic import LogicElement
 from gavel.logic.problem import Problem
 
 
@@ -14,46 +13,83 @@ class Selector:
         return problem
 
 
-class Sine(Selector):
-    def select(self, problem, max_depth=10):
-        symbols = set(
-            chain(
-                problem.conjecture.symbols(), *(p.symbols() for p in problem.premises)
-            )
-        )
-        premise_symbols = {p: set(p.symbols()) for p in problem.premises}
-        commonness = {
-            s: sum(1 for ps in premise_symbols.values() if s in ps) for s in symbols
-        }
-
-        return self.calculate_triggers(problem, premise_symbols, commonness, max_depth)
-
-    def trigger(
-        self, symbol, sentence: LogicElement, commonness: Dict[str, int]
-    ) -> bool:
-        return symbol in sentence.symbols() and all(
-            commonness[symbol] <= commonness[symbol2] for symbol2 in sentence.symbols()
-        )
+class SineIndex:
+    """
+    The symbol statistics SInE needs to select premises. The index only
+    depends on the premises, hence it can be built once and reused for every
+    conjecture that is asked against the same axioms.
+
+    Attributes
+    ----------
+    premises: list
+        The indexed premises
+    commonness: dict
+        Maps symbols to the number of premises they occur in
+    triggers: dict
+        Maps symbols to the positions of the premises they trigger, i.e. the
+        premises in which they are one of the least common symbols
+    """
 
-    def calculate_triggers(
-        self, problem: Problem, premise_symbols, commonness, max_depth
-    ):
-        remaining_premises = list(problem.premises)
-        k_triggered_symbols = set(problem.conjecture.symbols())
+    def __init__(self, premises):
+        self.premises = list(premises)
+        self.premise_symbols = [set(p.symbols()) for p in self.premises]
+        self.commonness = {}
+        for symbols in self.premise_symbols:
+            for symbol in symbols:
+                self.commonness[symbol] = self.commonness.get(symbol, 0) + 1
+        self.triggers = {}
+        for position, symbols in enumerate(self.premise_symbols):
+            if symbols:
+                least = min(self.commonness[s] for s in symbols)
+                for symbol in symbols:
+                    if self.commonness[symbol] == least:
+                        self.triggers.setdefault(symbol, []).append(position)
+
+    def select(self, symbols, max_depth=10) -> List:
+        """
+        Returns the premises that are triggered by `symbols` within
+        `max_depth` steps. Premises triggered in an earlier step come first,
+        premises triggered in the same step keep their original order.
+        """
+        k_triggered_symbols = set(symbols)
         used_symbols = set()
+        selected = set()
+        result = []
         k = 0
         while k_triggered_symbols and k < max_depth:
             k += 1
-            untriggered_premises = []
+            # If s is k-step triggered and s triggers A, then A is k + 1-step triggered
+            triggered = {
+                position
+                for symbol in k_triggered_symbols
+                for position in self.triggers.get(symbol, ())
+                if position not in selected
+            }
             newer_symbols = set()
-            for p in remaining_premises:
-                p_symbs = premise_symbols[p]
-                # If s is k-step triggered and s triggers A, then A is k + 1-step triggered
-                if any(self.trigger(s, p, commonness) for s in k_triggered_symbols):
-                    newer_symbols = newer_symbols.union(p_symbs)
-                    yield p
-                else:
-                    untriggered_premises.append(p)
-            remaining_premises = untriggered_premises
-            used_symbols = used_symbols.union(k_triggered_symbols)
+            for position in sorted(triggered):
+                selected.add(position)
+                result.append(self.premises[position])
+                newer_symbols.update(self.premise_symbols[position])
+            used_symbols.update(k_triggered_symbols)
             k_triggered_symbols = newer_symbols.difference(used_symbols)
+        return result
+
+
+class Sine(Selector):
+    def select(self, problem, max_depth=10, index: SineIndex = None) -> Problem:
+        """
+        Selects the premises of `problem` that are relevant for its
+        conjectures. An `index` of the premises that has been built before
+        (e.g. for another conjecture) can be passed to skip the indexing.
+        """
+        if index is None:
+            index = self.build_index(problem)
+        symbols = chain.from_iterable(c.symbols() for c in problem.conjectures)
+        return Problem(
+            index.select(symbols, max_depth=max_depth),
+            problem.conjectures,
+            problem.imports,
+        )
+
+    def build_index(self, problem: Problem) -> SineIndex:
+        return SineIndex(problem.premises)
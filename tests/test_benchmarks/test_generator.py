@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from gavel.benchmarks import generator
+from gavel.dialects.tptp.parser import TPTPParser
+from gavel.logic import logic
+from gavel.logic import problem as prob
+
+
+def _depth(formula):
+    if isinstance(formula, logic.BinaryFormula):
+        return 1 + max(_depth(formula.left), _depth(formula.right))
+    if isinstance(formula, (logic.UnaryFormula, logic.QuantifiedFormula)):
+        return 1 + _depth(formula.formula)
+    return 0
+
+
+class TestGenerator(TestCase):
+    def test_deterministic(self):
+        for workload in generator.WORKLOADS:
+            self.assertEqual(
+                generator.generate_text(workload, 20, seed=3),
+                generator.generate_text(workload, 20, seed=3),
+            )
+        self.assertNotEqual(
+            generator.generate_text("fof", 20, seed=1),
+            generator.generate_text("fof", 20, seed=2),
+        )
+
+    def test_roundtrip(self):
+        for workload in generator.WORKLOADS:
+            problem = generator.generate(workload, 20)
+            sentences = list(TPTPParser().parse(generator.generate_text(workload, 20)))
+            self.assertEqual(
+                [(s.name, s.logic, s.role) for s in sentences],
+                [(s.name, s.logic, s.role) for s in problem.premises + problem.conjectures],
+            )
+
+    def test_dimensions(self):
+        self.assertEqual(len(generator.generate("wide", 50).premises), 50)
+        deep = generator.generate("deep", 50)
+        self.assertGreaterEqual(min(_depth(p.formula) for p in deep.premises), 50)
+        cnf = generator.generate("cnf", 10)
+        self.assertTrue(all(s.logic == "cnf" for s in cnf.premises + cnf.conjectures))
+        self.assertEqual(cnf.conjectures[0].role, prob.FormulaRole.NEGATED_CONJECTURE)
+        self.assertIn("=", generator.generate_text("equality-heavy", 10))
+
+    def test_unknown_workload(self):
+        with self.assertRaises(ValueError):
+            generator.generate("unknown", 10)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from gavel.benchmarks import runner
+
+
+class TestRunner(TestCase):
+    def test_percentile(self):
+        self.assertEqual(runner.percentile([3, 1, 2, 4], 50), 2.5)
+        self.assertEqual(runner.percentile([1, 2, 3], 100), 3)
+
+    def test_run_all_scenarios(self):
+        results = runner.run(size=20, repeat=2)
+        self.assertEqual(set(results), {"parse", "parse-compact", "compile", "compile-cached", "compile-compact", "compile-parallel", "sine", "prove", "prove-process"})
+        for result in results.values():
+            self.assertGreater(result["ops_per_sec"], 0)
+            self.assertGreater(result["peak_memory"], 0)
+            self.assertLessEqual(result["p50"], result["p99"])
+        self.assertIn("bytes_per_sec", results["parse"])
+
+    def test_compare(self):
+        baseline = dict(parse=dict(size=10, seed=0, ops_per_sec=100.0, peak_memory=1000))
+        self.assertEqual(
+            runner.compare(dict(parse=dict(size=10, seed=0, ops_per_sec=90.0, peak_memory=1100)), baseline),
+            [],
+        )
+        self.assertEqual(
+            len(runner.compare(dict(parse=dict(size=10, seed=0, ops_per_sec=50.0, peak_memory=2000)), baseline)),
+            2,
+        )
+        self.assertEqual(
+            len(runner.compare(dict(parse=dict(size=20, seed=0, ops_per_sec=100.0, peak_memory=1000)), baseline)),
+            1,
+        )
+
+    def test_without_throughput(self):
+        result = dict(size=10, seed=0, ops_per_sec=None, p50=0.0, p99=0.0, peak_memory=1000)
+        baseline = dict(parse=dict(result, ops_per_sec=100.0))
+        self.assertEqual(runner.compare(dict(parse=result), baseline), [])
+        self.assertEqual(runner.compare(baseline, dict(parse=result)), [])
+        self.assertEqual(runner.summarize(dict(parse=result)).splitlines()[1].split()[2], "-")
+
+    def test_unknown_scenario(self):
+        with self.assertRaises(ValueError):
+            runner.run(["unknown"])
+
+    def test_workload(self):
+        results = runner.run(["parse", "sine"], size=10, repeat=1, workload="cnf")
+        self.assertEqual(results["parse"]["workload"], "cnf")
+        with self.assertRaises(ValueError):
+            runner.run(["parse"], workload="unknown")
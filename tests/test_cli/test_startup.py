@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# Upper bound for the cumulative import time of `gavel.cli` in microseconds
+STARTUP_THRESHOLD = int(os.environ.get("GAVEL_STARTUP_THRESHOLD", 400000))
+
+DEFERRED_MODULES = [
+    "bs4",
+    "graphviz",
+    "pkg_resources",
+    "requests",
+    "gavel.prover.hets.interface",
+    "gavel.prover.vampire.interface",
+    "gavel.selection.selector",
+]
+
+
+def _python(*args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+class TestStartup(unittest.TestCase):
+    def test_deferred_imports(self):
+        result = _python(
+            "-c",
+            "import sys, gavel.cli, gavel.dialects.tptp.parser as p;"
+            "print(' '.join(sys.modules));"
+            "print(p._LARK_GRAMMAR is None)",
+        )
+        modules, grammar_deferred = result.stdout.splitlines()
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, modules.split(), module)
+        self.assertEqual(grammar_deferred, "True")
+
+    def test_import_time(self):
+        # Take the best of a few runs to smooth out noise
+        timings = []
+        for _ in range(3):
+            result = _python("-X", "importtime", "-c", "import gavel.cli")
+            for line in result.stderr.splitlines():
+                fields = line.split("|")
+                if len(fields) == 3 and fields[2].strip() == "gavel.cli":
+                    timings.append(int(fields[1]))
+        self.assertLess(min(timings), STARTUP_THRESHOLD)
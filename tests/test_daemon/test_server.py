@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from gavel.daemon.client import DaemonError
+from gavel.daemon.client import GavelClient
+from gavel.daemon.server import GavelDaemon
+from gavel.logic import status
+from gavel.logic.solution import Proof
+from gavel.prover.base.interface import BaseProverInterface
+from gavel.prover.registry import register_prover
+
+CALLS = []
+
+AXIOMS = """fof(a1,axiom,p(c)).
+fof(a2,axiom,q(d)).
+fof(a3,axiom,(p(c)=>r(c))).
+"""
+
+
+@register_prover("daemon-test-unknown")
+class UnknownProver(BaseProverInterface):
+    def _submit_problem(self, problem_instance, *args, **kwargs):
+        CALLS.append([p.name for p in problem_instance.premises])
+        return None
+
+    def _build_proof(self, prover_output, problem, context=None):
+        return prover_output
+
+
+@register_prover("daemon-test")
+class CountingProver(BaseProverInterface):
+    def _submit_problem(self, problem_instance, *args, **kwargs):
+        CALLS.append([p.name for p in problem_instance.premises])
+        return Proof(steps=problem_instance.premises, status=status.StatusTheorem())
+
+    def _build_proof(self, prover_output, problem, context=None):
+        return prover_output
+
+
+class TestDaemon(TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.daemon = GavelDaemon(("127.0.0.1", 0), workers=2).start()
+        self.client = GavelClient("127.0.0.1", self.daemon.port)
+        self.directory = tempfile.TemporaryDirectory()
+        self.axioms = os.path.join(self.directory.name, "axioms.ax")
+        with open(self.axioms, "w") as fp:
+            fp.write(AXIOMS)
+
+    def tearDown(self):
+        self.daemon.stop()
+        self.directory.cleanup()
+
+    def test_translate_is_cached(self):
+        first = self.client.translate("tptp", text="fof(x,axiom,p(c)).")
+        second = self.client.translate("tptp", text="fof(x,axiom,p(c)).")
+        self.assertEqual(first["output"], "fof(x,axiom,('p'('c'))).")
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+
+    def test_select_with_shared_axioms(self):
+        for conjecture in ["r(c)", "q(d)"]:
+            result = self.client.select(
+                text="fof(c,conjecture,%s)." % conjecture, axioms=[self.axioms]
+            )
+        self.assertEqual(result["premises"], ["a2"])
+        self.assertEqual(self.daemon.workspace.indexes.statistics()["size"], 1)
+
+    def test_prove(self):
+        for _ in range(2):
+            result = self.client.prove(
+                "daemon-test", text="fof(c,conjecture,r(c)).", axioms=[self.axioms], select=True
+            )
+        self.assertEqual(result["status"], "Theorem")
+        self.assertEqual([s["name"] for s in result["steps"]], ["a1", "a3"])
+        self.assertEqual(CALLS, [["a1", "a3"]])
+
+    def test_missing_proof_is_not_cached(self):
+        for _ in range(2):
+            result = self.client.prove("daemon-test-unknown", text="fof(c,conjecture,r(c)).")
+        self.assertIsNone(result["status"])
+        self.assertFalse(result["cached"])
+        self.assertEqual(len(CALLS), 2)
+
+    def test_errors(self):
+        with self.assertRaisesRegex(DaemonError, "Unknown prover"):
+            self.client.prove("unknown", text="fof(c,conjecture,r(c)).")
+        with self.assertRaises(DaemonError):
+            self.client.parse(path=os.path.join(self.directory.name, "missing.p"))
+        self.assertEqual(self.client.status()["workers"], 2)
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from gavel.dialects.base import batch
+from gavel.dialects.tptp.dialect import TPTPProblemDialect
+
+
+class TestBatchTranslation(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, "src")
+        self.output = os.path.join(self.directory.name, "out")
+        for relative_path, content in [
+            ("a.p", "fof(a,axiom,p(c))."),
+            (os.path.join("sub", "b.p"), "fof(b,axiom,q(d))."),
+            ("broken.p", "fof(broken"),
+        ]:
+            path = os.path.join(self.source, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fp:
+                fp.write(content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _translate(self, path=None, **kwargs):
+        return batch.translate_batch(
+            TPTPProblemDialect, TPTPProblemDialect, path or self.source, self.output, **kwargs
+        )
+
+    def test_mirrors_directory(self):
+        result = self._translate()
+        self.assertEqual(sorted(result.translated), ["a.p", os.path.join("sub", "b.p")])
+        self.assertEqual(list(result.failed), ["broken.p"])
+        with open(os.path.join(self.output, "sub", "b.p")) as fp:
+            self.assertEqual(fp.read(), "fof(b,axiom,('q'('d'))).")
+        self.assertFalse(os.path.exists(os.path.join(self.output, "broken.p")))
+
+    def test_skips_unchanged_files(self):
+        self._translate()
+        with open(os.path.join(self.source, "a.p"), "w") as fp:
+            fp.write("fof(a,axiom,p(e)).")
+        result = self._translate()
+        self.assertEqual(result.translated, ["a.p"])
+        self.assertEqual(result.skipped, [os.path.join("sub", "b.p")])
+        result = self._translate(compiler_kwargs=dict(keep_annotations=False))
+        self.assertEqual(len(result.translated), 2)
+
+    def test_glob_in_worker_processes(self):
+        result = self._translate(os.path.join(self.source, "**", "*.p"), jobs=2)
+        self.assertEqual(len(result.translated), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.output, "sub", "b.p")))
@@ -0,0 +1,76 @@
+"""
+A miniature TPTP library for tests that work on whole libraries
+"""
+import os
+
+_SEPARATOR = "%" + "-" * 78
+
+_HEADER = """{separator}
+% File     : {name} : TPTP v8.1.0. Released v1.0.0.
+% Domain   : {domain_name}
+% Problem  : Generated problem {name}
+% Version  : Especial.
+% English  : A generated problem that spans
+%            two lines.
+
+% Refs     : [Gen23] Generator (2023), Generated Problems
+% Source   : [Gen23]
+% Names    :
+
+% Status   : {status}
+% Rating   : {rating} v8.1.0, 1.00 v2.0.0
+% Syntax   : Number of formulae    :    {formulas} (   1 unt;   0 def)
+%            Number of atoms       :    4 (   0 equ)
+%            Number of predicates  :    {predicates} (   2 usr;   0 prp; 1-2 aty)
+%            Number of functors    :    1 (   1 usr;   1 con; 0-0 aty)
+%            Number of variables   :    2 (   2   !;   0   ?)
+% SPC      : {spc}
+
+% Comments :
+{separator}
+"""
+
+PROBLEMS = [
+    dict(domain="SET", name="SET001+1", status="Theorem", rating="0.00", spc="FOF_THM_RFO_NEQ", includes=["Axioms/SET001+0.ax"]),
+    dict(domain="SET", name="SET002+1", status="CounterSatisfiable", rating="0.50", spc="FOF_CSA_RFO_NEQ", includes=[]),
+    dict(domain="GRP", name="GRP001-1", status="Unsatisfiable", rating="0.25", spc="CNF_UNS_RFO_PEQ_UEQ", includes=["Axioms/GRP001-0.ax", "Axioms/SET001+0.ax"]),
+]
+
+
+def problem_text(problem, formulas=2, predicates=2):
+    lines = [
+        _HEADER.format(
+            separator=_SEPARATOR,
+            domain_name=problem["domain"].title(),
+            formulas=formulas,
+            predicates=predicates,
+            **{k: v for k, v in problem.items() if k != "domain"}
+        )
+    ]
+    for include in problem["includes"]:
+        lines.append("include('%s').\n" % include)
+    lines.append(_SEPARATOR + "\n")
+    form = "cnf" if problem["spc"].startswith("CNF") else "fof"
+    for i in range(formulas - 1):
+        lines.append("%s(a%d,axiom,p(c%d)).\n" % (form, i, i))
+    role = "negated_conjecture" if form == "cnf" else "conjecture"
+    lines.append("%s(goal,%s,q(c0)).\n" % (form, role))
+    lines.append(_SEPARATOR + "\n")
+    return "".join(lines)
+
+
+def create_library(root, problems=PROBLEMS):
+    """
+    Writes `problems` to `root/Problems/<domain>/<name>.p` and returns
+    their paths
+    """
+    paths = []
+    for problem in problems:
+        directory = os.path.join(root, "Problems", problem["domain"])
+        os.makedirs(directory, exist_ok=True)
+        paths.append(os.path.join(directory, problem["name"] + ".p"))
+        with open(paths[-1], "w") as fp:
+            fp.write(problem_text(problem))
+    with open(os.path.join(root, "Problems", "README"), "w") as fp:
+        fp.write("Not a problem\n")
+    return paths
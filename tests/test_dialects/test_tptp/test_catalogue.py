@@ -0,0 +1,55 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from gavel.dialects.tptp.catalogue import Catalogue
+
+from .library import PROBLEMS
+from .library import create_library
+from .library import problem_text
+
+
+class TestCatalogue(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.paths = create_library(self.root)
+        self.catalogue = Catalogue(path=os.path.join(self.root, "tptp.sqlite"), root=self.root)
+
+    def tearDown(self):
+        self.catalogue.close()
+        self.directory.cleanup()
+
+    def test_metadata(self):
+        self.assertEqual(self.catalogue.update()["added"], 3)
+        entry, = self.catalogue.problems(domain="GRP")
+        self.assertEqual(entry.path, os.path.join("GRP", "GRP001-1.p"))
+        self.assertEqual(entry.name, "GRP001-1")
+        self.assertEqual(entry.status, "Unsatisfiable")
+        self.assertEqual(entry.spc, "CNF_UNS_RFO_PEQ_UEQ")
+        self.assertEqual(entry.rating, 0.25)
+        self.assertEqual((entry.formulas, entry.predicates, entry.functors, entry.variables), (2, 2, 1, 2))
+        self.assertEqual(self.catalogue.includes(entry.path), PROBLEMS[2]["includes"])
+
+    def test_queries(self):
+        self.catalogue.update()
+        self.assertEqual(len(self.catalogue), 3)
+        self.assertEqual([e.name for e in self.catalogue.problems(spc="FOF_%")], ["SET001+1", "SET002+1"])
+        self.assertEqual([e.name for e in self.catalogue.problems(max_rating=0.3)], ["GRP001-1", "SET001+1"])
+        self.assertEqual(
+            [e.name for e in self.catalogue.problems(includes="Axioms/SET001+0.ax", status="Theorem")],
+            ["SET001+1"],
+        )
+        self.assertEqual(self.catalogue.paths(domain="SET", limit=1), [self.paths[0]])
+
+    def test_incremental_update(self):
+        self.catalogue.update()
+        self.assertEqual(self.catalogue.update()["unchanged"], 3)
+        changed = dict(PROBLEMS[0], status="Unsatisfiable")
+        with open(self.paths[0], "w") as fp:
+            fp.write(problem_text(changed, formulas=5))
+        os.remove(self.paths[1])
+        counts = self.catalogue.update()
+        self.assertEqual((counts["updated"], counts["removed"], counts["unchanged"]), (1, 1, 1))
+        entry, = self.catalogue.problems(domain="SET")
+        self.assertEqual((entry.status, entry.formulas), ("Unsatisfiable", 5))
@@ -1,8 +1,12 @@
+import gc
+import io
 import unittest
 
 from gavel.logic import logic
 from gavel.logic import problem
 
+from src.gavel.dialects.base.compiler import CompilationContext
+from src.gavel.dialects.base.compiler import FormulaCache
 from src.gavel.dialects.tptp.compiler import TPTPCompiler
 from ..test_base.test_compiler import TestCompiler
 
@@ -50,3 +54,85 @@ class TestTPTPCompiler(TestCompiler):
             "fof(test_axiom,axiom,('pred'('c')))."
         )
 
+
+    def test_compile_to_matches_compile(self):
+        p = problem.Problem(
+            premises=[
+                problem.AnnotatedFormula('fof', 'a%d' % i, problem.FormulaRole.AXIOM, logic.PredicateExpression("pred", [logic.Constant('c%d' % i)]))
+                for i in range(3)
+            ],
+            conjectures=[
+                problem.AnnotatedFormula('fof', 'c', problem.FormulaRole.CONJECTURE, logic.PredicateExpression("pred", [logic.Variable('X')]))
+            ],
+            imports=[problem.Import("Axioms/SET001+0.ax")],
+        )
+        c = self.compiler()
+        stream = io.StringIO()
+        c.compile_to(p, stream)
+        self.assertEqual(stream.getvalue(), c.compile(p))
+        self.assertEqual(len(stream.getvalue().splitlines()), 5)
+
+    def test_symbol_normalization_is_cached_per_option(self):
+        c = self.compiler()
+        symbol = "http://example.org/Part-of"
+        self.assertEqual(c.compile(logic.Constant(symbol)), "'http___example_org_Part_of'")
+        c.shorten_names = True
+        self.assertEqual(c.compile(logic.Constant(symbol)), "'part_of'")
+        context = CompilationContext()
+        self.assertEqual(c.compile(logic.Variable(symbol), context=context), "Part_of")
+        self.assertEqual(context.name_mapping[symbol], "Part_of")
+
+    def test_formula_cache_replays_name_mapping(self):
+        formula = problem.AnnotatedFormula('fof', 'a', problem.FormulaRole.AXIOM, logic.PredicateExpression("http://example.org/pred", [logic.Constant('c')]), annotation="note")
+        cache = FormulaCache(10)
+        c = self.compiler(formula_cache=cache)
+        first = c.compile(formula)
+        self.assertEqual(len(cache), 1)
+        context = CompilationContext()
+        self.assertEqual(c.compile(formula, context=context), first)
+        self.assertEqual(context.name_mapping, {"http://example.org/pred": "http___example_org_pred", "c": "c"})
+        self.assertEqual(TPTPCompiler(keep_annotations=False, formula_cache=cache).compile(formula), "fof(a,axiom,('http___example_org_pred'('c'))).")
+        self.assertEqual(TPTPCompiler(shorten_names=True, formula_cache=cache).compile(formula), "% note\nfof(a,axiom,('pred'('c'))).")
+
+    def test_formula_cache_is_opt_in(self):
+        formula = problem.AnnotatedFormula('fof', 'a', problem.FormulaRole.AXIOM, logic.PredicateExpression("pred", [logic.Constant('c')]))
+        self.assertIsNone(self.compiler().formula_cache)
+
+        class MarkingCompiler(TPTPCompiler):
+            def _compile_annotated_formula(self, anno):
+                return "% marked\n" + super(MarkingCompiler, self)._compile_annotated_formula(anno)
+
+        cache = FormulaCache(10)
+        self.assertEqual(self.compiler(formula_cache=cache).compile(formula), "fof(a,axiom,('pred'('c'))).")
+        self.assertEqual(MarkingCompiler(formula_cache=cache).compile(formula), "% marked\nfof(a,axiom,('pred'('c'))).")
+
+    def test_formula_cache_drops_dead_formulas(self):
+        cache = FormulaCache(10)
+        c = self.compiler(formula_cache=cache)
+        formula = problem.AnnotatedFormula('fof', 'a', problem.FormulaRole.AXIOM, logic.PredicateExpression("pred", [logic.Constant('c')]))
+        c.compile(formula)
+        self.assertEqual(len(cache), 1)
+        del formula
+        gc.collect()
+        self.assertEqual(len(cache), 0)
+
+    def test_parallel_compilation_matches_sequential(self):
+        p = problem.Problem(
+            premises=[
+                problem.AnnotatedFormula('fof', 'a%d' % i, problem.FormulaRole.AXIOM, logic.PredicateExpression("pred%d" % (i % 7), [logic.Constant('c%d' % i)]))
+                for i in range(50)
+            ],
+            conjectures=[
+                problem.AnnotatedFormula('fof', 'c', problem.FormulaRole.CONJECTURE, logic.PredicateExpression("pred", [logic.Variable('X')]))
+            ],
+            imports=[problem.Import("Axioms/SET001+0.ax")],
+        )
+        c = self.compiler()
+        self.assertFalse(c._parallel(p, 2))
+        c.parallel_threshold = 0
+        sequential, parallel = CompilationContext(), CompilationContext()
+        self.assertEqual(c.compile(p, context=parallel, workers=2), c.compile(p, context=sequential))
+        self.assertEqual(list(parallel.name_mapping.items()), list(sequential.name_mapping.items()))
+        stream = io.StringIO()
+        c.compile_to(p, stream, workers=2)
+        self.assertEqual(stream.getvalue(), c.compile(p))
@@ -0,0 +1,65 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest import mock
+
+from gavel.config import settings
+from gavel.dialects.tptp.corpus import Corpus
+from gavel.dialects.tptp.parser import TPTPProblemParser
+from gavel.dialects.tptp.parser import all_problems
+
+from .library import create_library
+
+
+class TaggingParser(TPTPProblemParser):
+    def __init__(self, tag=None):
+        super().__init__()
+        self.tag = tag
+
+    def parse(self, structure, *args, **kwargs):
+        problem = super().parse(structure, *args, **kwargs)
+        problem.tag = (self.tag, type(structure))
+        return problem
+
+
+class TestCorpus(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = sorted(create_library(self.directory.name))
+        self.broken = os.path.join(self.directory.name, "Problems", "SET", "SET003+1.p")
+        with open(self.broken, "w") as fp:
+            fp.write("fof(broken,axiom,(p(a)).\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ordered(self):
+        for jobs in (1, 2):
+            progress = []
+            corpus = Corpus(
+                self.paths + [self.broken],
+                jobs=jobs,
+                prefetch=1,
+                progress=lambda done, total, path: progress.append((done, total)),
+            )
+            results = list(corpus)
+            self.assertEqual([path for path, _ in results], self.paths)
+            self.assertEqual([len(problem.conjectures) for _, problem in results], [1, 1, 1])
+            self.assertEqual([path for path, _ in corpus.failures], [self.broken])
+            self.assertEqual(progress[-1], (4, 4))
+
+    def test_as_completed(self):
+        corpus = Corpus(self.paths, jobs=2, ordered=False)
+        self.assertEqual(sorted(path for path, _ in corpus), self.paths)
+
+    def test_all_problems(self):
+        with mock.patch.object(settings, "TPTP_ROOT", self.directory.name), mock.patch("builtins.print"):
+            results = list(all_problems(TPTPProblemParser()))
+        self.assertEqual([path for path, _ in results], self.paths)
+        self.assertEqual(results[0][1].premises[0].name, "a0")
+
+    def test_all_problems_uses_processor(self):
+        for jobs in (1, 2):
+            with mock.patch.object(settings, "TPTP_ROOT", self.directory.name), mock.patch("builtins.print"):
+                results = list(all_problems(TaggingParser("configured"), jobs=jobs))
+            self.assertEqual([problem.tag for _, problem in results], [("configured", str)] * 3)
@@ -0,0 +1,41 @@
+import tempfile
+from unittest import TestCase
+
+from gavel.dialects.tptp import header
+
+from .library import PROBLEMS
+from .library import create_library
+from .library import problem_text
+
+
+class TestHeader(TestCase):
+    def test_parse_header(self):
+        record = header.parse_header(
+            problem_text(PROBLEMS[2], formulas=7).splitlines(), path="Problems/GRP/GRP001-1.p"
+        )
+        self.assertEqual((record.domain, record.name), ("GRP", "GRP001-1"))
+        self.assertEqual(record.status, "Unsatisfiable")
+        self.assertEqual(record.spc, "CNF_UNS_RFO_PEQ_UEQ")
+        self.assertEqual(record.rating, 0.25)
+        self.assertEqual(record.ratings, [(0.25, "v8.1.0"), (1.0, "v2.0.0")])
+        self.assertEqual(record.formulas, 7)
+        self.assertEqual(record.syntax["variables"], 2)
+        self.assertEqual(record.fields["English"], "A generated problem that spans two lines.")
+        self.assertEqual(record.includes, PROBLEMS[2]["includes"])
+
+    def test_stops_at_first_formula(self):
+        lines = iter(["% Status   : Theorem", "fof(a,axiom,p).", "% SPC      : FOF_THM"])
+        record = header.parse_header(lines)
+        self.assertEqual(record.status, "Theorem")
+        self.assertIsNone(record.spc)
+        self.assertEqual(next(lines), "% SPC      : FOF_THM")
+
+    def test_scan_library(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = sorted(create_library(root))
+            for jobs in (1, 2):
+                records = list(header.scan_library(root, jobs=jobs))
+                self.assertEqual([r.path for r in records], paths)
+                self.assertEqual(
+                    [r.status for r in records], ["Unsatisfiable", "Theorem", "CounterSatisfiable"]
+                )
@@ -730,6 +730,23 @@ fof(c, conjecture, $false)."""
         self.check_parser(inp, result)
 
 
+    def test_parse_stream_yields_statements_in_order(self):
+        def lines():
+            yield "fof(a,axiom,p(c)).\n"
+            yield "% a comment\n"
+            yield "fof(b,conjecture,\n"
+            yield "q(c)).\n"
+            # Complete statements are available before the stream ends
+            self.assertEqual(len(parsed), 2)
+            yield "fof(d,axiom,r).\n"
+
+        parsed = []
+        for element in self.parser.parse_stream(lines()):
+            parsed.append(element)
+        self.assertEqual([e.name for e in parsed], ["a", "b", "d"])
+        self.assertTrue(parsed[1].is_conjecture())
+
+
 class TestTPTPProofParser(TestProofParser):
     _parser_cls = SimpleTPTPProofParser
 
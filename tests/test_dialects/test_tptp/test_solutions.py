@@ -0,0 +1,81 @@
+import os
+import tarfile
+import tempfile
+from unittest import TestCase
+from unittest import mock
+
+from gavel.config import settings
+from gavel.dialects.tptp.parser import load_solution
+from gavel.dialects.tptp.solutions import SolutionStore
+from gavel.logic import status
+
+_PROOF = """# Comment of the prover
+% SZS status Theorem for SET001+1
+% SZS output start CNFRefutation for SET001+1
+fof(a,axiom,p(c)).
+fof(goal,conjecture,p(c)).
+fof(f1,plain,$false,inference(resolution,[],[a,goal])).
+% SZS output end CNFRefutation for SET001+1
+"""
+
+_SOLUTIONS = {
+    ("SET", "SET001+1", "E---2.5.s"): _PROOF,
+    ("SET", "SET001+1", "Vampire---4.8.s"): _PROOF.replace("#", "%"),
+    ("SET", "SET002+1", "E---2.5.s"): "% SZS status GaveUp for SET002+1\n",
+}
+
+
+class TestSolutionStore(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.solutions = os.path.join(self.directory.name, "Solutions")
+        for parts, text in _SOLUTIONS.items():
+            os.makedirs(os.path.join(self.solutions, *parts[:2]), exist_ok=True)
+            with open(os.path.join(self.solutions, *parts), "w") as fp:
+                fp.write(text)
+        self.store_path = os.path.join(self.directory.name, "solutions.sqlite")
+        self.store = SolutionStore(self.store_path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_import_directory(self):
+        self.assertEqual(self.store.import_path(self.solutions), 3)
+        self.assertEqual(self.store.systems("SET", "SET001+1"), ["E---2.5", "Vampire---4.8"])
+        solution = self.store.get("SET", "SET001+1", "E---2.5")
+        self.assertEqual(solution.status, "Theorem")
+        self.assertEqual(solution.text, _PROOF)
+        self.assertIsInstance(solution.proof.status, status.StatusTheorem)
+        self.assertEqual([step.name for step in solution.proof.steps], ["a", "goal", "f1"])
+        self.assertIsNone(self.store.get("SET", "SET002+1", "E---2.5").proof)
+        self.assertIsNone(self.store.get("SET", "SET003+1", "E---2.5"))
+        self.assertEqual(len(list(self.store.solutions(status="Theorem"))), 2)
+
+    def test_solutions_are_read_lazily(self):
+        self.store.import_path(self.solutions)
+        queries = []
+        self.store._connection.set_trace_callback(queries.append)
+        solutions = list(self.store.solutions(domain="SET"))
+        self.assertEqual(len(solutions), 3)
+        self.assertFalse(any("data" in query for query in queries))
+        self.assertEqual(solutions[0].text, _PROOF)
+        self.assertTrue(any("data" in query for query in queries))
+
+    def test_import_archive(self):
+        archive = os.path.join(self.directory.name, "solutions.tgz")
+        with tarfile.open(archive, "w:gz") as fp:
+            fp.add(self.solutions, arcname="TSTP/Solutions")
+        self.assertEqual(self.store.import_path(archive), 3)
+        # Importing again replaces the solutions
+        self.store.import_path(archive)
+        self.assertEqual(len(self.store), 3)
+
+    def test_load_solution_from_store(self):
+        self.store.import_path(self.solutions)
+        with mock.patch.object(settings, "SOLUTIONS_STORE", self.store_path), mock.patch(
+            "gavel.dialects.tptp.parser._load_solution"
+        ) as fetch:
+            proof = load_solution("SET", "SET001+1", system="Vampire---4.8")
+        fetch.assert_not_called()
+        self.assertEqual(len(proof.steps), 3)
@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest import mock
+
+from click.testing import CliRunner
+
+from gavel.cli import translate
+from gavel.instrumentation import memory
+from gavel.instrumentation import stages
+
+
+class TestMemoryProfile(TestCase):
+    def test_stages(self):
+        self._test_stages()
+
+    def test_stages_without_reset_peak(self):
+        # Python 3.8 cannot reset the peak of tracemalloc
+        with mock.patch.object(memory, "_reset_peak", None):
+            self._test_stages()
+
+    def _test_stages(self):
+        instrumentation = stages.Instrumentation()
+        with memory.profile() as collector:
+            with instrumentation.stage("outer"):
+                retained = [object() for _ in range(10000)]
+                with instrumentation.stage("inner"):
+                    temporary = bytearray(2 ** 20)
+                    del temporary
+        inner, outer = collector.records
+        self.assertEqual((inner.stage, outer.stage), ("inner", "outer"))
+        self.assertGreaterEqual(inner.metrics["memory_peak"], 2 ** 20)
+        self.assertLess(inner.metrics["memory_retained"], 2 ** 20)
+        # The peak of the inner stage is part of the peak of the outer stage
+        self.assertGreaterEqual(outer.metrics["memory_peak"], 2 ** 20)
+        self.assertGreater(outer.metrics["memory_retained"], 0)
+        self.assertIn(__file__, outer.metrics["memory_top"][0]["site"])
+        self.assertIn("outer", memory.summarize(collector.records))
+        del retained
+
+    def test_translate(self):
+        source = os.path.join(os.path.dirname(__file__), "..", "files", "single_line_fof.txt")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.json")
+            result = CliRunner().invoke(
+                translate,
+                ["--profile-memory", "--profile-memory-output", path, "tptp", "tptp", source],
+            )
+            self.assertEqual(result.exit_code, 0, result.output)
+            with open(path) as fp:
+                records = json.load(fp)
+        self.assertEqual([r["stage"] for r in records], ["parse", "compile"])
+        self.assertIn("memory_retained", records[0])
+
+    def test_translate_flag_precedes_arguments(self):
+        source = os.path.join(os.path.dirname(__file__), "..", "files", "single_line_fof.txt")
+        result = CliRunner().invoke(translate, ["--profile-memory", "tptp", "tptp", source])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("fof(", result.output)
+        result = CliRunner().invoke(translate, ["--profile-memory-output", "memory.json", "tptp", "tptp", source])
+        self.assertNotEqual(result.exit_code, 0)
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from click.testing import CliRunner
+
+from gavel.cli import cli
+from gavel.instrumentation import profiling
+from gavel.instrumentation import stages
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfiling(TestCase):
+    def _profile(self, profiler):
+        instrumentation = stages.Instrumentation()
+        profiler.start()
+        try:
+            with instrumentation.stage("work"):
+                _busy(0.1)
+        finally:
+            profiler.stop()
+        return profiler
+
+    def test_deterministic(self):
+        profiler = self._profile(profiling.DeterministicProfiler())
+        self.assertIn("work", profiler.profiles)
+        functions = [f for f, _, _ in profiler.hot_functions(5)]
+        self.assertTrue(any(f.startswith("_busy") for f in functions), functions)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = profiler.save(os.path.join(directory, "run"))
+            self.assertIn(os.path.join(directory, "run.work.pstats"), paths)
+            self.assertTrue(all(os.path.exists(p) for p in paths))
+
+    def test_sampling(self):
+        profiler = self._profile(profiling.SamplingProfiler(interval=0.001))
+        self.assertTrue(profiler.samples)
+        self.assertTrue(all(stack[0] in ("main", "work") for stack in profiler.samples))
+        self.assertTrue(any(stack[0] == "work" for stack in profiler.samples))
+        with tempfile.TemporaryDirectory() as directory:
+            path, = profiler.save(os.path.join(directory, "run"))
+            with open(path) as fp:
+                stack, count = fp.readline().rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertIn(";", stack)
+
+    def test_cli(self):
+        with tempfile.TemporaryDirectory() as directory:
+            prefix = os.path.join(directory, "run")
+            result = CliRunner().invoke(
+                cli, ["--profile", "--profile-output", prefix, "--profile-top", "3", "dialects"]
+            )
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertTrue(os.path.exists(prefix + ".pstats"))
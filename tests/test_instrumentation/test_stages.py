@@ -0,0 +1,88 @@
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest import TestCase
+from unittest import skipUnless
+
+from gavel.instrumentation import stages
+from gavel.logic import problem as prob
+from gavel.logic import status
+from gavel.logic.solution import Proof
+from gavel.prover.base.interface import BaseProverInterface
+
+
+class EchoProver(BaseProverInterface):
+    def _submit_problem(self, problem_instance, *args, **kwargs):
+        return Proof(steps=list(problem_instance.premises), status=status.StatusTheorem())
+
+
+def _problem():
+    return prob.Problem(
+        premises=[
+            prob.AnnotatedFormula("fof", "a%d" % i, prob.FormulaRole.AXIOM, "p")
+            for i in range(3)
+        ],
+        conjectures=[],
+    )
+
+
+class TestStageInstrumentation(TestCase):
+    def test_proof_stages(self):
+        proof = EchoProver().prove(_problem())
+        self.assertEqual(
+            [r.stage for r in proof.stages],
+            ["bootstrap", "submit", "post_process", "build"],
+        )
+        bootstrap = proof.stages[0]
+        self.assertEqual(bootstrap.input_formulas, 3)
+        self.assertGreaterEqual(bootstrap.wall_time, 0)
+        self.assertEqual(proof.stages[-1].output_formulas, 3)
+
+    def test_collector(self):
+        collector = stages.RecordCollector()
+        prover = EchoProver(instrumentation=stages.Instrumentation(collector))
+        for _ in range(2):
+            prover.prove(_problem())
+        self.assertEqual(len(collector.records), 8)
+
+    def test_json_lines_summary(self):
+        proof = EchoProver().prove(_problem())
+        buffer = io.StringIO()
+        stages.write_json_lines(proof.stages, buffer, problem="test")
+        buffer.seek(0)
+        records = stages.read_json_lines(buffer)
+        self.assertEqual(records[0]["problem"], "test")
+        summary = stages.summarize(records + proof.stages)
+        self.assertIn("bootstrap", summary)
+        self.assertEqual(len(summary.splitlines()), 5)
+
+    def test_measure_text(self):
+        self.assertEqual(
+            stages.measure("fof(a,axiom,p).\nfof(b,axiom,q)."), (31, 2)
+        )
+
+    @skipUnless(hasattr(os, "wait4"), "requires os.wait4")
+    def test_child_cpu_time_is_per_process(self):
+        busy = [sys.executable, "-c", "import time\nend = time.process_time() + 0.2\nwhile time.process_time() < end: pass"]
+        instrumentation = stages.Instrumentation()
+        records = {}
+
+        def idle():
+            with instrumentation.stage("idle") as record:
+                records["idle"] = record
+                time.sleep(0.5)
+
+        thread = threading.Thread(target=idle)
+        thread.start()
+        with instrumentation.stage("outer") as outer:
+            with instrumentation.stage("busy") as record:
+                stages.check_output(busy)
+        thread.join()
+        self.assertGreaterEqual(record.child_cpu_time, 0.15)
+        self.assertEqual(outer.child_cpu_time, record.child_cpu_time)
+        self.assertEqual(records["idle"].child_cpu_time, 0)
+        with self.assertRaises(subprocess.CalledProcessError):
+            stages.check_output([sys.executable, "-c", "import sys; sys.exit(3)"])
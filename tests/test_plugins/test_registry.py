@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from gavel import plugins
+from gavel.config import settings
+from gavel.dialects.base import dialect
+from gavel.dialects.tptp.dialect import TPTPProblemDialect
+from gavel.prover import registry
+
+
+class TestPluginDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_cache = settings.PLUGIN_CACHE
+        settings.PLUGIN_CACHE = os.path.join(self.directory.name, "plugins.json")
+
+    def tearDown(self):
+        settings.PLUGIN_CACHE = self.previous_cache
+        plugins.discover(refresh=True)
+        dialect._DIALECT_REGISTRY.pop("cached-tptp", None)
+        self.directory.cleanup()
+
+    def test_discovery_is_cached(self):
+        discovered = plugins.discover(refresh=True)
+        self.assertEqual(set(discovered), set(plugins.GROUPS))
+        with open(settings.PLUGIN_CACHE) as fp:
+            cache = json.load(fp)
+        self.assertEqual(cache["entry_points"], discovered)
+
+    def test_dialects_are_loaded_from_cached_references(self):
+        plugins.discover(refresh=True)
+        with open(settings.PLUGIN_CACHE) as fp:
+            cache = json.load(fp)
+        cache["entry_points"]["gavel.dialects"].append(
+            ["cached-tptp", "gavel.dialects.tptp.dialect:TPTPProblemDialect"]
+        )
+        with open(settings.PLUGIN_CACHE, "w") as fp:
+            json.dump(cache, fp)
+        plugins._DISCOVERED = None
+        self.assertIn("cached-tptp", dialect.available_dialects())
+        self.assertIs(dialect.get_dialect("cached-tptp"), TPTPProblemDialect)
+
+    def test_outdated_cache_is_ignored(self):
+        with open(settings.PLUGIN_CACHE, "w") as fp:
+            json.dump(dict(fingerprint=[], entry_points={}), fp)
+        plugins._DISCOVERED = None
+        self.assertEqual(set(plugins.discover()), set(plugins.GROUPS))
+
+    def test_builtin_provers_are_imported_on_demand(self):
+        registry.PROVERS.pop("eprover", None)
+        prover = registry.get_prover("eprover")
+        self.assertIs(prover, sys.modules["gavel.prover.eprover.interface"].EProverInterface)
+
+    def test_cache_is_only_written_on_changes(self):
+        plugins.discover(refresh=True)
+        os.utime(settings.PLUGIN_CACHE, ns=(0, 0))
+        plugins.discover(refresh=True)
+        self.assertEqual(os.stat(settings.PLUGIN_CACHE).st_mtime_ns, 0)
+
+    def test_fingerprint_ignores_working_directory(self):
+        working_directory = os.getcwd()
+        entries = ["", self.directory.name]
+        os.chdir(self.directory.name)
+        sys.path[:0] = entries
+        try:
+            fingerprint = plugins._fingerprint()
+            os.mkdir("local.egg-info")
+            self.assertEqual(plugins._fingerprint(), fingerprint)
+        finally:
+            del sys.path[: len(entries)]
+            os.chdir(working_directory)
@@ -0,0 +1,89 @@
+from unittest import TestCase
+
+from gavel.dialects.tptp.dialect import TPTPProofDialect
+from gavel.logic import logic
+from gavel.logic import problem as prob
+from gavel.prover.base.interface import BaseProverInterface
+
+
+class EchoProofProver(BaseProverInterface):
+    """
+    Answers every problem with a "proof" that consists of the problem itself
+    """
+
+    _prover_dialect_cls = TPTPProofDialect
+
+    def _submit_problem(self, problem_instance, *args, context=None, **kwargs):
+        return "% SZS status Theorem\n" + problem_instance
+
+
+def _problem():
+    return prob.Problem(
+        premises=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="a1",
+                role=prob.FormulaRole.AXIOM,
+                formula=logic.QuantifiedFormula(
+                    logic.Quantifier.UNIVERSAL,
+                    [logic.Variable("X")],
+                    logic.BinaryFormula(
+                        logic.PredicateExpression("http://example.org#human", [logic.Variable("X")]),
+                        logic.BinaryConnective.IMPLICATION,
+                        logic.PredicateExpression("http://example.org#mortal", [logic.Variable("X")]),
+                    ),
+                ),
+                annotation="All humans are mortal",
+            ),
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="a2",
+                role=prob.FormulaRole.AXIOM,
+                formula=logic.PredicateExpression(
+                    "http://example.org#human", [logic.Constant("http://example.org#socrates")]
+                ),
+            ),
+        ],
+        conjectures=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="c",
+                role=prob.FormulaRole.CONJECTURE,
+                formula=logic.PredicateExpression(
+                    "http://example.org#mortal", [logic.Constant("http://example.org#socrates")]
+                ),
+            )
+        ],
+    )
+
+
+class TestCompactSymbols(TestCase):
+    def test_bootstrap_is_compact(self):
+        prover = EchoProofProver(compact_symbols=True)
+        context = prover._create_context()
+        text = prover._bootstrap_problem(_problem(), context=context)
+        self.assertEqual(
+            text,
+            "fof(a1,axiom,(![V1]:(s1(V1)=>s2(V1))))."
+            "\nfof(a2,axiom,(s1(s3)))."
+            "\nfof(c,conjecture,(s2(s3))).",
+        )
+        self.assertEqual(context.compilation.reverse_mapping["s3"], "http://example.org#socrates")
+        self.assertEqual(context.compilation.reverse_mapping["V1"], "X")
+
+    def test_proof_uses_original_symbols(self):
+        proof = EchoProofProver(compact_symbols=True).prove(_problem())
+        self.assertEqual(proof.steps[0].formula.variables[0].symbol, "X")
+        implication = proof.steps[0].formula.formula
+        self.assertEqual(implication.left.predicate, "http://example.org#human")
+        self.assertEqual(implication.right.predicate, "http://example.org#mortal")
+        self.assertEqual(
+            proof.steps[2].formula.arguments[0].symbol, "http://example.org#socrates"
+        )
+
+    def test_unsupported_dialect(self):
+        class IdentityProver(BaseProverInterface):
+            pass
+
+        with self.assertRaises(ValueError):
+            IdentityProver(compact_symbols=True)
@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from gavel.dialects.tptp.dialect import TPTPProblemDialect
+from gavel.logic import logic
+from gavel.logic import problem as prob
+from gavel.logic import status
+from gavel.logic.solution import Proof
+from gavel.prover.base.interface import BaseProverInterface
+from gavel.prover.vampire.interface import VampireInterface
+
+
+class EchoTPTPProver(BaseProverInterface):
+    _prover_dialect_cls = TPTPProblemDialect
+
+    def _submit_problem(self, problem_instance, *args, context=None, **kwargs):
+        return problem_instance
+
+    def _build_proof(self, prover_output, problem, context=None):
+        proof = Proof(steps=[prover_output], status=status.StatusTheorem())
+        proof.name_mapping = dict(context.compilation.name_mapping)
+        return proof
+
+
+def _problem(i):
+    return prob.Problem(
+        premises=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="a%d_%d" % (i, j),
+                role=prob.FormulaRole.AXIOM,
+                formula=logic.QuantifiedFormula(
+                    logic.Quantifier.UNIVERSAL,
+                    [logic.Variable("X%d" % i)],
+                    logic.BinaryFormula(
+                        logic.PredicateExpression("http://p%d#pred%d" % (i, j), [logic.Variable("X%d" % i)]),
+                        logic.BinaryConnective.IMPLICATION,
+                        logic.PredicateExpression("q%d" % i, [logic.Constant("c%d_%d" % (i, j))]),
+                    ),
+                ),
+            )
+            for j in range(20)
+        ],
+        conjectures=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="c%d" % i,
+                role=prob.FormulaRole.CONJECTURE,
+                formula=logic.PredicateExpression("q%d" % i, [logic.Constant("c%d" % i)]),
+            )
+        ],
+    )
+
+
+def _result(proof):
+    return proof.steps[0], sorted(proof.name_mapping.items())
+
+
+class TestConcurrentProvers(TestCase):
+    def setUp(self):
+        self.problems = [_problem(i) for i in range(200)]
+        self.prover = EchoTPTPProver()
+        self.expected = [_result(self.prover.prove(p)) for p in self.problems]
+
+    def test_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda p: _result(self.prover.prove(p)), self.problems))
+        self.assertEqual(results, self.expected)
+
+    def test_asyncio(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                return await asyncio.gather(
+                    *(loop.run_in_executor(pool, self.prover.prove, p) for p in self.problems)
+                )
+
+        results = [_result(p) for p in asyncio.run(run())]
+        self.assertEqual(results, self.expected)
+
+    def test_name_mapping_is_per_call(self):
+        for i, (_, mapping) in enumerate(self.expected):
+            self.assertTrue(all(str(i) in key for key, _ in mapping))
+
+
+class TestVampireFlags(TestCase):
+    def test_flags_do_not_grow(self):
+        prover = VampireInterface()
+        flags = list(prover.flags)
+        for _ in range(3):
+            context = prover._create_context()
+            prover._bootstrap_problem(_problem(0), context=context).remove()
+            self.assertEqual(context.flags, ["--mode casc"] + flags)
+        self.assertEqual(prover.flags, flags)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from gavel.logic import logic
+from gavel.logic import problem as prob
+from gavel.logic import status
+from gavel.prover.eprover.interface import EProverInterface
+from gavel.prover.hets.async_interface import AsyncHetsProve
+from gavel.prover.hets.async_interface import AsyncHetsSession
+from gavel.prover.hets.interface import HetsEngine
+from gavel.prover.hets.interface import HetsProve
+from gavel.prover.hets.interface import HetsSession
+from gavel.prover.hets.server import HetsStandInServer
+
+
+def _problem(i, conjectures=1):
+    return prob.Problem(
+        premises=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="a%d" % j,
+                role=prob.FormulaRole.AXIOM,
+                formula=logic.PredicateExpression("p%d" % j, [logic.Constant("c")]),
+            )
+            for j in range(5)
+        ],
+        conjectures=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="c%d_%d" % (i, j),
+                role=prob.FormulaRole.CONJECTURE,
+                formula=logic.PredicateExpression("q%d" % i, [logic.Constant("c")]),
+            )
+            for j in range(conjectures)
+        ],
+    )
+
+
+class HetsTestCase(TestCase):
+    def setUp(self):
+        self.server = HetsStandInServer().start()
+        self.engine = HetsEngine("127.0.0.1", self.server.port)
+
+    def tearDown(self):
+        self.server.stop()
+
+
+class TestHetsProve(HetsTestCase):
+    def test_prove(self):
+        prover = HetsProve(EProverInterface(), HetsSession(self.engine))
+        proof = prover.prove(_problem(0))
+        self.assertIsInstance(proof.status, status.StatusTheorem)
+        self.assertEqual(self.server.requests["uploadFile"], 1)
+
+    def test_identical_content_is_uploaded_once(self):
+        prover = HetsProve(EProverInterface(), HetsSession(self.engine))
+        for _ in range(3):
+            prover.prove(_problem(0))
+        self.assertEqual(self.server.requests["uploadFile"], 1)
+
+    def test_shared_premises(self):
+        session = HetsSession(self.engine)
+        prover = HetsProve(EProverInterface(), session, share_premises=True)
+        for i in range(3):
+            prover.prove(_problem(i))
+        self.assertEqual(self.server.requests["uploadFile"], 4)
+        self.assertEqual(len(session.uploads), 4)
+
+
+class TestAsyncHetsProve(HetsTestCase):
+    def test_prove_many(self):
+        problems = [_problem(i, conjectures=3) for i in range(20)]
+
+        async def run():
+            async with AsyncHetsSession(self.engine, pool_size=4) as session:
+                return await AsyncHetsProve(EProverInterface(), session).prove_many(problems)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 20)
+        for proofs in results:
+            self.assertEqual(len(proofs), 3)
+            for proof in proofs:
+                self.assertIsInstance(proof.status, status.StatusTheorem)
+        self.assertEqual(self.server.requests["uploadFile"], 20)
+        self.assertEqual(self.server.requests["prove"], 20)
+
+    def test_shared_premises(self):
+        problems = [_problem(i) for i in range(10)] * 2
+
+        async def run():
+            async with AsyncHetsSession(self.engine, pool_size=4) as session:
+                prover = AsyncHetsProve(EProverInterface(), session, share_premises=True)
+                return await prover.prove_many(problems)
+
+        self.assertEqual(len(asyncio.run(run())), 20)
+        self.assertEqual(self.server.requests["uploadFile"], 11)
+        self.assertTrue(
+            any(c.startswith("include(") for c in self.server.files.values())
+        )
+
+    def test_close_does_not_block_the_loop(self):
+        async def run():
+            session = AsyncHetsSession(self.engine, pool_size=1)
+            # Occupies the only worker thread of the session
+            blocker = asyncio.get_running_loop().run_in_executor(session._executor, time.sleep, 0.3)
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while not blocker.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(session.close(), tick())
+            return ticks
+
+        self.assertGreater(asyncio.run(run()), 5)
+
+
+class _ReorderingSession:
+    """
+    Answers the goals in reverse order and omits the goals in `missing`
+    """
+
+    folder = "folder"
+
+    def __init__(self, missing=()):
+        self.missing = missing
+
+    async def upload(self, content):
+        return "f0"
+
+    async def prove(self, name, goals, premises=None):
+        return [
+            dict(
+                name=goal["conjecture"],
+                prover_output="% SZS status Theorem for {0}\n% SZS output start\n"
+                "fof({0},conjecture,q).\n% SZS output end".format(goal["conjecture"]),
+            )
+            for goal in reversed(goals)
+            if goal["conjecture"] not in self.missing
+        ]
+
+
+class TestAsyncHetsResults(TestCase):
+    def test_results_are_matched_by_name(self):
+        prover = AsyncHetsProve(EProverInterface(), _ReorderingSession())
+        proofs = asyncio.run(prover.prove(_problem(0, conjectures=3)))
+        self.assertEqual([p.steps[0].name for p in proofs], ["c0_0", "c0_1", "c0_2"])
+
+    def test_missing_result(self):
+        prover = AsyncHetsProve(EProverInterface(), _ReorderingSession(missing=["c0_1"]))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(prover.prove(_problem(0, conjectures=3)))
+
+
+class TestHetsSessionUploads(HetsTestCase):
+    def test_concurrent_identical_uploads(self):
+        session = HetsSession(self.engine)
+        barrier = threading.Barrier(8)
+
+        def upload(i):
+            barrier.wait()
+            return session.upload("f%d" % i, "fof(a,axiom,p).")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(upload, range(8)))
+        self.assertEqual(self.server.requests["uploadFile"], 1)
+        self.assertEqual(len(set(results)), 1)
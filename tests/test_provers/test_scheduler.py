@@ -0,0 +1,124 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from gavel.instrumentation.stages import Instrumentation
+from gavel.instrumentation.stages import RecordCollector
+from gavel.logic import logic
+from gavel.logic import problem as prob
+from gavel.logic import status
+from gavel.logic.solution import Proof
+from gavel.prover.base.interface import BaseProverInterface
+from gavel.prover.registry import register_prover
+from gavel.prover.scheduler import ProblemFeatures
+from gavel.prover.scheduler import Strategy
+from gavel.prover.scheduler import StrategyHistory
+from gavel.prover.scheduler import StrategyScheduler
+
+CALLS = []
+
+
+@register_prover("scheduler-test-fail")
+class FailingTestProver(BaseProverInterface):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flags = kwargs.get("flags", [])
+
+    def _submit_problem(self, problem_instance, *args, **kwargs):
+        CALLS.append(("fail", self.flags))
+        return Proof(status=status.StatusGaveUp())
+
+
+@register_prover("scheduler-test-solve")
+class SolvingTestProver(FailingTestProver):
+    def _submit_problem(self, problem_instance, *args, **kwargs):
+        CALLS.append(("solve", self.flags))
+        return Proof(status=status.StatusTheorem())
+
+
+def _problem(operator=logic.BinaryConnective.IMPLICATION, logic_name="fof"):
+    return prob.Problem(
+        premises=[
+            prob.AnnotatedFormula(
+                logic=logic_name,
+                name="a1",
+                role=prob.FormulaRole.AXIOM,
+                formula=logic.BinaryFormula(
+                    logic.Constant("a"), operator, logic.Constant("b")
+                ),
+            )
+        ],
+        conjectures=[
+            prob.AnnotatedFormula(
+                logic=logic_name,
+                name="c",
+                role=prob.FormulaRole.CONJECTURE,
+                formula=logic.PredicateExpression("p", [logic.Constant("a")]),
+            )
+        ],
+    )
+
+
+class TestProblemFeatures(TestCase):
+    def test_equality(self):
+        self.assertFalse(ProblemFeatures.from_problem(_problem()).has_equality)
+        self.assertTrue(
+            ProblemFeatures.from_problem(
+                _problem(operator=logic.BinaryConnective.EQ)
+            ).has_equality
+        )
+
+    def test_form(self):
+        self.assertEqual(ProblemFeatures.from_problem(_problem()).form, "fof")
+        self.assertEqual(
+            ProblemFeatures.from_problem(_problem(logic_name="cnf")).form, "cnf"
+        )
+
+
+class TestStrategyScheduler(TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.history_path = os.path.join(self.directory.name, "history.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _scheduler(self, budget=10):
+        return StrategyScheduler(
+            budget=budget,
+            strategies=[
+                Strategy("scheduler-test-fail", ["--first"]),
+                Strategy("scheduler-test-solve", ["--second"]),
+            ],
+            history=StrategyHistory(self.history_path),
+        )
+
+    def test_runs_until_solved(self):
+        proof = self._scheduler().prove(_problem())
+        self.assertIsInstance(proof.status, status.StatusTheorem)
+        self.assertEqual([name for name, _ in CALLS], ["fail", "solve"])
+        self.assertTrue(os.path.exists(self.history_path))
+
+    def test_attempts_are_stages(self):
+        collector = RecordCollector()
+        scheduler = self._scheduler()
+        scheduler.instrumentation = Instrumentation(collector)
+        proof = scheduler.prove(_problem())
+        self.assertEqual([r.stage for r in proof.stages], ["bootstrap", "submit", "post_process", "build"])
+        attempts = [r for r in collector.records if r.stage == "strategy"]
+        self.assertEqual([r.metrics["strategy"] for r in attempts], ["scheduler-test-fail --first", "scheduler-test-solve --second"])
+        self.assertEqual([r.metrics["solved"] for r in attempts], [False, True])
+        # The stages of the strategies' provers are recorded as well
+        self.assertEqual([r.stage for r in collector.records].count("submit"), 3)
+
+    def test_history_reorders_strategies(self):
+        self._scheduler().prove(_problem())
+        CALLS.clear()
+        self._scheduler().prove(_problem())
+        self.assertEqual([name for name, _ in CALLS], ["solve"])
+
+    def test_schedule_respects_budget(self):
+        plan = self._scheduler(budget=10).schedule(_problem())
+        self.assertEqual([s.prover for s, _ in plan], ["scheduler-test-fail", "scheduler-test-solve"])
+        self.assertEqual(sum(t for _, t in plan), 10)
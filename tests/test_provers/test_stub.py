@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+from unittest import TestCase
+from unittest import mock
+
+from gavel.logic import logic
+from gavel.logic import problem as prob
+from gavel.logic import status
+from gavel.prover import stub
+from gavel.prover.eprover.interface import EProverInterface
+from gavel.prover.vampire.interface import VampireInterface
+
+
+def _problem():
+    return prob.Problem(
+        premises=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="a%d" % i,
+                role=prob.FormulaRole.AXIOM,
+                formula=logic.PredicateExpression("p", [logic.Constant("c%d" % i)]),
+            )
+            for i in range(3)
+        ],
+        conjectures=[
+            prob.AnnotatedFormula(
+                logic="fof",
+                name="goal",
+                role=prob.FormulaRole.CONJECTURE,
+                formula=logic.PredicateExpression("p", [logic.Constant("c0")]),
+            )
+        ],
+    )
+
+
+class TestStubProver(TestCase):
+    def test_read_sentences(self):
+        text = "% comment\ninclude('Axioms/SET001.ax').\nfof(a,axiom,\n  p(c)).\ncnf(b,axiom,q(c)).\n"
+        self.assertEqual(
+            list(stub.read_sentences(text.splitlines())),
+            ["fof(a,axiom, p(c)).", "cnf(b,axiom,q(c))."],
+        )
+
+    def test_eprover(self):
+        with mock.patch.dict(os.environ, GAVEL_STUB_STEPS="5"):
+            proof = EProverInterface(executable=stub.command()).prove(_problem())
+        self.assertIsInstance(proof.status, status.StatusTheorem)
+        # 4 echoed sentences, 5 inference steps and the refutation
+        self.assertEqual(len(proof.steps), 10)
+
+    def test_vampire(self):
+        with mock.patch.dict(os.environ, GAVEL_STUB_STATUS="CounterSatisfiable"):
+            proof = VampireInterface(executable=stub.command()).prove(_problem())
+        self.assertIsInstance(proof.status, status.StatusCounterSatisfiable)
+        self.assertEqual(proof.steps, [])
+
+    def test_environment_script(self):
+        # Mimics the installed gavel-stub-prover script in a directory with a space
+        with tempfile.TemporaryDirectory(prefix="gavel stub ") as directory:
+            script = os.path.join(directory, "gavel-stub-prover")
+            with open(script, "w") as fp:
+                fp.write("#!%s\nimport sys\nfrom gavel.prover import stub\nsys.exit(stub.main())\n" % sys.executable)
+            os.chmod(script, 0o755)
+            with mock.patch.dict(os.environ, EPROVER=script, VAMPIRE=script):
+                for prover in (EProverInterface(), VampireInterface()):
+                    self.assertIsInstance(prover.prove(_problem()).status, status.StatusTheorem)
+
+    def test_eprover_environment_is_a_path(self):
+        with mock.patch.dict(os.environ, EPROVER="/opt/E prover/eprover"):
+            self.assertEqual(EProverInterface()._command(), ["/opt/E prover/eprover"])
+        self.assertEqual(EProverInterface(executable="nice eprover")._command(), ["nice", "eprover"])
+
+    def test_vampire_environment_is_a_path(self):
+        with mock.patch.dict(os.environ, VAMPIRE="/opt/my vampire/vampire"):
+            self.assertEqual(VampireInterface()._command(), ["/opt/my vampire/vampire"])
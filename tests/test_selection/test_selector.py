@@ -0,0 +1,36 @@
+import unittest
+
+from gavel.dialects.tptp.parser import TPTPProblemParser
+from gavel.logic.problem import Problem
+from gavel.selection.selector import Sine
+from gavel.selection.selector import SineIndex
+
+PROBLEM = """fof(a1,axiom,p(c)).
+fof(a2,axiom,(p(c)=>r(c))).
+fof(a3,axiom,(r(c)=>s(c))).
+fof(a4,axiom,q(d)).
+fof(goal,conjecture,s(c)).
+"""
+
+
+class TestSine(unittest.TestCase):
+    def setUp(self):
+        self.problem = TPTPProblemParser().parse(PROBLEM)
+
+    def test_select_returns_problem(self):
+        selected = Sine().select(self.problem)
+        self.assertIsInstance(selected, Problem)
+        self.assertEqual(selected.conjectures, self.problem.conjectures)
+        self.assertEqual([p.name for p in selected.premises], ["a3", "a2", "a1"])
+
+    def test_max_depth(self):
+        selected = Sine().select(self.problem, max_depth=1)
+        self.assertEqual([p.name for p in selected.premises], ["a3"])
+
+    def test_shared_index(self):
+        index = Sine().build_index(self.problem)
+        self.assertIsInstance(index, SineIndex)
+        self.assertEqual(
+            [p.name for p in Sine().select(self.problem, index=index).premises],
+            [p.name for p in Sine().select(self.problem).premises],
+        )